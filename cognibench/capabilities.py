@@ -36,6 +36,17 @@ class ProducesPolicy(sciunit.Capability):
     """
     Capability for agents that can generate a policy function over the action space. A policy function returns the
     probability that the agent picks the given action.
+
+    Agents may optionally implement a `sequence_loglik(stimuli, rewards, actions)` method that returns the per-trial
+    log-likelihood of a whole sequence of actions as a :class:`numpy.ndarray`, while updating the hidden state exactly
+    as a trial-by-trial replay would. When present, it is used by :class:`cognibench.models.policy_model.PolicyModel`
+    to avoid creating a policy object for every trial. Similarly, agents may implement
+    `sequence_loglik_grad(stimuli, rewards, actions)` that additionally returns the gradient of the total
+    log-likelihood as a dictionary keyed by parameter names, which is then used for gradient-based fitting. Finally,
+    agents may implement `batch_negloglike(paras, stimuli, rewards, actions)` that evaluates the negative
+    log-likelihood for K parameter settings at once, where each value of `paras` is an array with a leading axis of
+    length K. Agents with continuous actions may implement `eval_policy_sequence(stimuli, rewards)` that returns the
+    random variables of a whole sequence of trials as a single object with array parameters.
     """
 
     def __init__(self, *args, **kwargs):
@@ -174,9 +185,9 @@ class DiscreteObservation(ObservationSpace):
 
     def _check_observation(self, values):
         """
-        Check whether given values are valid observations.
+        Check whether the given sequence contains only valid observations.
         """
-        return all(np.issubdtype(type(x), np.integer) for x in values)
+        return _check_discrete(values, self.n_obs())
 
 
 class DiscreteAction(ActionSpace):
@@ -226,9 +237,9 @@ class DiscreteAction(ActionSpace):
 
     def _check_action(self, values):
         """
-        Check whether given value is a valid action.
+        Check whether the given sequence contains only valid actions.
         """
-        return all(np.issubdtype(type(x), np.integer) for x in values)
+        return _check_discrete(values, self.n_action())
 
 
 class MultiBinaryObservation(ObservationSpace):
@@ -287,9 +298,17 @@ class MultiBinaryObservation(ObservationSpace):
 
     def _check_observation(self, values):
         """
-        Check whether given value is a valid obeservation.
+        Check whether the given sequence contains only valid observations.
         """
-        return all(self.get_observation_space().contains(x) for x in values)
+        arr = np.asarray(values)
+        if arr.size == 0:
+            return True
+        return (
+            arr.ndim == 2
+            and arr.shape[1] == self.n_obs()
+            and arr.dtype.kind in "biuf"
+            and bool(np.all((arr == 0) | (arr == 1)))
+        )
 
 
 class ContinuousAction(ActionSpace):
@@ -317,9 +336,9 @@ class ContinuousAction(ActionSpace):
 
     def _check_action(self, values):
         """
-        Check whether given value is a valid action.
+        Check whether the given sequence contains only valid actions.
         """
-        return all(self.get_action_space().contains(x) for x in values)
+        return _check_continuous(values)
 
 
 class ContinuousObservation(ObservationSpace):
@@ -347,6 +366,30 @@ class ContinuousObservation(ObservationSpace):
 
     def _check_observation(self, values):
         """
-        Check whether given value is a valid observation.
+        Check whether the given sequence contains only valid observations.
         """
-        return all(self.get_observation_space().contains(x) for x in values)
+        return _check_continuous(values)
+
+
+def _check_discrete(values, n):
+    """
+    Check whether the given sequence contains only integers in [0, n).
+    """
+    arr = np.asarray(values)
+    if arr.size == 0:
+        return True
+    return (
+        arr.ndim == 1
+        and arr.dtype.kind in "iu"
+        and bool(np.all((arr >= 0) & (arr < n)))
+    )
+
+
+def _check_continuous(values):
+    """
+    Check whether the given sequence contains only real numbers.
+    """
+    arr = np.asarray(values)
+    if arr.size == 0:
+        return True
+    return arr.ndim == 1 and arr.dtype.kind in "iuf"
@@ -1,6 +1,9 @@
+import math
 import numpy as np
 import scipy.stats as stats
 
+from cognibench.utils import is_arraylike
+
 
 class DiscreteRV:
     def __init__(self, p, eps=1e-8):
@@ -16,19 +19,115 @@ class DiscreteRV:
         return self.random_state.choice(self.n, p=self._p)
 
 
+class CategoricalRV:
+    """
+    Discrete random variable over {0, ..., n - 1} given by unnormalized log-probabilities (logits).
+
+    Log-probabilities are computed with a stable log-sum-exp when the logits are set, and `logpmf` returns
+    `log(p + eps)` as :class:`DiscreteRV` does. Normalized cumulative probabilities are only computed when a sample is
+    requested, and samples are drawn by inverting the cumulative distribution at a single uniform draw, which consumes
+    the random stream exactly as :py:meth:`numpy.random.Generator.choice` does.
+
+    All the arrays are allocated once; `set_logits` and `set_probs` overwrite them, so a single object can be reused as
+    the policy of many trials.
+    """
+
+    __slots__ = ("n", "eps", "random_state", "_log_eps", "_logp", "_cdf", "_cdf_valid")
+
+    def __init__(self, logits, eps=1e-8):
+        self.n = len(logits)
+        self.eps = eps
+        self.random_state = None
+        self._log_eps = math.log(eps)
+        self._logp = np.empty(self.n, dtype=np.float64)
+        self._cdf = np.empty(self.n, dtype=np.float64)
+        self.set_logits(logits)
+
+    @classmethod
+    def from_probs(cls, p, eps=1e-8):
+        """
+        Create a random variable from a probability vector.
+        """
+        rv = cls(np.zeros(len(p)), eps=eps)
+        return rv.set_probs(p)
+
+    def set_logits(self, logits):
+        """
+        Overwrite the distribution with the one given by the logits and return self.
+        """
+        logp, unnormalized = self._logp, self._cdf
+        np.subtract(logits, np.maximum.reduce(logits), out=logp)
+        np.exp(logp, out=unnormalized)
+        logp -= math.log(np.add.reduce(unnormalized))
+        np.logaddexp(logp, self._log_eps, out=logp)
+        self._cdf_valid = False
+        return self
+
+    def set_probs(self, p):
+        """
+        Overwrite the distribution with the given probability vector and return self.
+        """
+        with np.errstate(divide="ignore"):
+            return self.set_logits(np.log(p))
+
+    def logpmf(self, e):
+        return self._logp[e]
+
+    def rvs(self):
+        cdf = self._cdf
+        if not self._cdf_valid:
+            # unnormalized probabilities left by set_logits are overwritten by their cumulative sums
+            np.cumsum(cdf, out=cdf)
+            cdf /= cdf[-1]
+            self._cdf_valid = True
+        return cdf.searchsorted(self.random_state.random(), side="right")
+
+
 class NormalRV:
+    """
+    Normal random variable. `loc` and `scale` may be scalars or arrays that broadcast against each other and against
+    the values passed to `logpdf`, so that the predictions of a whole sequence of trials can be represented by a single
+    object. Normalizing constants are computed once when `loc` or `scale` is set.
+    """
+
     def __init__(self, loc, scale, eps=1e-8):
+        self.eps = eps
         self.loc = loc
         self.scale = scale
-        self.eps = eps
         self.random_state = None
 
-    def logpdf(self, e):
-        return (
-            -np.log(self.scale + self.eps)
-            - 0.5 * np.log(2 * np.pi + self.eps)
-            - 0.5 * ((e - self.loc) / (self.scale + self.eps)) ** 2
+    @property
+    def loc(self):
+        return self._loc
+
+    @loc.setter
+    def loc(self, value):
+        self._loc = (
+            np.asarray(value, dtype=np.float64) if is_arraylike(value) else value
+        )
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, value):
+        self._scale = (
+            np.asarray(value, dtype=np.float64) if is_arraylike(value) else value
         )
+        self._scale_eps = self._scale + self.eps
+        self._log_norm = -np.log(self._scale_eps) - 0.5 * np.log(2 * np.pi + self.eps)
+
+    def logpdf(self, e):
+        return self._log_norm - 0.5 * ((e - self._loc) / self._scale_eps) ** 2
+
+    def logpdf_grad(self, e):
+        """
+        Return the derivatives of `logpdf(e)` with respect to `loc` and `scale`.
+        """
+        scale = self._scale_eps
+        z = (e - self._loc) / scale
+        return z / scale, (z ** 2 - 1) / scale
 
     def rvs(self):
-        return self.random_state.normal(self.loc, self.scale)
+        return self.random_state.normal(self._loc, self._scale)
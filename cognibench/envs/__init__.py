@@ -1,2 +1,2 @@
 from .base import CNBEnv
-from .env import BanditEnv, ClassicalConditioningEnv
+from .env import BanditEnv, VectorBanditEnv, ClassicalConditioningEnv
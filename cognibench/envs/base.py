@@ -1,5 +1,5 @@
 import gym
-from gym.utils import seeding
+from cognibench.utils import make_rng
 
 
 class CNBEnv(gym.Env):
@@ -14,21 +14,23 @@ class CNBEnv(gym.Env):
         """
         Parameters
         ----------
-        seed : int
+        seed : int or :class:`numpy.random.SeedSequence`
             Random seed to use
         """
         self.set_seed(seed)
         super().__init__(*args, **kwargs)
 
     def set_seed(self, seed):
-        """Set the random_state for the environment if given.
+        """Set the random_state for the environment if given. The random state `np_random` is a
+        :class:`numpy.random.Generator` using the PCG64 bit generator.
 
         Parameters
         ----------
-        seed : int
-            Seed for the random_state
+        seed : int or :class:`numpy.random.SeedSequence`
+            Seed for the random_state. Use :py:func:`cognibench.utils.spawn_seeds` to give each environment its own
+            stream.
         """
-        self.np_random, seed = seeding.np_random(seed)
+        self.np_random = make_rng(seed)
         return seed
 
     def update(self, stimulus, reward, action, done=False):
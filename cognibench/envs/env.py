@@ -28,7 +28,9 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from gym.utils import seeding
+import numpy as np
+from cognibench.settings import settings
+from cognibench.utils import make_rng, spawn_seeds
 from cognibench.capabilities import (
     ContinuousAction,
     DiscreteAction,
@@ -38,6 +40,10 @@ from cognibench.capabilities import (
 from .base import CNBEnv
 
 
+# maximum number of uniforms buffered by VectorBanditEnv over all the instances
+_MAX_BUFFERED_UNIFORMS = 2 ** 20
+
+
 class BanditEnv(DiscreteAction, DiscreteObservation, CNBEnv):
     """Bandit environment base to allow agents to interact with the class n-armed bandit
     in different variations
@@ -128,6 +134,125 @@ class BanditEnv(DiscreteAction, DiscreteObservation, CNBEnv):
         return self.get_observation_space().sample()
 
 
+class VectorBanditEnv(DiscreteAction, DiscreteObservation, CNBEnv):
+    """Bandit environment that steps N independent bandit instances at once.
+
+    Instance i behaves as a :class:`BanditEnv` with payout probabilities `p_dist[i]` seeded with the i-th seed. Each
+    instance draws its uniforms from its own generator in blocks of at most "RNG_BLOCK_SIZE" (see
+    :py:data:`cognibench.settings`), and a step compares one uniform per instance against the payout probabilities of
+    the chosen arms. Hence, the rewards are the same as the rewards of N separate :class:`BanditEnv` objects that are
+    given the same seeds and actions.
+
+    Parameters
+    ----------
+    p_dist : array-like
+        Matrix of shape (N, n_bandits) whose rows are the payout probabilities of each instance.
+
+    info : str
+        Info about the environment that the agents is not supposed to know.
+
+    seed : int or :class:`numpy.random.SeedSequence` or sequence
+        If a sequence of N seeds, instance i is seeded with the i-th seed. Otherwise, the instances are seeded with N
+        child seeds spawned from the given seed by :py:func:`cognibench.utils.spawn_seeds`.
+
+    Attributes
+    ----------
+    p_dist : :class:`numpy.ndarray`
+        Matrix of shape (N, n_bandits) whose rows are the payout probabilities of each instance.
+
+    n_envs : int
+        Number of instances N.
+    """
+
+    name = "VectorBanditEnv"
+
+    def __init__(self, *args, p_dist, info={}, seed=None, **kwargs):
+        p_dist = np.asarray(p_dist, dtype=np.float64)
+        if p_dist.ndim != 2:
+            raise ValueError("p_dist must be a matrix of shape (N, n_bandits)")
+        if p_dist.min() < 0 or p_dist.max() > 1:
+            raise ValueError("All probabilities must be between 0 and 1")
+        self.n_envs, self.n_bandits = p_dist.shape
+        self.p_dist = p_dist
+        self.info = info
+        super().__init__(*args, **kwargs)
+        self.set_seed(seed)
+        self.set_action_space(self.n_bandits)
+        self.set_observation_space(1)
+
+    def set_seed(self, seed):
+        """Seed the generator of each instance.
+
+        Parameters
+        ----------
+        seed : int or :class:`numpy.random.SeedSequence` or sequence
+            Seed of every instance, or a single seed from which the seeds of the instances are spawned.
+        """
+        if seed is None or np.ndim(seed) == 0:
+            seeds = spawn_seeds(seed, self.n_envs)
+        else:
+            seeds = list(seed)
+            if len(seeds) != self.n_envs:
+                raise ValueError(
+                    "Number of seeds must be equal to the number of instances"
+                )
+        self.np_randoms = [make_rng(s) for s in seeds]
+        self._uniforms = np.empty((self.n_envs, 0))
+        self._pos = 0
+        return seed
+
+    def _next_uniforms(self):
+        if self._pos == self._uniforms.shape[1]:
+            # the values do not depend on the block size, which is capped to bound the buffer memory
+            block_size = settings["RNG_BLOCK_SIZE"] or 1
+            block_size = max(1, min(block_size, _MAX_BUFFERED_UNIFORMS // self.n_envs))
+            self._uniforms = np.array(
+                [rng.random(block_size) for rng in self.np_randoms]
+            )
+            self._pos = 0
+        self._pos += 1
+        return self._uniforms[:, self._pos - 1]
+
+    def step(self, actions):
+        """Environment reacts to the action of each instance.
+
+        Parameters
+        ----------
+        actions : array-like
+            Integer array of length N containing the action taken in each instance.
+
+        Returns
+        -------
+        observations : :class:`numpy.ndarray`
+            N observations, all 0 as in :class:`BanditEnv`.
+        rewards : :class:`numpy.ndarray`
+            N rewards, each 1 or 0 generated by the payout probability of the chosen arm.
+        dones : :class:`numpy.ndarray`
+            N boolean flags, all False.
+        info : str
+            Information about the environment.
+        """
+        actions = np.asarray(actions)
+        assert actions.shape == (self.n_envs,) and self._check_action(
+            actions
+        ), "Actions do not fit in the environment's action_space"
+        p = self.p_dist[np.arange(self.n_envs), actions]
+        rewards = (self._next_uniforms() < p).astype(np.int64)
+        observations = np.zeros(self.n_envs, dtype=np.int64)
+        dones = np.zeros(self.n_envs, dtype=bool)
+        return observations, rewards, dones, self.info
+
+    def reset(self):
+        """Reset the instances.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            N observations, all 0.
+        """
+        return np.zeros(self.n_envs, dtype=np.int64)
+
+
 class ClassicalConditioningEnv(ContinuousAction, MultiBinaryObservation, CNBEnv):
     """Environment base to allow agents to learn from stimulus occuring at different
     probabilities.
@@ -150,8 +275,21 @@ class ClassicalConditioningEnv(ContinuousAction, MultiBinaryObservation, CNBEnv)
         info can releal the index of the optimal arm, or the value of prior parameter.
         Can be useful to evaluate the agent's perfomance.
 
+    schedule_size : int or None
+        If given, the environment runs in schedule mode: stimulus indices and reward outcomes of `schedule_size` trials
+        are drawn at once with vectorized categorical and uniform draws, and `reset` and `step` hand them out one trial
+        at a time. A new block is drawn when the current one is exhausted. Since rewards do not depend on the action,
+        the resulting trials follow the same distribution as the trials drawn one at a time. If None, every trial is
+        drawn when it is requested.
+
     Attributes
     ----------
+    stimulus_schedule : :class:`numpy.ndarray` or None
+        Stimulus indices of the trials in the current schedule block. None until a schedule is drawn.
+
+    reward_schedule : :class:`numpy.ndarray` or None
+        Reward outcomes (1 or 0) of the trials in the current schedule block. None until a schedule is drawn.
+
     p_stimuli : array-like
         A list of probabilities that a stimulus will occur.
 
@@ -174,7 +312,15 @@ class ClassicalConditioningEnv(ContinuousAction, MultiBinaryObservation, CNBEnv)
     name = "ClassicalConditioningEnv"
 
     def __init__(
-        self, *args, stimuli, p_stimuli, p_reward, info={}, seed=None, **kwargs
+        self,
+        *args,
+        stimuli,
+        p_stimuli,
+        p_reward,
+        info={},
+        seed=None,
+        schedule_size=None,
+        **kwargs
     ):
         super().__init__(*args, **kwargs)
         if min(p_stimuli) < 0 or max(p_stimuli) > 1 or sum(p_stimuli) != 1:
@@ -192,12 +338,82 @@ class ClassicalConditioningEnv(ContinuousAction, MultiBinaryObservation, CNBEnv)
                 s
             ), "Stimuli must be in the same MultiBinary space"
 
+        if schedule_size is not None and schedule_size < 1:
+            raise ValueError("schedule_size must be a positive integer")
+
         self.stimuli = stimuli
         self.p_stimuli = p_stimuli
         self.p_reward = p_reward
         self.info = info
+        self.schedule_size = schedule_size
+        self._cdf_stimuli = np.cumsum(p_stimuli)
+        self.stimulus_schedule = None
+        self.reward_schedule = None
         self.set_seed(seed)
 
+    def set_seed(self, seed):
+        """Set the random_state for the environment. In schedule mode, a new schedule block is drawn from the new
+        random_state.
+
+        Parameters
+        ----------
+        seed : int or :class:`numpy.random.SeedSequence`
+            Seed for the random_state.
+        """
+        super().set_seed(seed)
+        if getattr(self, "schedule_size", None) is not None:
+            self.generate_schedule(self.schedule_size)
+        return seed
+
+    def generate_schedule(self, n_trials):
+        """Draw the stimulus indices and reward outcomes of the given number of trials and make them the current
+        schedule block. In schedule mode, the following calls to `reset` and `step` serve the trials of this block in
+        order. Otherwise, the schedule can be used directly by vectorized consumers.
+
+        Parameters
+        ----------
+        n_trials : int
+            Number of trials to draw.
+
+        Returns
+        -------
+        stimulus_schedule : :class:`numpy.ndarray`
+            Integer array of length `n_trials` containing the stimulus index of each trial.
+        reward_schedule : :class:`numpy.ndarray`
+            Integer array of length `n_trials` containing the reward (1 or 0) of each trial.
+        """
+        u = self.np_random.random(n_trials)
+        # inverse CDF sampling; clipping guards against a CDF ending slightly below 1
+        stimulus_schedule = np.minimum(
+            np.searchsorted(self._cdf_stimuli, u, side="right"), len(self.stimuli) - 1
+        )
+        p_reward = np.asarray(self.p_reward, dtype=np.float64)[stimulus_schedule]
+        reward_schedule = (self.np_random.random(n_trials) < p_reward).astype(np.int64)
+        self.stimulus_schedule = stimulus_schedule
+        self.reward_schedule = reward_schedule
+        self._schedule_pos = 0
+        return stimulus_schedule, reward_schedule
+
+    @property
+    def schedule_stimuli(self):
+        """
+        Stimuli of the trials in the current schedule block as an array of shape (n_trials, n_obs), or None if no
+        schedule has been drawn.
+        """
+        if self.stimulus_schedule is None:
+            return None
+        return np.asarray(self.stimuli)[self.stimulus_schedule]
+
+    def _next_trial(self):
+        """
+        Return the stimulus index and reward outcome of the next trial in the schedule.
+        """
+        if self._schedule_pos == len(self.stimulus_schedule):
+            self.generate_schedule(self.schedule_size)
+        pos = self._schedule_pos
+        self._schedule_pos += 1
+        return self.stimulus_schedule[pos], self.reward_schedule[pos]
+
     def step(self, action):
         """Environment reacts to the agent.
 
@@ -221,13 +437,17 @@ class ClassicalConditioningEnv(ContinuousAction, MultiBinaryObservation, CNBEnv)
             action
         ), "Action does not fit in the environment's action_space"
 
+        done = False
+        info = self.info
+        if self.schedule_size is not None:
+            obs_idx, reward = self._next_trial()
+            return self.stimuli[obs_idx], int(reward), done, info
+
         obs_idx = self.np_random.choice(
             range(len(self.stimuli)), p=self.p_stimuli, replace=True
         )
         reward = 0
-        done = False
         observation = self.stimuli[obs_idx]
-        info = self.info
 
         if self.np_random.uniform() < self.p_reward[obs_idx]:
             reward = 1
@@ -245,6 +465,10 @@ class ClassicalConditioningEnv(ContinuousAction, MultiBinaryObservation, CNBEnv)
         observation : :class:`numpy.ndarray`
             One of the stimulus from the pre-set list
         """
+        if self.schedule_size is not None:
+            obs_idx, _ = self._next_trial()
+            return self.stimuli[obs_idx]
+
         obs_idx = self.np_random.choice(
             range(len(self.stimuli)), p=self.p_stimuli, replace=True
         )
@@ -1 +1,2 @@
-from .base import CNBModel, CNBAgent
+from .base import CNBModel, CNBAgent, MemoizedPolicy, FitReport, Record, make_record
+from .optimizers import Optimizer, DifferentialEvolution
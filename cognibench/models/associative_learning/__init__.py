@@ -9,3 +9,5 @@ from .beta_binomial import BetaBinomialAgent
 from .lsspd import LSSPDAgent
 from .krw_norm import KrwNormAgent
 from .randomrespond import RandomRespondAgent
+
+from .krw_norm import KalmanFilterBatch
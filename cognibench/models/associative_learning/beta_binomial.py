@@ -3,7 +3,9 @@ import gym
 from collections import defaultdict
 from gym import spaces
 from scipy import stats
+from scipy.special import betaln, digamma
 from cognibench.distr import NormalRV
+from cognibench import settings
 from cognibench.models import CNBAgent
 from cognibench.models.policy_model import PolicyModel
 from cognibench.capabilities import (
@@ -21,6 +23,8 @@ class BetaBinomialAgent(
     CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObservation
 ):
     name = "BetaBinomial"
+    param_fields = ("sigma", "mix_coef", "intercept", "slope")
+    hidden_state_fields = ("a", "b")
 
     def __init__(self, *args, n_obs, distinct_stimuli, **kwargs):
         """
@@ -59,6 +63,7 @@ class BetaBinomialAgent(
         self.cue_to_idx = _CueToIdxMap()
         for i, stimulus in enumerate(distinct_stimuli):
             self.cue_to_idx[stimulus] = i
+        self._cue_idx_cache = None
         self.set_action_space(ContinuousSpace())
         self.set_observation_space(n_obs)
         super().__init__(*args, **kwargs)
@@ -66,15 +71,14 @@ class BetaBinomialAgent(
     @overrides
     def set_paras(self, paras):
         if paras is None:
-            self._paras = paras
+            super().set_paras(paras)
             return
         own_paras = {k: v for k, v in paras.items()}
         self.a_init = own_paras["a"]
         self.b_init = own_paras["b"]
         del own_paras["a"]
         del own_paras["b"]
-        self._paras = own_paras
-        self.reset()
+        super().set_paras(own_paras)
 
     def reset(self):
         self.set_hidden_state(
@@ -99,9 +103,10 @@ class BetaBinomialAgent(
             Normal random variable with mean equal to reward and
             standard deviation equal to sigma model parameter.
         """
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
 
-        sd_pred = self.get_paras()["sigma"]
+        sd_pred = self._paras.sigma
 
         mu_pred = self._predict_reward(stimulus)
 
@@ -144,7 +149,8 @@ class BetaBinomialAgent(
         done : bool
             If True, do not update the hidden state.
         """
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
         hidden = self.get_hidden_state()
 
         stimulus_idx = self.cue_to_idx[stimulus]
@@ -152,14 +158,96 @@ class BetaBinomialAgent(
             hidden["a"][stimulus_idx] += reward
             hidden["b"][stimulus_idx] += 1 - reward
 
+    def eval_policy_sequence(self, stimuli, rewards):
+        """
+        Get the action random variables of a whole sequence of trials as a single :class:`cognibench.distr.NormalRV`
+        whose mean is an array with one entry per trial. The hidden state is updated as if `eval_policy` and `update`
+        were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        Returns
+        -------
+        :class:`cognibench.distr.NormalRV`
+            Normal random variable of the actions of every trial.
+        """
+        mix_coef = self._paras.mix_coef
+        intercept = self._paras.intercept
+        slope = self._paras.slope
+        sd_pred = self._paras.sigma
+        hidden = self.get_hidden_state()
+
+        stimulus_idx = self._cue_indices(stimuli)
+        # reward counts of each cue accumulated over the trials before each trial
+        onehot = np.zeros((len(stimulus_idx), self.n_cues), dtype=np.float64)
+        onehot[np.arange(len(stimulus_idx)), stimulus_idx] = 1
+        r_counts = onehot * np.asarray(rewards, dtype=np.float64)[:, None]
+        r_before = np.cumsum(r_counts, axis=0) - r_counts
+        n_before = np.cumsum(onehot, axis=0) - onehot
+        rows = np.arange(len(stimulus_idx))
+        a = hidden["a"][stimulus_idx] + r_before[rows, stimulus_idx]
+        b = hidden["b"][stimulus_idx] + (n_before - r_before)[rows, stimulus_idx]
+        hidden["a"] += np.sum(r_counts, axis=0)
+        hidden["b"] += np.sum(onehot - r_counts, axis=0)
+
+        mu = _beta_mean(a, b)
+        entropy = _beta_entropy(a, b)
+        slope = np.broadcast_to(slope, self.n_cues)[stimulus_idx]
+        mu_pred = intercept + slope * (mix_coef * mu + (1 - mix_coef) * entropy)
+
+        rv = NormalRV(loc=mu_pred, scale=sd_pred)
+        rv.random_state = self.rng
+        return rv
+
+    def sequence_loglik(self, stimuli, rewards, actions):
+        """
+        Compute the log-likelihood of each action in the given sequence of trials and update the hidden state as if
+        `eval_policy` and `update` were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+        """
+        rv = self.eval_policy_sequence(stimuli, rewards)
+        return rv.logpdf(np.asarray(actions, dtype=np.float64))
+
+    def _cue_indices(self, stimuli):
+        """
+        Return the cue index of every stimulus of a sequence as an integer array. The result for the most recent
+        sequence is cached so that repeated evaluations of the same sequence during fitting skip the lookup.
+        """
+        stimuli = np.asarray(stimuli)
+        key = (stimuli.shape, stimuli.dtype.str, stimuli.tobytes())
+        if self._cue_idx_cache is None or self._cue_idx_cache[0] != key:
+            self._cue_idx_cache = (key, self.cue_to_idx.indices(stimuli))
+        return self._cue_idx_cache[1]
+
     def _predict_reward(self, stimulus):
         """
         Predict the reward from the given stimulus using beta-binomial model
         equations.
         """
-        mix_coef = self.get_paras()["mix_coef"]
-        intercept = self.get_paras()["intercept"]
-        slope = self.get_paras()["slope"]
+        mix_coef = self._paras.mix_coef
+        intercept = self._paras.intercept
+        slope = self._paras.slope
 
         stimulus_idx = self.cue_to_idx[stimulus]
         hidden = self.get_hidden_state()
@@ -168,8 +256,8 @@ class BetaBinomialAgent(
         b_i = hidden["b"][stimulus_idx]
         slope_i = slope[stimulus_idx]
 
-        mu_i = stats.beta.mean(a_i, b_i)
-        entropy_i = stats.beta.entropy(a_i, b_i)
+        mu_i = _beta_mean(a_i, b_i)
+        entropy_i = _beta_entropy(a_i, b_i)
 
         rhat = intercept + slope_i * (mix_coef * mu_i + (1 - mix_coef) * entropy_i)
         # rhat = intercept + np.dot(
@@ -197,16 +285,6 @@ class BetaBinomialModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
 
         n_cues = len(distinct_stimuli)
 
-        def initializer(seed):
-            return {
-                "a": 1,
-                "b": 1,
-                "sigma": stats.expon.rvs(random_state=seed),
-                "mix_coef": stats.uniform.rvs(random_state=seed),
-                "intercept": stats.norm.rvs(random_state=seed),
-                "slope": stats.norm.rvs(size=n_cues, random_state=seed),
-            }
-
         self.param_bounds = {
             "sigma": (1e-6, None),
             "mix_coef": (0, 1),
@@ -215,9 +293,38 @@ class BetaBinomialModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
         }
 
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
 
+    def _initializer(self, seed):
+        return {
+            "a": 1,
+            "b": 1,
+            "sigma": stats.expon.rvs(random_state=seed),
+            "mix_coef": stats.uniform.rvs(random_state=seed),
+            "intercept": stats.norm.rvs(random_state=seed),
+            "slope": stats.norm.rvs(size=self.agent.n_cues, random_state=seed),
+        }
+
+
+def _beta_mean(a, b):
+    """
+    Mean of the beta distribution with parameters a and b.
+    """
+    return a / (a + b)
+
+
+def _beta_entropy(a, b):
+    """
+    Differential entropy of the beta distribution with parameters a and b.
+    """
+    return (
+        betaln(a, b)
+        - (a - 1) * digamma(a)
+        - (b - 1) * digamma(b)
+        + (a + b - 2) * digamma(a + b)
+    )
+
 
 class _CueToIdxMap(MutableMapping):
     """
@@ -241,3 +348,24 @@ class _CueToIdxMap(MutableMapping):
 
     def __len__(self):
         return len(self._storage)
+
+    def indices(self, stimuli):
+        """
+        Look up the values of all rows of a 2D array of binary stimuli at once.
+
+        Parameters
+        ----------
+        stimuli : :class:`numpy.ndarray`
+            Array of shape (T, n_obs) whose rows are keys of this mapping.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Integer array of length T.
+        """
+        stimuli = np.asarray(stimuli)
+        if len(stimuli) == 0:
+            return np.empty(0, dtype=np.int64)
+        distinct, inverse = np.unique(stimuli, axis=0, return_inverse=True)
+        values = np.array([self[key] for key in distinct], dtype=np.int64)
+        return values[inverse]
@@ -2,7 +2,9 @@ import numpy as np
 import gym
 from gym import spaces
 from scipy import stats
+from scipy.linalg.blas import daxpy, dger
 from cognibench.distr import NormalRV
+from cognibench import settings
 from cognibench.models import CNBAgent
 from cognibench.models.policy_model import PolicyModel
 from cognibench.capabilities import (
@@ -16,6 +18,9 @@ from overrides import overrides
 
 
 class KrwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObservation):
+    param_fields = ("tauSq", "sigmaRSq", "w", "sigma", "b0", "b1", "sigmaWInit")
+    hidden_state_fields = ("w", "C")
+
     def __init__(self, *args, n_obs, eps=1e-8, **kwargs):
         """
         Parameters
@@ -54,6 +59,8 @@ class KrwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObserv
         self.eps = eps
         self.set_action_space(ContinuousSpace())
         self.set_observation_space(n_obs)
+        # work buffer of the Kalman update
+        self._C_s = np.empty(n_obs, dtype=np.float64)
         # TODO: get params here
         super().__init__(*args, **kwargs)
 
@@ -76,8 +83,9 @@ class KrwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObserv
         return self.eval_policy(*args, **kwargs).rvs()
 
     def _predict_reward(self, stimulus):
-        assert self.get_observation_space().contains(stimulus)
-        w_curr = self.get_hidden_state()["w"]
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
+        w_curr = self._hidden_state.w
         rhat = np.dot(stimulus, w_curr.T)
         return rhat
 
@@ -102,39 +110,221 @@ class KrwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObserv
         done : bool
             If True, do not update the hidden state.
         """
-        assert self.get_action_space().contains(action)
-        assert self.get_observation_space().contains(stimulus)
-
-        tauSq = self.get_paras()["tauSq"]  # State diffusion variance
-        Q = tauSq * np.identity(
-            self.n_obs()
-        )  # Transition noise variance (transformed to positive reals); constant over time
-        sigmaRSq = self.get_paras()["sigmaRSq"]
+        if settings["VALIDATION"] == "strict":
+            assert self.get_action_space().contains(action)
+            assert self.get_observation_space().contains(stimulus)
 
-        w_curr = self.get_hidden_state()["w"]
-        C_curr = self.get_hidden_state()["C"]
+        tauSq = self._paras.tauSq  # State diffusion variance
+        sigmaRSq = self._paras.sigmaRSq
 
-        rhat = self._predict_reward(stimulus)
+        w_curr = self._hidden_state.w
+        C_curr = self._hidden_state.C
 
         if not done:
-            # Kalman prediction step
-            w_pred = w_curr  # No mean-shift for the weight distribution evolution (only stochastic evolution)
-            C_pred = C_curr + Q  # Update covariance
+            _kalman_update(
+                w_curr,
+                C_curr,
+                np.asarray(stimulus, dtype=np.float64),
+                reward,
+                tauSq,
+                sigmaRSq,
+                self.eps,
+                self._C_s,
+            )
+
+        return w_curr, C_curr
+
+    def eval_policy_sequence(self, stimuli, rewards):
+        """
+        Get the action random variables of a whole sequence of trials as a single :class:`cognibench.distr.NormalRV`
+        whose mean is an array with one entry per trial. The hidden state is updated as if `eval_policy` and `update`
+        were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        Returns
+        -------
+        :class:`cognibench.distr.NormalRV`
+            Normal random variable of the actions of every trial.
+        """
+        b0 = self._paras.b0
+        b1 = self._paras.b1
+        sd_pred = self._paras.sigma
+        sigmaRSq = self._paras.sigmaRSq
+        tauSq = self._paras.tauSq
+
+        w_curr = self._hidden_state.w
+        C_curr = self._hidden_state.C
+
+        stimuli = np.asarray(stimuli, dtype=np.float64)
+        mu_pred = np.empty(len(stimuli), dtype=np.float64)
+        for i, (s, r) in enumerate(zip(stimuli, rewards)):
+            mu_pred[i] = b0 + np.dot(b1, s * w_curr)
+            _kalman_update(w_curr, C_curr, s, r, tauSq, sigmaRSq, self.eps, self._C_s)
+
+        rv = NormalRV(loc=mu_pred, scale=sd_pred)
+        rv.random_state = self.rng
+        return rv
+
+    def sequence_loglik(self, stimuli, rewards, actions):
+        """
+        Compute the log-likelihood of each action in the given sequence of trials and update the hidden state as if
+        `eval_policy` and `update` were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+        """
+        rv = self.eval_policy_sequence(stimuli, rewards)
+        return rv.logpdf(np.asarray(actions, dtype=np.float64))
+
+    def sequence_loglik_grad(self, stimuli, rewards, actions):
+        """
+        Compute the per-trial log-likelihoods as in `sequence_loglik` together with the exact gradient of their sum
+        with respect to each agent parameter. The gradient is computed by propagating the derivatives of the weight
+        vector and the covariance matrix with respect to the parameters (forward-mode sensitivities) through the
+        Kalman filter recursion.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        loglik : :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+
+        grad : dict
+            Dictionary mapping each parameter name to the derivative of the total log-likelihood. Each derivative has
+            the same shape as the corresponding parameter.
+        """
+        paras = self.get_paras()
+        b0 = paras["b0"]
+        b1 = paras["b1"]
+        sd_pred = paras["sigma"]
+        sigmaRSq = paras["sigmaRSq"]
+        n_obs = self.n_obs()
+        identity = np.identity(n_obs)
+        Q = paras["tauSq"] * identity
+
+        w_curr = self._hidden_state.w
+        C_curr = self._hidden_state.C
+
+        # sensitivities of w with respect to initial w, and of w and C with respect to the scalar parameters
+        scalar_names = ("tauSq", "sigmaRSq", "sigmaWInit")
+        i_tau, i_rho, i_init = range(len(scalar_names))
+        dw_dw0 = identity.copy()
+        dw_dp = np.zeros((len(scalar_names), n_obs))
+        dC_dp = np.zeros((len(scalar_names), n_obs, n_obs))
+        dC_dp[i_init] = identity
+
+        stimuli = np.asarray(stimuli, dtype=np.float64)
+        n_trials = len(actions)
+        mu_pred = np.empty(n_trials, dtype=np.float64)
+        dmu_dw0 = np.empty((n_trials, n_obs), dtype=np.float64)
+        dmu_db1 = np.empty((n_trials, n_obs), dtype=np.float64)
+        dmu_dp = np.empty((n_trials, len(scalar_names)), dtype=np.float64)
+        for i, (s, r) in enumerate(zip(stimuli, rewards)):
+            b1_s = b1 * s
+            dmu_db1[i] = s * w_curr
+            mu_pred[i] = b0 + np.dot(b1, dmu_db1[i])
+            dmu_dw0[i] = np.dot(b1_s, dw_dw0)
+            dmu_dp[i] = np.dot(dw_dp, b1_s)
+
+            C_pred = C_curr + Q
+            dC_dp[i_tau] += identity
+            C_pred_s = C_pred.dot(s)
+            denom = s.dot(C_pred_s) + sigmaRSq + self.eps
+            K = C_pred_s / denom
+            dC_pred_s = np.dot(dC_dp, s)
+            ddenom = np.dot(dC_pred_s, s)
+            ddenom[i_rho] += 1
+            dK = (dC_pred_s - K[None, :] * ddenom[:, None]) / denom
+
+            delta = r - np.dot(s, w_curr)
+            dw_dp += dK * delta - K[None, :] * np.dot(dw_dp, s)[:, None]
+            dw_dw0 -= np.outer(K, np.dot(s, dw_dw0))
+            w_curr = w_curr + K * delta
+
+            s_C_pred = s.dot(C_pred)
+            s_dC_pred = np.einsum("j,pjk->pk", s, dC_dp)
+            dC_dp -= dK[:, :, None] * s_C_pred[None, None, :]
+            dC_dp -= K[None, :, None] * s_dC_pred[:, None, :]
+            C_curr = C_pred - np.outer(K, s_C_pred)
+
+        self._hidden_state.w = w_curr
+        self._hidden_state.C = C_curr
+
+        actions = np.asarray(actions, dtype=np.float64)
+        rv = NormalRV(loc=mu_pred, scale=sd_pred)
+        dll_dmu, dll_dsigma = rv.logpdf_grad(actions)
+
+        grad_w = np.dot(dll_dmu, dmu_dw0)
+        grad_b1 = np.dot(dll_dmu, dmu_db1)
+        grad_p = np.dot(dll_dmu, dmu_dp)
+        grad = {
+            "tauSq": grad_p[i_tau],
+            "sigmaRSq": grad_p[i_rho],
+            "w": grad_w if is_arraylike(paras["w"]) else np.sum(grad_w),
+            "sigma": np.sum(dll_dsigma),
+            "b0": np.sum(dll_dmu),
+            "b1": grad_b1 if is_arraylike(b1) else np.sum(grad_b1),
+            "sigmaWInit": grad_p[i_init],
+        }
+        return rv.logpdf(actions), grad
+
+    def batch_negloglike(self, paras, stimuli, rewards, actions):
+        """
+        Compute the negative log-likelihood of the given sequence of trials for a batch of K parameter settings at
+        once using :class:`KalmanFilterBatch`. The agent parameters and hidden state are not modified.
 
-            # get pred_error
-            delta = reward - rhat
+        Parameters
+        ----------
+        paras : dict
+            Dictionary mapping each parameter name to an array whose first axis has length K. Values of 'w' and 'b1'
+            may have shape (K,) or (K, n_obs).
 
-            # Kalman update step
-            K = C_pred.dot(stimulus) / (
-                stimulus.dot(C_pred.dot(stimulus)) + sigmaRSq + self.eps
-            )  # (n_obs(),)
-            w_updt = w_pred + K * delta  # Mean updated with prediction error
-            C_updt = C_pred - np.dot(K[:, None], np.dot(stimulus[None, :], C_pred))
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
 
-            self.get_hidden_state()["w"] = w_updt
-            self.get_hidden_state()["C"] = C_updt
+        rewards : array-like
+            Sequence of rewards.
 
-        return w_updt, C_updt
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Negative log-likelihood of each of the K parameter settings.
+        """
+        engine = KalmanFilterBatch(paras, n_obs=self.n_obs(), eps=self.eps)
+        return -engine.sequence_loglik(stimuli, rewards, actions)
 
     @overrides
     def eval_policy(self, stimulus):
@@ -154,13 +344,14 @@ class KrwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObserv
             to sigma model parameter.
         """
         assert self.get_hidden_state(), "hidden state must be set"
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
 
-        b0 = self.get_paras()["b0"]  # intercept
-        b1 = self.get_paras()["b1"]  # slope
-        sd_pred = self.get_paras()["sigma"]
+        b0 = self._paras.b0  # intercept
+        b1 = self._paras.b1  # slope
+        sd_pred = self._paras.sigma
 
-        w_curr = self.get_hidden_state()["w"]
+        w_curr = self._hidden_state.w
 
         # Predict response
         mu_pred = b0 + np.dot(b1, stimulus * w_curr)
@@ -175,10 +366,215 @@ class KrwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObserv
         """
         Reset the hidden state to its default value.
         """
-        w = self.get_paras()["w"]
-        C = self.get_paras()["sigmaWInit"] * np.identity(self.n_obs())
+        w = self._paras.w
+        C = self._paras.sigmaWInit * np.identity(self.n_obs())
+
+        self.set_hidden_state({"w": np.full(self.n_obs(), w, dtype=np.float64), "C": C})
 
-        self.set_hidden_state({"w": np.full(self.n_obs(), w), "C": C})
+    @overrides
+    def set_hidden_state(self, state):
+        """
+        Set the hidden state. Weights and covariances that are not float64 arrays, such as lists or float32 arrays,
+        are converted to float64 arrays so that the in-place Kalman updates work on them.
+        """
+        if state is not None and any(
+            not _is_float64_array(state[k]) for k in ("w", "C") if k in state
+        ):
+            state = {
+                k: np.array(v, dtype=np.float64) if k in ("w", "C") else v
+                for k, v in state.items()
+            }
+        super().set_hidden_state(state)
+
+
+def _is_float64_array(x):
+    """
+    Whether BLAS routines can update the given object in place.
+    """
+    return isinstance(x, np.ndarray) and x.dtype == np.float64 and x.flags.c_contiguous
+
+
+def _kalman_update(w, C, s, r, tauSq, sigmaRSq, eps, C_s):
+    """
+    Advance the Kalman filter of the KRW model by one trial in place.
+
+    The prediction step adds `tauSq` to the diagonal of the covariance matrix, and the update step is the symmetric
+    rank-1 downdate `C -= outer(C s, C s) / (s' C s + sigmaRSq + eps)` done by BLAS on the storage of `C`.
+
+    Parameters
+    ----------
+    w : :class:`numpy.ndarray`
+        Weight vector. Updated in place, by BLAS if it is a contiguous float64 array.
+
+    C : :class:`numpy.ndarray`
+        Symmetric covariance matrix. Updated in place without temporaries if it is a C-contiguous float64 array.
+
+    s : :class:`numpy.ndarray`
+        Stimulus as a float64 array.
+
+    r : float
+        Reward.
+
+    tauSq, sigmaRSq, eps : float
+        Transition noise variance, observation noise variance and the constant added to the denominator of the gain.
+
+    C_s : :class:`numpy.ndarray`
+        Work buffer of length n_obs.
+    """
+    C.flat[:: len(w) + 1] += tauSq
+    np.dot(C, s, out=C_s)
+    denom = np.dot(s, C_s) + sigmaRSq + eps
+    delta = r - np.dot(s, w)
+    if _is_float64_array(w):
+        daxpy(C_s, w, a=delta / denom)
+    else:
+        # daxpy would update a copy of w
+        w += (delta / denom) * C_s
+    if _is_float64_array(C):
+        # C.T is a Fortran-ordered view of C; the update is symmetric so updating the transpose is equivalent
+        dger(-1 / denom, C_s, C_s, a=C.T, overwrite_a=True)
+    else:
+        C -= np.outer(C_s, C_s / denom)
+
+
+class KalmanFilterBatch:
+    """
+    B independent Kalman filters of the KRW model advanced in lockstep.
+
+    The weights are stored as a matrix of shape (B, n_obs) and the covariances as an array of shape (B, n_obs, n_obs),
+    and every trial updates all filters with a few batched matrix operations. The filters may stand for different
+    subjects with their own trial sequences, for candidate parameter vectors of a multi-start or population-based fit,
+    or for posterior samples of the parameters of a single subject.
+    """
+
+    def __init__(self, paras, n_obs, eps=1e-8):
+        """
+        Parameters
+        ----------
+        paras : dict
+            Dictionary mapping each parameter name of :class:`KrwNormAgent` to an array whose first axis has length B.
+            Values of 'w' and 'b1' may have shape (B,) or (B, n_obs).
+
+        n_obs : int
+            Size of the observation space.
+
+        eps : float (optional)
+            Constant added to the denominator of the Kalman gain. (Default: 1e-8)
+        """
+        self.tauSq, self.sigmaRSq, self.sigma, self.b0, self.sigmaWInit = (
+            np.asarray(paras[k], dtype=np.float64)
+            for k in ("tauSq", "sigmaRSq", "sigma", "b0", "sigmaWInit")
+        )
+        B = len(self.sigma)
+        self.w0 = np.empty((B, n_obs), dtype=np.float64)
+        self.w0[:] = np.reshape(paras["w"], (B, -1))
+        self.b1 = np.empty((B, n_obs), dtype=np.float64)
+        self.b1[:] = np.reshape(paras["b1"], (B, -1))
+        self.eps = eps
+        self.reset()
+
+    def __len__(self):
+        return len(self.w)
+
+    def reset(self):
+        """
+        Reset the weights and covariances of every filter to their initial values.
+        """
+        B, n_obs = self.w0.shape
+        self.w = np.copy(self.w0)
+        self.C = np.zeros((B, n_obs, n_obs), dtype=np.float64)
+        self._diag()[:] = self.sigmaWInit[:, None]
+
+    def _diag(self):
+        B, n_obs = self.w.shape
+        return self.C.reshape(B, n_obs * n_obs)[:, :: n_obs + 1]
+
+    def predict(self, stimulus):
+        """
+        Compute the mean of the action distribution of every filter.
+
+        Parameters
+        ----------
+        stimulus : array-like
+            A single stimulus of length n_obs shared by all filters, or a matrix of shape (B, n_obs) with one stimulus
+            per filter.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Array of B predicted means.
+        """
+        return self.b0 + np.sum(self.b1 * self.w * stimulus, axis=-1)
+
+    def update(self, stimulus, reward, mask=None):
+        """
+        Advance every filter by one trial.
+
+        Parameters
+        ----------
+        stimulus : array-like
+            A single stimulus of length n_obs shared by all filters, or a matrix of shape (B, n_obs) with one stimulus
+            per filter.
+
+        reward : float or array-like
+            Reward shared by all filters or an array of B rewards.
+
+        mask : array-like (optional)
+            Boolean array of length B. Filters whose entry is False are left unchanged.
+        """
+        s = np.asarray(stimulus, dtype=np.float64)
+        tauSq = self.tauSq if mask is None else self.tauSq * mask
+        self._diag()[:] += tauSq[:, None]
+        # C s for all filters; batched matrix-vector product
+        C_s = np.matmul(self.C, s[..., None])[..., 0]
+        denom = np.sum(s * C_s, axis=-1) + self.sigmaRSq + self.eps
+        delta = reward - np.sum(s * self.w, axis=-1)
+        gain = 1 / denom if mask is None else mask / denom
+        self.w += C_s * (gain * delta)[:, None]
+        self.C -= np.einsum("bi,bj->bij", C_s * gain[:, None], C_s)
+
+    def sequence_loglik(self, stimuli, rewards, actions, mask=None):
+        """
+        Compute the total log-likelihood of a sequence of trials for every filter, starting from the current state.
+        The filters are advanced through the whole sequence.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Array of shape (T, n_obs) with a trial sequence shared by all filters, or (T, B, n_obs) with one sequence
+            per filter.
+
+        rewards : array-like
+            Array of shape (T,) or (T, B).
+
+        actions : array-like
+            Array of shape (T,) or (T, B).
+
+        mask : array-like (optional)
+            Boolean array of shape (T, B) marking the trials that exist for each filter. Use it to batch sequences of
+            different lengths padded to a common length T. Masked trials neither update the filters nor contribute to
+            the log-likelihood.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Array of B log-likelihood values.
+        """
+        stimuli = np.asarray(stimuli, dtype=np.float64)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        actions = np.asarray(actions, dtype=np.float64)
+        n_trials = len(stimuli)
+        mu_pred = np.empty((n_trials, len(self)), dtype=np.float64)
+        for i in range(n_trials):
+            mu_pred[i] = self.predict(stimuli[i])
+            self.update(stimuli[i], rewards[i], None if mask is None else mask[i])
+
+        if actions.ndim == 1:
+            actions = actions[:, None]
+        loglik = NormalRV(loc=mu_pred, scale=self.sigma).logpdf(actions)
+        if mask is not None:
+            loglik = np.where(mask, loglik, 0.0)
+        return np.sum(loglik, axis=0)
 
 
 class KrwNormModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
@@ -194,17 +590,6 @@ class KrwNormModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
         self.set_observation_space(n_obs)
         agent = KrwNormAgent(n_obs=n_obs, seed=seed)
 
-        def initializer(seed):
-            return {
-                "tauSq": stats.expon.rvs(random_state=seed),
-                "sigmaRSq": stats.expon.rvs(random_state=seed),
-                "w": stats.norm.rvs(size=n_obs, random_state=seed),
-                "sigma": stats.expon.rvs(random_state=seed),
-                "b0": stats.norm.rvs(random_state=seed),
-                "b1": stats.norm.rvs(size=n_obs, random_state=seed),
-                "sigmaWInit": 1,
-            }
-
         self.param_bounds = {
             "tauSq": (0, None),
             "sigmaRSq": (0, None),
@@ -216,5 +601,16 @@ class KrwNormModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
         }
 
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
+
+    def _initializer(self, seed):
+        return {
+            "tauSq": stats.expon.rvs(random_state=seed),
+            "sigmaRSq": stats.expon.rvs(random_state=seed),
+            "w": stats.norm.rvs(size=self.n_obs(), random_state=seed),
+            "sigma": stats.expon.rvs(random_state=seed),
+            "b0": stats.norm.rvs(random_state=seed),
+            "b1": stats.norm.rvs(size=self.n_obs(), random_state=seed),
+            "sigmaWInit": 1,
+        }
@@ -3,8 +3,10 @@ import gym
 from gym import spaces
 from scipy import stats
 from cognibench.distr import NormalRV
+from cognibench import settings
 from cognibench.models import CNBAgent
 from cognibench.models.policy_model import PolicyModel
+from cognibench.models import recursions
 from cognibench.capabilities import (
     ProducesPolicy,
     ContinuousAction,
@@ -16,6 +18,9 @@ from overrides import overrides
 
 
 class LSSPDAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObservation):
+    param_fields = ("w", "alpha", "sigma", "b0", "b1", "mix_coef", "eta", "kappa")
+    hidden_state_fields = ("w", "alpha")
+
     def __init__(self, *args, n_obs, **kwargs):
         """
         Parameters
@@ -74,8 +79,9 @@ class LSSPDAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObservat
         return self.eval_policy(*args, **kwargs).rvs()
 
     def _predict_reward(self, stimulus):
-        assert self.get_observation_space().contains(stimulus)
-        w_curr = self.get_hidden_state()["w"]
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
+        w_curr = self._hidden_state.w
         rhat = np.dot(stimulus, w_curr.T)
         return rhat
 
@@ -100,18 +106,17 @@ class LSSPDAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObservat
         done : bool
             If True, do not update the hidden state.
         """
-        assert self.get_action_space().contains(action)
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_action_space().contains(action)
+            assert self.get_observation_space().contains(stimulus)
 
-        eta = self.get_paras()[
-            "eta"
-        ]  # Proportion of pred. error. in the updated associability value
-        kappa = self.get_paras()[
-            "kappa"
-        ]  # Fixed learning rate for the cue weight update
+        # proportion of prediction error in the updated associability value
+        eta = self._paras.eta
+        # fixed learning rate for the cue weight update
+        kappa = self._paras.kappa
 
-        w_curr = self.get_hidden_state()["w"]
-        alpha = self.get_hidden_state()["alpha"]
+        w_curr = self._hidden_state.w
+        alpha = self._hidden_state.alpha
 
         rhat = self._predict_reward(stimulus)
 
@@ -123,11 +128,205 @@ class LSSPDAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObservat
             alpha += stimulus * (eta * abs(delta) - eta * alpha)
             alpha = np.minimum(alpha, 1)
 
-            self.get_hidden_state()["w"] = w_curr
-            self.get_hidden_state()["alpha"] = alpha
+            self._hidden_state.w = w_curr
+            self._hidden_state.alpha = alpha
 
         return w_curr, alpha
 
+    def eval_policy_sequence(self, stimuli, rewards):
+        """
+        Get the action random variables of a whole sequence of trials as a single :class:`cognibench.distr.NormalRV`
+        whose mean is an array with one entry per trial. The hidden state is updated as if `eval_policy` and `update`
+        were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        Returns
+        -------
+        :class:`cognibench.distr.NormalRV`
+            Normal random variable of the actions of every trial.
+        """
+        eta = self._paras.eta
+        kappa = self._paras.kappa
+        b0 = self._paras.b0
+        b1 = self._paras.b1
+        sd_pred = self._paras.sigma
+        mix_coef = self._paras.mix_coef
+
+        w_curr = self._hidden_state.w
+        alpha = self._hidden_state.alpha
+
+        stimuli = np.asarray(stimuli, dtype=np.float64)
+        if recursions.numba_enabled():
+            mu_pred = recursions.lsspd_mean(
+                stimuli.reshape(len(stimuli), self.n_obs()),
+                np.asarray(rewards, dtype=np.float64),
+                w_curr,
+                alpha,
+                float(b0),
+                recursions.as_vector(b1, self.n_obs()),
+                float(eta),
+                float(kappa),
+                float(mix_coef),
+            )
+        else:
+            mu_pred = np.empty(len(stimuli), dtype=np.float64)
+            for i, (s, r) in enumerate(zip(stimuli, rewards)):
+                mu_pred[i] = b0 + np.dot(
+                    b1, s * (mix_coef * w_curr + (1 - mix_coef) * alpha)
+                )
+
+                delta = r - np.dot(s, w_curr)
+                w_curr += kappa * delta * alpha * s
+                alpha += s * (eta * abs(delta) - eta * alpha)
+                np.minimum(alpha, 1, out=alpha)
+
+        rv = NormalRV(loc=mu_pred, scale=sd_pred)
+        rv.random_state = self.rng
+        return rv
+
+    def sequence_loglik(self, stimuli, rewards, actions):
+        """
+        Compute the log-likelihood of each action in the given sequence of trials and update the hidden state as if
+        `eval_policy` and `update` were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+        """
+        rv = self.eval_policy_sequence(stimuli, rewards)
+        return rv.logpdf(np.asarray(actions, dtype=np.float64))
+
+    def sequence_loglik_grad(self, stimuli, rewards, actions):
+        """
+        Compute the per-trial log-likelihoods as in `sequence_loglik` together with the exact gradient of their sum
+        with respect to each agent parameter. The gradient is computed by propagating the derivatives of the weight
+        and associability vectors with respect to the parameters (forward-mode sensitivities) alongside the trials.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        loglik : :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+
+        grad : dict
+            Dictionary mapping each parameter name to the derivative of the total log-likelihood. Each derivative has
+            the same shape as the corresponding parameter.
+        """
+        paras = self.get_paras()
+        eta = paras["eta"]
+        kappa = paras["kappa"]
+        b0 = paras["b0"]
+        b1 = paras["b1"]
+        sd_pred = paras["sigma"]
+        mix_coef = paras["mix_coef"]
+
+        w_curr = self._hidden_state.w
+        alpha = self._hidden_state.alpha
+
+        # columns of the sensitivity matrices: initial w, initial alpha, eta, kappa
+        n_obs = len(w_curr)
+        w_cols = slice(0, n_obs)
+        alpha_cols = slice(n_obs, 2 * n_obs)
+        eta_col, kappa_col = 2 * n_obs, 2 * n_obs + 1
+
+        stimuli = np.asarray(stimuli, dtype=np.float64)
+        n_trials = len(actions)
+        if recursions.numba_enabled():
+            mu_pred, dmu_dstate, dmu_db1, dmu_dmix = recursions.lsspd_mean_grad(
+                stimuli.reshape(n_trials, n_obs),
+                np.asarray(rewards, dtype=np.float64),
+                w_curr,
+                alpha,
+                float(b0),
+                recursions.as_vector(b1, n_obs),
+                float(eta),
+                float(kappa),
+                float(mix_coef),
+            )
+        else:
+            dw = np.zeros((n_obs, 2 * n_obs + 2))
+            dw[:, w_cols] = np.identity(n_obs)
+            dalpha = np.zeros((n_obs, 2 * n_obs + 2))
+            dalpha[:, alpha_cols] = np.identity(n_obs)
+
+            mu_pred = np.empty(n_trials, dtype=np.float64)
+            dmu_dstate = np.empty((n_trials, 2 * n_obs + 2), dtype=np.float64)
+            dmu_db1 = np.empty((n_trials, n_obs), dtype=np.float64)
+            dmu_dmix = np.empty(n_trials, dtype=np.float64)
+            for i, (s, r) in enumerate(zip(stimuli, rewards)):
+                b1_s = b1 * s
+                dmu_db1[i] = s * (mix_coef * w_curr + (1 - mix_coef) * alpha)
+                mu_pred[i] = b0 + np.dot(b1, dmu_db1[i])
+                dmu_dstate[i] = np.dot(b1_s, mix_coef * dw + (1 - mix_coef) * dalpha)
+                dmu_dmix[i] = np.dot(b1_s, w_curr - alpha)
+
+                delta = r - np.dot(s, w_curr)
+                ddelta = -np.dot(s, dw)
+
+                dw_next = dw + kappa * (
+                    np.outer(alpha * s, ddelta) + delta * s[:, None] * dalpha
+                )
+                dw_next[:, kappa_col] += delta * alpha * s
+                dalpha_next = (1 - eta * s)[:, None] * dalpha + eta * np.outer(
+                    s * np.sign(delta), ddelta
+                )
+                dalpha_next[:, eta_col] += s * (abs(delta) - alpha)
+
+                w_curr += kappa * delta * alpha * s
+                alpha += s * (eta * abs(delta) - eta * alpha)
+                dalpha_next[alpha > 1] = 0
+                np.minimum(alpha, 1, out=alpha)
+                dw, dalpha = dw_next, dalpha_next
+
+        actions = np.asarray(actions, dtype=np.float64)
+        rv = NormalRV(loc=mu_pred, scale=sd_pred)
+        dll_dmu, dll_dsigma = rv.logpdf_grad(actions)
+
+        grad_state = np.dot(dll_dmu, dmu_dstate)
+        grad_w = grad_state[w_cols]
+        grad_alpha = grad_state[alpha_cols]
+        grad_b1 = np.dot(dll_dmu, dmu_db1)
+        grad = {
+            "w": grad_w if is_arraylike(paras["w"]) else np.sum(grad_w),
+            "alpha": grad_alpha if is_arraylike(paras["alpha"]) else np.sum(grad_alpha),
+            "sigma": np.sum(dll_dsigma),
+            "b0": np.sum(dll_dmu),
+            "b1": grad_b1 if is_arraylike(b1) else np.sum(grad_b1),
+            "mix_coef": np.dot(dll_dmu, dmu_dmix),
+            "eta": grad_state[eta_col],
+            "kappa": grad_state[kappa_col],
+        }
+        return rv.logpdf(actions), grad
+
     @overrides
     def eval_policy(self, stimulus):
         """
@@ -145,15 +344,16 @@ class LSSPDAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObservat
             reward using b0 and b1 parameters, and standard deviation equal
             to sigma model parameter.
         """
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
 
-        b0 = self.get_paras()["b0"]
-        b1 = self.get_paras()["b1"]
-        sd_pred = self.get_paras()["sigma"]
-        mix_coef = self.get_paras()["mix_coef"]
+        b0 = self._paras.b0
+        b1 = self._paras.b1
+        sd_pred = self._paras.sigma
+        mix_coef = self._paras.mix_coef
 
-        w_curr = self.get_hidden_state()["w"]
-        alpha = self.get_hidden_state()["alpha"]
+        w_curr = self._hidden_state.w
+        alpha = self._hidden_state.alpha
 
         # Predict response
         mu_pred = b0 + np.dot(
@@ -172,8 +372,8 @@ class LSSPDAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObservat
         """
         self.set_hidden_state(
             {
-                "w": self.get_paras()["w"] * np.ones(self.n_obs()),
-                "alpha": self.get_paras()["alpha"] * np.ones(self.n_obs()),
+                "w": self._paras.w * np.ones(self.n_obs()),
+                "alpha": self._paras.alpha * np.ones(self.n_obs()),
             }
         )
 
@@ -192,18 +392,6 @@ class LSSPDModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
         self.set_observation_space(n_obs)
         agent = LSSPDAgent(n_obs=n_obs, seed=seed)
 
-        def initializer(seed):
-            return {
-                "w": stats.norm.rvs(random_state=seed),
-                "alpha": stats.uniform.rvs(random_state=seed),
-                "sigma": stats.uniform.rvs(random_state=seed),
-                "b0": stats.norm.rvs(random_state=seed),
-                "b1": stats.norm.rvs(size=n_obs, random_state=seed),
-                "mix_coef": stats.uniform.rvs(random_state=seed),
-                "eta": 1e-3,
-                "kappa": 1e-3,
-            }
-
         self.param_bounds = {
             "w": [-10, 10],
             "alpha": [0, 1],
@@ -216,5 +404,17 @@ class LSSPDModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
         }
 
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
+
+    def _initializer(self, seed):
+        return {
+            "w": stats.norm.rvs(random_state=seed),
+            "alpha": stats.uniform.rvs(random_state=seed),
+            "sigma": stats.uniform.rvs(random_state=seed),
+            "b0": stats.norm.rvs(random_state=seed),
+            "b1": stats.norm.rvs(size=self.n_obs(), random_state=seed),
+            "mix_coef": stats.uniform.rvs(random_state=seed),
+            "eta": 1e-3,
+            "kappa": 1e-3,
+        }
@@ -3,6 +3,7 @@ import gym
 from gym import spaces
 from scipy import stats
 from cognibench.distr import NormalRV
+from cognibench import settings
 from cognibench.models import CNBAgent
 from cognibench.models.policy_model import PolicyModel
 from cognibench.capabilities import (
@@ -24,6 +25,9 @@ class RandomRespondAgent(
 
     name = "RandomRespond"
 
+    param_fields = ("mu", "sigma")
+    hidden_state_fields = ()
+
     @overrides
     def __init__(self, *args, n_obs, **kwargs):
         """
@@ -66,10 +70,11 @@ class RandomRespondAgent(
             Normal random variable with mean equal to reward and
             standard deviation equal to sigma model parameter.
         """
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
 
-        mu_pred = self.get_paras()["mu"]
-        sd_pred = self.get_paras()["sigma"]
+        mu_pred = self._paras.mu
+        sd_pred = self._paras.sigma
 
         rv = NormalRV(loc=mu_pred, scale=sd_pred)
         rv.random_state = self.rng
@@ -107,8 +112,58 @@ class RandomRespondAgent(
         action : float
             The action performed by the model.
         """
-        assert self.get_action_space().contains(action)
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_action_space().contains(action)
+            assert self.get_observation_space().contains(stimulus)
+
+    def eval_policy_sequence(self, stimuli, rewards):
+        """
+        Get the action random variables of a whole sequence of trials as a single :class:`cognibench.distr.NormalRV`
+        whose mean is an array with one entry per trial. The hidden state is updated as if `eval_policy` and `update`
+        were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        Returns
+        -------
+        :class:`cognibench.distr.NormalRV`
+            Normal random variable of the actions of every trial.
+        """
+        mu_pred = np.full(len(stimuli), self._paras.mu, dtype=np.float64)
+        sd_pred = self._paras.sigma
+        rv = NormalRV(loc=mu_pred, scale=sd_pred)
+        rv.random_state = self.rng
+        return rv
+
+    def sequence_loglik(self, stimuli, rewards, actions):
+        """
+        Compute the log-likelihood of each action in the given sequence of trials. Since the agent has no hidden
+        state, the computation is fully vectorized over the trials.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+        """
+        rv = self.eval_policy_sequence(stimuli, rewards)
+        return rv.logpdf(np.asarray(actions, dtype=np.float64))
 
 
 class RandomRespondModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
@@ -124,12 +179,12 @@ class RandomRespondModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
         self.set_observation_space(n_obs)
         agent = RandomRespondAgent(n_obs=n_obs, seed=seed)
 
-        def initializer(seed):
-            return {
-                "mu": stats.norm.rvs(scale=0, random_state=seed),
-                "sigma": stats.expon.rvs(scale=2, random_state=seed),
-            }
-
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
+
+    def _initializer(self, seed):
+        return {
+            "mu": stats.norm.rvs(scale=0, random_state=seed),
+            "sigma": stats.expon.rvs(scale=2, random_state=seed),
+        }
@@ -3,8 +3,10 @@ import gym
 from gym import spaces
 from scipy import stats
 from cognibench.distr import NormalRV
+from cognibench import settings
 from cognibench.models import CNBAgent
 from cognibench.models.policy_model import PolicyModel
+from cognibench.models import recursions
 from cognibench.capabilities import (
     ProducesPolicy,
     ContinuousAction,
@@ -16,6 +18,9 @@ from overrides import overrides
 
 
 class RwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObservation):
+    param_fields = ("w", "sigma", "b0", "b1", "eta")
+    hidden_state_fields = ("w",)
+
     def __init__(self, *args, n_obs, **kwargs):
         """
         Parameters
@@ -68,8 +73,9 @@ class RwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObserva
         return self.eval_policy(*args, **kwargs).rvs()
 
     def _predict_reward(self, stimulus):
-        assert self.get_observation_space().contains(stimulus)
-        w_curr = self.get_hidden_state()["w"]
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
+        w_curr = self._hidden_state.w
         rhat = np.dot(stimulus, w_curr.T)
         return rhat
 
@@ -94,21 +100,219 @@ class RwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObserva
         done : bool
             If True, do not update the hidden state.
         """
-        assert self.get_action_space().contains(action)
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_action_space().contains(action)
+            assert self.get_observation_space().contains(stimulus)
 
-        eta = self.get_paras()["eta"]
-        w_curr = self.get_hidden_state()["w"]
+        eta = self._paras.eta
+        w_curr = self._hidden_state.w
 
         rhat = self._predict_reward(stimulus)
 
         if not done:
             delta = reward - rhat
             w_curr += eta * delta * stimulus
-            self.get_hidden_state()["w"] = w_curr
+            self._hidden_state.w = w_curr
 
         return w_curr
 
+    def eval_policy_sequence(self, stimuli, rewards):
+        """
+        Get the action random variables of a whole sequence of trials as a single :class:`cognibench.distr.NormalRV`
+        whose mean is an array with one entry per trial. The hidden state is updated as if `eval_policy` and `update`
+        were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        Returns
+        -------
+        :class:`cognibench.distr.NormalRV`
+            Normal random variable of the actions of every trial.
+        """
+        eta = self._paras.eta
+        b0 = self._paras.b0
+        b1 = self._paras.b1
+        sd_pred = self._paras.sigma
+
+        w_curr = self._hidden_state.w
+
+        stimuli = np.asarray(stimuli, dtype=np.float64)
+        if recursions.numba_enabled():
+            mu_pred = recursions.rw_norm_mean(
+                stimuli.reshape(len(stimuli), self.n_obs()),
+                np.asarray(rewards, dtype=np.float64),
+                w_curr,
+                float(b0),
+                recursions.as_vector(b1, self.n_obs()),
+                float(eta),
+            )
+        else:
+            mu_pred = np.empty(len(stimuli), dtype=np.float64)
+            for i, (s, r) in enumerate(zip(stimuli, rewards)):
+                mu_pred[i] = b0 + np.dot(b1, s * w_curr)
+                w_curr += eta * (r - np.dot(s, w_curr)) * s
+
+        rv = NormalRV(loc=mu_pred, scale=sd_pred)
+        rv.random_state = self.rng
+        return rv
+
+    def sequence_loglik(self, stimuli, rewards, actions):
+        """
+        Compute the log-likelihood of each action in the given sequence of trials and update the hidden state as if
+        `eval_policy` and `update` were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+        """
+        rv = self.eval_policy_sequence(stimuli, rewards)
+        return rv.logpdf(np.asarray(actions, dtype=np.float64))
+
+    def sequence_loglik_grad(self, stimuli, rewards, actions):
+        """
+        Compute the per-trial log-likelihoods as in `sequence_loglik` together with the exact gradient of their sum
+        with respect to each agent parameter. The gradient is computed by propagating the derivatives of the weight
+        vector with respect to the parameters (forward-mode sensitivities) alongside the trials.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        loglik : :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+
+        grad : dict
+            Dictionary mapping each parameter name to the derivative of the total log-likelihood. Each derivative has
+            the same shape as the corresponding parameter.
+        """
+        paras = self.get_paras()
+        eta = paras["eta"]
+        b0 = paras["b0"]
+        b1 = paras["b1"]
+        sd_pred = paras["sigma"]
+
+        w_curr = self._hidden_state.w
+        n_obs = len(w_curr)
+
+        stimuli = np.asarray(stimuli, dtype=np.float64)
+        n_trials = len(actions)
+        if recursions.numba_enabled():
+            mu_pred, dmu_dw0, dmu_db1, dmu_deta = recursions.rw_norm_mean_grad(
+                stimuli.reshape(n_trials, n_obs),
+                np.asarray(rewards, dtype=np.float64),
+                w_curr,
+                float(b0),
+                recursions.as_vector(b1, n_obs),
+                float(eta),
+            )
+        else:
+            dw_dw0 = np.identity(n_obs)
+            dw_deta = np.zeros(n_obs)
+            mu_pred = np.empty(n_trials, dtype=np.float64)
+            dmu_dw0 = np.empty((n_trials, n_obs), dtype=np.float64)
+            dmu_db1 = np.empty((n_trials, n_obs), dtype=np.float64)
+            dmu_deta = np.empty(n_trials, dtype=np.float64)
+            for i, (s, r) in enumerate(zip(stimuli, rewards)):
+                b1_s = b1 * s
+                dmu_db1[i] = s * w_curr
+                mu_pred[i] = b0 + np.dot(b1, dmu_db1[i])
+                dmu_dw0[i] = np.dot(b1_s, dw_dw0)
+                dmu_deta[i] = np.dot(b1_s, dw_deta)
+
+                delta = r - np.dot(s, w_curr)
+                dw_deta += delta * s - eta * np.dot(s, dw_deta) * s
+                dw_dw0 -= eta * np.outer(s, np.dot(s, dw_dw0))
+                w_curr += eta * delta * s
+
+        actions = np.asarray(actions, dtype=np.float64)
+        rv = NormalRV(loc=mu_pred, scale=sd_pred)
+        dll_dmu, dll_dsigma = rv.logpdf_grad(actions)
+
+        grad_w = np.dot(dll_dmu, dmu_dw0)
+        grad_b1 = np.dot(dll_dmu, dmu_db1)
+        grad = {
+            "w": grad_w if is_arraylike(paras["w"]) else np.sum(grad_w),
+            "sigma": np.sum(dll_dsigma),
+            "b0": np.sum(dll_dmu),
+            "b1": grad_b1 if is_arraylike(b1) else np.sum(grad_b1),
+            "eta": np.dot(dll_dmu, dmu_deta),
+        }
+        return rv.logpdf(actions), grad
+
+    def batch_negloglike(self, paras, stimuli, rewards, actions):
+        """
+        Compute the negative log-likelihood of the given sequence of trials for a batch of K parameter settings at
+        once. K weight vectors, each reset using its own parameters, are advanced in lockstep, so the cost of a batch
+        is close to the cost of a single `sequence_loglik` call for moderate K. The agent parameters and hidden state
+        are not modified.
+
+        Parameters
+        ----------
+        paras : dict
+            Dictionary mapping each parameter name ('w', 'sigma', 'b0', 'b1', 'eta') to an array whose first axis has
+            length K. Values of 'w' and 'b1' may have shape (K,) or (K, n_obs).
+
+        stimuli : array-like
+            Sequence of stimuli from the multi-binary observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the continuous action space.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Negative log-likelihood of each of the K parameter settings.
+        """
+        sigma, b0, eta = (
+            np.asarray(paras[k], dtype=np.float64) for k in ("sigma", "b0", "eta")
+        )
+        K = len(sigma)
+        w_curr = np.empty((K, self.n_obs()), dtype=np.float64)
+        w_curr[:] = np.reshape(paras["w"], (K, -1))
+        b1 = np.reshape(np.asarray(paras["b1"], dtype=np.float64), (K, -1))
+        eta = eta[:, None]
+
+        stimuli = np.asarray(stimuli, dtype=np.float64)
+        mu_pred = np.empty((len(actions), K), dtype=np.float64)
+        for i, (s, r) in enumerate(zip(stimuli, rewards)):
+            mu_pred[i] = np.dot(b1 * w_curr, s)
+            w_curr += eta * (r - np.dot(w_curr, s))[:, None] * s
+        mu_pred += b0
+
+        actions = np.asarray(actions, dtype=np.float64)[:, None]
+        loglik = NormalRV(loc=mu_pred, scale=sigma).logpdf(actions)
+        return -np.sum(loglik, axis=0)
+
     @overrides
     def eval_policy(self, stimulus):
         """
@@ -127,13 +331,14 @@ class RwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObserva
             to sigma model parameter.
         """
         assert self.get_hidden_state(), "hidden state must be set"
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
 
-        b0 = self.get_paras()["b0"]  # intercept
-        b1 = self.get_paras()["b1"]  # slope
-        sd_pred = self.get_paras()["sigma"]
+        b0 = self._paras.b0  # intercept
+        b1 = self._paras.b1  # slope
+        sd_pred = self._paras.sigma
 
-        w_curr = self.get_hidden_state()["w"]
+        w_curr = self._hidden_state.w
 
         # Predict response
         mu_pred = b0 + np.dot(b1, stimulus * w_curr)
@@ -148,8 +353,8 @@ class RwNormAgent(CNBAgent, ProducesPolicy, ContinuousAction, MultiBinaryObserva
         """
         Reset the hidden state to its default value.
         """
-        w = self.get_paras()["w"]
-        self.set_hidden_state({"w": w})
+        w = self._paras.w
+        self.set_hidden_state({"w": np.full(self.n_obs(), w, dtype=np.float64)})
 
 
 class RwNormModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
@@ -165,15 +370,6 @@ class RwNormModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
         self.set_observation_space(n_obs)
         agent = RwNormAgent(n_obs=n_obs, seed=seed)
 
-        def initializer(seed):
-            return {
-                "w": stats.norm.rvs(size=n_obs, random_state=seed),
-                "sigma": stats.expon.rvs(random_state=seed),
-                "b0": stats.norm.rvs(random_state=seed),
-                "b1": stats.norm.rvs(size=n_obs, random_state=seed),
-                "eta": 1e-3,
-            }
-
         self.param_bounds = {
             "w": [None] * 2 * n_obs,
             "sigma": (0, None),
@@ -183,5 +379,14 @@ class RwNormModel(PolicyModel, ContinuousAction, MultiBinaryObservation):
         }
 
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
+
+    def _initializer(self, seed):
+        return {
+            "w": stats.norm.rvs(size=self.n_obs(), random_state=seed),
+            "sigma": stats.expon.rvs(random_state=seed),
+            "b0": stats.norm.rvs(random_state=seed),
+            "b1": stats.norm.rvs(size=self.n_obs(), random_state=seed),
+            "eta": 1e-3,
+        }
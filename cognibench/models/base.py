@@ -1,8 +1,10 @@
 import sciunit
 import numpy as np
-from gym.utils import seeding
 from overrides import overrides
-from collections import Mapping
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from cognibench.settings import settings
+from cognibench.utils import make_rng, int_seed, BufferedRNG
 
 
 class CNBModel(sciunit.Model):
@@ -19,9 +21,9 @@ class CNBModel(sciunit.Model):
         """
         Parameters
         ----------
-        seed : int
-            Random seed. Must be a nonnegative integer. If seed is None,
-            random state is set randomly by gym.utils.seeding. (Default: None)
+        seed : int or :class:`numpy.random.SeedSequence`
+            Random seed. Must be a nonnegative integer or a seed sequence, e.g. one returned by
+            :py:func:`cognibench.utils.spawn_seeds`. If seed is None, random state is set randomly. (Default: None)
 
         param_initializer : dict or callable
             Initializer for model parameters. If a dictionary, it must be a mapping from model parameters to initial
@@ -35,11 +37,25 @@ class CNBModel(sciunit.Model):
         self.param_initializer = param_initializer
         super().__init__(**kwargs)
 
+    def __getstate__(self):
+        """
+        Return the instance dictionary, including private attributes such as the parameters, hidden state and random
+        number generator, so that models survive pickling, e.g. when they are sent to worker processes. Attributes listed
+        in `unpicklable` are left out.
+        """
+        state = self.__dict__.copy()
+        for key in set(getattr(self, "unpicklable", ())).intersection(state):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
     def get_seed(self):
         """
         Returns
         -------
-        int or None
+        int or :class:`numpy.random.SeedSequence` or None
             Random seed used to initialize the random number generator.
             Seed is None only if it was omitted during model initialization.
         """
@@ -50,16 +66,18 @@ class CNBModel(sciunit.Model):
         """
         Returns
         -------
-        :class:`numpy.random.RandomState`
-            Random number generator state. Use this object as an np.random
+        :class:`cognibench.utils.BufferedRNG` or :class:`numpy.random.Generator`
+            Random number generator using the PCG64 bit generator. Use this object as an np.random
             replacement to generate random numbers. This way, you can reproduce
-            your results if you always use the same seed during model initialization.
+            your results if you always use the same seed during model initialization. Unless the "RNG_BLOCK_SIZE"
+            setting in :py:data:`cognibench.settings` is None, single uniform and normal samples are served from
+            blocks drawn in advance.
         """
         return self._rng
 
     def set_seed(self, value):
         self._seed = value
-        self._rng, _ = seeding.np_random(seed=value)
+        self._rng = _make_model_rng(value)
 
     def fit(self, *args, **kwargs):
         """
@@ -92,9 +110,15 @@ class CNBModel(sciunit.Model):
         """
         pass
 
-    def init_paras(self):
+    def init_paras(self, seed=None):
         """
         Initialize model parameters using `self.param_initializer`.
+
+        Parameters
+        ----------
+        seed : int or :class:`numpy.random.SeedSequence` (optional)
+            Seed passed to a callable `self.param_initializer`. If None, the model seed is used. Seed sequences are
+            converted to integers with :py:func:`cognibench.utils.int_seed`.
         """
         if self.param_initializer is None:
             raise ValueError(
@@ -103,7 +127,9 @@ class CNBModel(sciunit.Model):
         if isinstance(self.param_initializer, Mapping):
             paras = self.param_initializer
         else:
-            paras = self.param_initializer(seed=self.get_seed())
+            paras = self.param_initializer(
+                seed=int_seed(self.get_seed() if seed is None else seed)
+            )
         self.set_paras(paras)
 
     def set_paras(self, paras_dict):
@@ -131,8 +157,18 @@ class CNBAgent:
 
     In `cognibench`, an agent is a way of interacting with environments through `act` and `update` methods while possibly
     storing some hidden state.
+
+    Agents may declare the names of their parameters and hidden state variables in the `param_fields` and
+    `hidden_state_fields` class attributes. Parameters and hidden state of such agents are stored as :class:`Record`
+    objects with one slot per name, which agent methods can read as attributes (`self._paras.eta`,
+    `self._hidden_state.Q`) without going through a method call and a dictionary lookup. Records are mutable mappings,
+    so `get_paras` and `get_hidden_state` can still be used as dictionaries. If the fields are not declared, plain
+    dictionaries are stored.
     """
 
+    param_fields = None
+    hidden_state_fields = None
+
     def __init__(self, *args, paras_dict=None, seed=None, **kwargs):
         """
         Parameters
@@ -140,18 +176,32 @@ class CNBAgent:
         paras_dict : dict
             Dictionary storing agent parameters.
 
-        seed : int
+        seed : int or :class:`numpy.random.SeedSequence`
             Random seed to use.
         """
         self.set_seed(seed)
         self.set_paras(paras_dict)
         super().__init__(*args, **kwargs)
 
+    def __getstate__(self):
+        """
+        Return the instance dictionary, including private attributes such as the parameters, hidden state and random
+        number generator, so that agents survive pickling, e.g. when they are sent to worker processes. Attributes listed
+        in `unpicklable` are left out.
+        """
+        state = self.__dict__.copy()
+        for key in set(getattr(self, "unpicklable", ())).intersection(state):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
     def get_seed(self):
         """
         Returns
         -------
-        int or None
+        int or :class:`numpy.random.SeedSequence` or None
             Random seed used to initialize the random number generator.
             Seed is None only if it was omitted during model initialization.
         """
@@ -162,16 +212,18 @@ class CNBAgent:
         """
         Returns
         -------
-        :class:`numpy.random.RandomState`
-            Random number generator state. Use this object as an np.random
+        :class:`cognibench.utils.BufferedRNG` or :class:`numpy.random.Generator`
+            Random number generator using the PCG64 bit generator. Use this object as an np.random
             replacement to generate random numbers. This way, you can reproduce
-            your results if you always use the same seed during model initialization.
+            your results if you always use the same seed during model initialization. Unless the "RNG_BLOCK_SIZE"
+            setting in :py:data:`cognibench.settings` is None, single uniform and normal samples are served from
+            blocks drawn in advance.
         """
         return self._rng
 
     def set_seed(self, value):
         self._seed = value
-        self._rng, _ = seeding.np_random(seed=value)
+        self._rng = _make_model_rng(value)
 
     def act(self, *args, **kwargs):
         """
@@ -199,7 +251,7 @@ class CNBAgent:
         return self._paras
 
     def set_paras(self, paras_dict):
-        self._paras = paras_dict
+        self._paras = _as_record(self.param_fields, paras_dict)
         if paras_dict is not None:
             self.reset()
 
@@ -207,4 +259,265 @@ class CNBAgent:
         return self._hidden_state
 
     def set_hidden_state(self, state):
-        self._hidden_state = state
+        self._hidden_state = _as_record(self.hidden_state_fields, state)
+
+
+def _make_model_rng(seed):
+    """
+    Create the random number generator of a model or an agent according to the "RNG_BLOCK_SIZE" setting.
+    """
+    rng = make_rng(seed)
+    block_size = settings["RNG_BLOCK_SIZE"]
+    return rng if block_size is None else BufferedRNG(rng, block_size=block_size)
+
+
+class Record(MutableMapping):
+    """
+    Mutable mapping with a fixed set of string keys stored in slots.
+
+    Values can be accessed both as items (`record["eta"]`) and as attributes (`record.eta`); attribute access is the
+    fast path. Fields that have not been assigned are not part of the mapping. Use :py:func:`make_record` to create
+    records.
+    """
+
+    __slots__ = ()
+    _fields = frozenset()
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(f"{key!r} is not one of the fields {self.__slots__}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return (k for k in self.__slots__ if hasattr(self, k))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        return key in self._fields and hasattr(self, key)
+
+    def copy(self):
+        return make_record(self.__slots__, self)
+
+    def __repr__(self):
+        return f"Record({dict(self)!r})"
+
+    def __reduce__(self):
+        return make_record, (self.__slots__, dict(self))
+
+
+_RECORD_TYPES = {}
+
+
+def make_record(fields, values=None):
+    """
+    Create a :class:`Record` with the given fields.
+
+    Parameters
+    ----------
+    fields : tuple of str
+        Names of the fields. Records with the same fields share a class.
+
+    values : mapping (optional)
+        Initial values of some or all of the fields.
+
+    Returns
+    -------
+    :class:`Record`
+        New record.
+    """
+    fields = tuple(fields)
+    cls = _RECORD_TYPES.get(fields)
+    if cls is None:
+        cls = type(
+            "Record", (Record,), {"__slots__": fields, "_fields": frozenset(fields)}
+        )
+        _RECORD_TYPES[fields] = cls
+    record = cls()
+    if values is not None:
+        for k, v in values.items():
+            record[k] = v
+    return record
+
+
+def _as_record(fields, values):
+    """
+    Return `values` as a record with the given fields. Records of the right type are returned as is, so that setting
+    the object returned by a getter restores it; `values` is also returned as is if `fields` or `values` is None.
+    """
+    if fields is None or values is None:
+        return values
+    if isinstance(values, Record) and values.__slots__ == tuple(fields):
+        return values
+    return make_record(fields, values)
+
+
+class MemoizedPolicy:
+    """
+    Mixin for policy producing agents whose policy depends only on the parameters and a small discrete part of the
+    hidden state, such as the previous action and reward.
+
+    Subclasses implement `policy_key(stimulus)`, returning a hashable key that determines the policy for the given
+    stimulus under the current parameters, and `_build_policy(stimulus)`, returning a new policy object. `eval_policy`
+    then returns cached policy objects, building them only the first time a key is seen. The cache holds at most
+    `policy_cache_size` policies with the least recently used ones evicted first, and it is cleared whenever the
+    parameters or the hidden state are replaced (`set_paras`, `reset`, `set_hidden_state`). Code that modifies the
+    parameter dictionary in place must call `reset` or `clear_policy_cache` afterwards.
+
+    Cached policies are shared between calls and must not be modified by the caller.
+    """
+
+    policy_cache_size = 128
+
+    def policy_key(self, stimulus):
+        """
+        Return a hashable key identifying the policy for the given stimulus under the current parameters.
+        """
+        raise NotImplementedError("Must implement policy_key.")
+
+    def _build_policy(self, stimulus):
+        raise NotImplementedError("Must implement _build_policy.")
+
+    def eval_policy(self, stimulus):
+        """
+        Return the policy for the given stimulus, building it only if there is no cached policy for its key.
+        """
+        cache = self._policy_cache
+        key = self.policy_key(stimulus)
+        rv = cache.get(key)
+        if rv is None:
+            rv = self._build_policy(stimulus)
+            cache[key] = rv
+            if len(cache) > self.policy_cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        rv.random_state = self.rng
+        return rv
+
+    def clear_policy_cache(self):
+        """
+        Remove all cached policy objects.
+        """
+        self._policy_cache = OrderedDict()
+
+    def set_paras(self, paras_dict):
+        self.clear_policy_cache()
+        super().set_paras(paras_dict)
+
+    def set_hidden_state(self, state):
+        self.clear_policy_cache()
+        super().set_hidden_state(state)
+
+
+class FitReport:
+    """
+    Diagnostics of a model fitting procedure, such as the one returned by
+    :py:meth:`cognibench.models.policy_model.PolicyModel.fit`.
+    """
+
+    def __init__(
+        self,
+        n_fev,
+        n_jev,
+        eval_time,
+        wall_time,
+        trace,
+        success,
+        message,
+        fun=None,
+        n_iter=None,
+    ):
+        """
+        Parameters
+        ----------
+        n_fev : int
+            Number of objective function evaluations.
+
+        n_jev : int
+            Number of gradient evaluations. Evaluations done together with the objective function are also counted.
+
+        eval_time : float
+            Total time in seconds spent evaluating the objective function (and its gradient).
+
+        wall_time : float
+            Total time in seconds spent in the optimization procedure.
+
+        trace : list of float
+            Objective function value after each iteration of the optimizer. Values are taken from the evaluations
+            done by the optimizer; an iteration whose point has not been evaluated is recorded as NaN.
+
+        success : bool
+            Whether the optimizer has terminated successfully.
+
+        message : str
+            Termination reason reported by the optimizer.
+
+        fun : float (optional)
+            Final objective function value.
+
+        n_iter : int (optional)
+            Number of iterations performed by the optimizer.
+        """
+        self.n_fev = n_fev
+        self.n_jev = n_jev
+        self.eval_time = eval_time
+        self.wall_time = wall_time
+        self.trace = trace
+        self.success = success
+        self.message = message.decode() if isinstance(message, bytes) else message
+        self.fun = fun
+        self.n_iter = n_iter
+
+    @property
+    def time_per_eval(self):
+        """
+        Returns
+        -------
+        float
+            Average wall time of a single objective function evaluation in seconds.
+        """
+        return self.eval_time / self.n_fev if self.n_fev > 0 else np.nan
+
+    def to_dict(self):
+        """
+        Returns
+        -------
+        dict
+            Dictionary representation of the report containing only built-in types.
+        """
+        return {
+            "n_fev": int(self.n_fev),
+            "n_jev": int(self.n_jev),
+            "eval_time": float(self.eval_time),
+            "wall_time": float(self.wall_time),
+            "time_per_eval": float(self.time_per_eval),
+            "trace": [float(x) for x in self.trace],
+            "success": bool(self.success),
+            "message": str(self.message),
+            "fun": None if self.fun is None else float(self.fun),
+            "n_iter": None if self.n_iter is None else int(self.n_iter),
+        }
+
+    def __repr__(self):
+        return (
+            f"FitReport(n_fev={self.n_fev}, n_jev={self.n_jev}, time_per_eval={self.time_per_eval:.3g}s, "
+            f"wall_time={self.wall_time:.3g}s, n_iter={self.n_iter}, fun={self.fun}, message={self.message!r})"
+        )
@@ -1,6 +1,7 @@
 from .randomrespond import RandomRespondModel
 from .rwck import RWCKModel, RWModel, CKModel
 from .nwsls import NWSLSModel
+from .rwck_stacked import StackedRWCKModel, StackedRWModel, StackedCKModel
 
 from .randomrespond import RandomRespondAgent
 from .rwck import RWCKAgent
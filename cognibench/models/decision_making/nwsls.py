@@ -2,8 +2,9 @@ import numpy as np
 from gym import spaces
 from scipy import stats
 
-from cognibench.distr import DiscreteRV
-from cognibench.models import CNBAgent
+from cognibench.distr import CategoricalRV
+from cognibench import settings
+from cognibench.models import CNBAgent, MemoizedPolicy
 from cognibench.models.policy_model import PolicyModel
 from cognibench.capabilities import Interactive, PredictsLogpdf
 from cognibench.capabilities import (
@@ -14,11 +15,17 @@ from cognibench.capabilities import (
 from overrides import overrides
 
 
-class NWSLSAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation):
+class NWSLSAgent(
+    MemoizedPolicy, CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation
+):
     """
-    Noisy-win-stay-lose-shift agent implementation.
+    Noisy-win-stay-lose-shift agent implementation. The policy only depends on whether the last trial was a win and
+    on the last action, so policy objects are memoized by these two values.
     """
 
+    param_fields = ("epsilon",)
+    hidden_state_fields = ("win", "action")
+
     @overrides
     def __init__(self, *args, n_action, n_obs, **kwargs):
         """
@@ -44,24 +51,27 @@ class NWSLSAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation):
         Override base class reset behaviour by setting the hidden state to default
         values for NWSLS model.
         """
-        self.set_hidden_state(
-            dict(
-                win=True,
-                action=min(int(self.get_paras()["epsilon"]), self.n_action() - 1),
-            )
-        )
+        action = min(int(self._paras.epsilon), self.n_action() - 1)
+        self.set_hidden_state(dict(win=True, action=action))
 
-    def eval_policy(self, stimulus):
+    def policy_key(self, stimulus):
         """
-        Return a random variable object from the given stimulus.
+        Return the last outcome and the last action, which determine the policy.
         """
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
+        hidden = self.get_hidden_state()
+        return hidden["win"], hidden["action"]
+
+    def _build_policy(self, stimulus):
+        return CategoricalRV.from_probs(self._probs(stimulus))
 
-        epsilon = self.get_paras()["epsilon"]
+    def _probs(self, stimulus):
+        epsilon = self._paras.epsilon
         n = self.n_action()
 
-        a = self.get_hidden_state()["action"]
-        if self.get_hidden_state()["win"]:
+        a = self._hidden_state.action
+        if self._hidden_state.win:
             pk = np.full(n, epsilon / n)
             pk[a] = 1 - (n - 1) * epsilon / n
         else:
@@ -70,14 +80,7 @@ class NWSLSAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation):
             else:
                 pk = np.full(n, (1 - epsilon / n) / (n - 1))
                 pk[a] = epsilon / n
-
-        rv = DiscreteRV(pk)
-        rv.random_state = self.rng
-        # xk = np.arange(n)
-        # rv = stats.rv_discrete(name=None, values=(xk, pk))
-        # rv.random_state = self.rng
-
-        return rv
+        return pk
 
     def act(self, stimulus):
         """
@@ -111,11 +114,69 @@ class NWSLSAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation):
         action : int
             Action performed by the model.
         """
-        assert self.get_action_space().contains(action)
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_action_space().contains(action)
+            assert self.get_observation_space().contains(stimulus)
+
+        self._hidden_state.win = reward == 1
+        self._hidden_state.action = action
+
+    def sequence_loglik(self, stimuli, rewards, actions, eps=1e-8):
+        """
+        Compute the log-likelihood of each action in the given sequence of trials and update the hidden state as if
+        `eval_policy` and `update` were called for each trial in order.
+
+        Since the policy only depends on the previous action and reward, the computation is fully vectorized over
+        the trials.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the observation space.
+
+        rewards : array-like
+            Sequence of rewards.
 
-        self.get_hidden_state()["win"] = reward == 1
-        self.get_hidden_state()["action"] = action
+        actions : array-like
+            Sequence of actions from the action space.
+
+        eps : float
+            Additive constant used when taking the logarithm of probabilities. Same as in
+            :class:`cognibench.distr.CategoricalRV`.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        rewards = np.asarray(rewards)
+        if len(actions) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        epsilon = self._paras.epsilon
+        n = self.n_action()
+        hidden = self.get_hidden_state()
+
+        prev_action = np.empty_like(actions)
+        prev_action[0] = hidden["action"]
+        prev_action[1:] = actions[:-1]
+        prev_win = np.empty(len(actions), dtype=bool)
+        prev_win[0] = hidden["win"]
+        prev_win[1:] = rewards[:-1] == 1
+
+        stay = actions == prev_action
+        p_win = np.where(stay, 1 - (n - 1) * epsilon / n, epsilon / n)
+        if n == 1:
+            p_lose = np.ones(len(actions))
+        else:
+            p_lose = np.where(stay, epsilon / n, (1 - epsilon / n) / (n - 1))
+        pk = np.where(prev_win, p_win, p_lose)
+
+        hidden["win"] = rewards[-1] == 1
+        hidden["action"] = actions[-1]
+
+        return np.log(pk + eps)
 
 
 class NWSLSModel(PolicyModel, DiscreteAction, DiscreteObservation):
@@ -131,12 +192,14 @@ class NWSLSModel(PolicyModel, DiscreteAction, DiscreteObservation):
         self.set_observation_space(n_obs)
         agent = NWSLSAgent(n_action=n_action, n_obs=n_obs, seed=seed)
 
-        def initializer(seed):
-            return {
-                "epsilon": stats.uniform.rvs(loc=0, scale=n_action, random_state=seed)
-            }
-
         self.param_bounds = {"epsilon": (0, n_action)}
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
+
+    def _initializer(self, seed):
+        return {
+            "epsilon": stats.uniform.rvs(
+                loc=0, scale=self.n_action(), random_state=seed
+            )
+        }
@@ -2,8 +2,9 @@ import numpy as np
 from gym import spaces
 from scipy import stats
 
-from cognibench.distr import DiscreteRV
-from cognibench.models import CNBAgent
+from cognibench.distr import CategoricalRV
+from cognibench import settings
+from cognibench.models import CNBAgent, MemoizedPolicy
 from cognibench.models.policy_model import PolicyModel
 from cognibench.capabilities import Interactive, PredictsLogpdf
 from cognibench.capabilities import (
@@ -14,11 +15,17 @@ from cognibench.capabilities import (
 from overrides import overrides
 
 
-class RandomRespondAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation):
+class RandomRespondAgent(
+    MemoizedPolicy, CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation
+):
     """
-    Random respond agent that performs random actions for any kind of stimulus.
+    Random respond agent that performs random actions for any kind of stimulus. The policy only depends on the
+    parameters, so a single policy object is memoized.
     """
 
+    param_fields = ("bias", "action_bias")
+    hidden_state_fields = ()
+
     @overrides
     def __init__(self, *args, n_action, n_obs, **kwargs):
         """
@@ -47,26 +54,25 @@ class RandomRespondAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObser
         """
         self.set_hidden_state(dict())
 
-    def eval_policy(self, stimulus):
+    def policy_key(self, stimulus):
         """
-        Return a random variable object from the given stimulus.
+        Return an empty key since the policy does not depend on the stimulus or the hidden state.
         """
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
+        return ()
+
+    def _build_policy(self, stimulus):
+        return CategoricalRV.from_probs(self._probs(stimulus))
 
-        bias = self.get_paras()["bias"]
-        action_bias = int(self.get_paras()["action_bias"])
+    def _probs(self, stimulus):
+        bias = self._paras.bias
+        action_bias = int(self._paras.action_bias)
 
         n = self.n_action()
         pk = np.full(n, (1 - bias) / (n - 1))
         pk[action_bias] = bias
-        rv = DiscreteRV(pk)
-        rv.random_state = self.rng
-
-        # xk = np.arange(n)
-        # rv = stats.rv_discrete(values=(xk, pk))
-        # rv.random_state = self.rng
-
-        return rv
+        return pk
 
     def act(self, stimulus):
         """
@@ -89,8 +95,43 @@ class RandomRespondAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObser
         Doesn't do anything. Stimulus and action must be from their respective
         spaces.
         """
-        assert self.get_action_space().contains(action)
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_action_space().contains(action)
+            assert self.get_observation_space().contains(stimulus)
+
+    def sequence_loglik(self, stimuli, rewards, actions, eps=1e-8):
+        """
+        Compute the log-likelihood of each action in the given sequence of trials. Since the agent has no hidden
+        state, the computation is fully vectorized over the trials.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the action space.
+
+        eps : float
+            Additive constant used when taking the logarithm of probabilities. Same as in
+            :class:`cognibench.distr.CategoricalRV`.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+
+        bias = self._paras.bias
+        action_bias = int(self._paras.action_bias)
+
+        n = self.n_action()
+        pk = np.where(actions == action_bias, bias, (1 - bias) / (n - 1))
+        return np.log(pk + eps)
 
 
 class RandomRespondModel(PolicyModel, DiscreteAction, DiscreteObservation):
@@ -106,18 +147,18 @@ class RandomRespondModel(PolicyModel, DiscreteAction, DiscreteObservation):
         self.set_observation_space(n_obs)
         agent = RandomRespondAgent(n_action=n_action, n_obs=n_obs, seed=seed)
 
-        def initializer(seed):
-            return {
-                "bias": stats.uniform.rvs(loc=0, scale=1, random_state=seed),
-                "action_bias": 0,
-            }
-
         self.param_bounds = {"bias": (0, 1), "action_bias": (0, 0)}
 
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
 
+    def _initializer(self, seed):
+        return {
+            "bias": stats.uniform.rvs(loc=0, scale=1, random_state=seed),
+            "action_bias": 0,
+        }
+
     @overrides
     def n_params(self):
         return 1
@@ -3,9 +3,11 @@ from scipy.special import softmax
 from gym import spaces
 from scipy import stats
 
-from cognibench.distr import DiscreteRV
+from cognibench.distr import CategoricalRV
+from cognibench import settings
 from cognibench.models import CNBAgent
 from cognibench.models.policy_model import PolicyModel
+from cognibench.models import recursions
 from cognibench.capabilities import Interactive, PredictsLogpdf
 from cognibench.capabilities import (
     ProducesPolicy,
@@ -15,11 +17,190 @@ from cognibench.capabilities import (
 from overrides import overrides
 
 
+class LazyRowMatrix:
+    """
+    Matrix of shape (n_rows, n_cols) whose rows are allocated when they are first written and carry a lazy
+    multiplicative scale factor.
+
+    Row i is stored as `scale * raw`, so that multiplying a whole row by a constant is a scalar update. Rows that have
+    never been written are equal to `fill` and reading them does not allocate anything. The object can be indexed like
+    the dense array it represents, and is converted to that array by :py:func:`numpy.asarray`. Indexing returns
+    copies, so writes must index the matrix itself, e.g. `m[i] = row` or `m[i, j] = value`; `m[i][j] = value` has no
+    effect on `m`.
+
+    Methods operating on the storage slot of a row (`slot`, `get`, `add`, `scale`) are meant for inner loops. Row i
+    is stored in `raw[slot(i)]` with scale factor `scales[slot(i)]`; these arrays are replaced when the storage grows.
+    """
+
+    # scale factors below this value are folded into the raw row so that raw values do not overflow
+    min_scale = 1e-100
+
+    def __init__(self, n_rows, n_cols, fill=0.0):
+        self.shape = (n_rows, n_cols)
+        self.fill = fill
+        self._slots = {}
+        self.raw = np.empty((0, n_cols), dtype=np.float64)
+        self.scales = np.empty(0, dtype=np.float64)
+
+    @property
+    def n_allocated(self):
+        """
+        Number of allocated rows.
+        """
+        return len(self._slots)
+
+    @classmethod
+    def from_array(cls, values, fill=0.0):
+        """
+        Create a matrix whose rows are all allocated and equal to the rows of the given dense array.
+        """
+        values = np.array(values, dtype=np.float64, ndmin=2)
+        out = cls(*values.shape, fill=fill)
+        out._slots = {i: i for i in range(len(values))}
+        out.raw = values
+        out.scales = np.ones(len(values), dtype=np.float64)
+        return out
+
+    def _index(self, i):
+        """
+        Return the nonnegative row index of i, raising IndexError if it is out of bounds like a dense array would.
+        """
+        n_rows = self.shape[0]
+        if not -n_rows <= i < n_rows:
+            raise IndexError(
+                f"index {i} is out of bounds for axis 0 with size {n_rows}"
+            )
+        return i + n_rows if i < 0 else i
+
+    def slot(self, i):
+        """
+        Return the storage slot of row i, allocating the row if it has not been written before.
+        """
+        k = self._slots.get(i)
+        if k is None:
+            i = self._index(i)
+            k = self._slots.get(i)
+        if k is None:
+            k = len(self._slots)
+            if k == len(self.scales):
+                self._grow()
+            self.raw[k] = self.fill
+            self.scales[k] = 1.0
+            self._slots[i] = k
+        return k
+
+    def _grow(self):
+        capacity = max(8, 2 * len(self.scales))
+        raw = np.empty((capacity, self.shape[1]), dtype=np.float64)
+        raw[: len(self.raw)] = self.raw
+        scale = np.empty(capacity, dtype=np.float64)
+        scale[: len(self.scales)] = self.scales
+        self.raw, self.scales = raw, scale
+
+    def get(self, k, j=slice(None)):
+        """
+        Return the values of the row in slot k at column(s) j.
+        """
+        return self.scales[k] * self.raw[k, j]
+
+    def add(self, k, j, value):
+        """
+        Add the given value to the row in slot k at column j.
+        """
+        self.raw[k, j] += value / self.scales[k]
+
+    def scale(self, k, factor):
+        """
+        Multiply the row in slot k by the given factor.
+        """
+        c = self.scales[k] * factor
+        if c < self.min_scale:
+            self.raw[k] *= c
+            c = 1.0
+        self.scales[k] = c
+
+    def row(self, i):
+        """
+        Return a copy of row i.
+        """
+        k = self._slots.get(i)
+        if k is None:
+            k = self._slots.get(self._index(i))
+        if k is None:
+            return np.full(self.shape[1], self.fill, dtype=np.float64)
+        return self.get(k)
+
+    def toarray(self):
+        """
+        Return the dense array represented by this matrix.
+        """
+        out = np.full(self.shape, self.fill, dtype=np.float64)
+        for i, k in self._slots.items():
+            out[i] = self.get(k)
+        return out
+
+    def copy(self):
+        """
+        Return a copy of the matrix that does not share storage with it.
+        """
+        out = LazyRowMatrix(*self.shape, fill=self.fill)
+        n_allocated = self.n_allocated
+        out._slots = dict(self._slots)
+        out.raw = self.raw[:n_allocated].copy()
+        out.scales = self.scales[:n_allocated].copy()
+        return out
+
+    def __getitem__(self, key):
+        if _is_int(key):
+            return self.row(key)
+        if isinstance(key, tuple) and len(key) == 2 and _is_int(key[0]):
+            return self.row(key[0])[key[1]]
+        return self.toarray()[key]
+
+    def __setitem__(self, key, values):
+        if _is_int(key):
+            k = self.slot(key)
+            self.raw[k] = values
+            self.scales[k] = 1.0
+        elif isinstance(key, tuple) and len(key) == 2 and _is_int(key[0]):
+            k = self.slot(key[0])
+            self.raw[k, key[1]] = np.asarray(values, dtype=np.float64) / self.scales[k]
+        else:
+            # other keys are written through the dense array, which allocates every row
+            dense = self.toarray()
+            dense[key] = values
+            stored = LazyRowMatrix.from_array(dense, fill=self.fill)
+            self._slots, self.raw, self.scales = (
+                stored._slots,
+                stored.raw,
+                stored.scales,
+            )
+
+    def __array__(self, dtype=None):
+        out = self.toarray()
+        return out if dtype is None else out.astype(dtype)
+
+    def __len__(self):
+        return self.shape[0]
+
+
+def _is_int(key):
+    return np.issubdtype(type(key), np.integer)
+
+
 class RWCKAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation):
     """
     Rescorla-Wagner choice kernel agent implementation.
+
+    Q and CK matrices of the hidden state are :class:`LazyRowMatrix` objects: a row is only allocated when its stimulus
+    is first seen, and the choice kernel decay of a row is a scalar update of its scale factor. Indexing these matrices
+    returns copies. To edit the hidden state in place, index the matrix itself, e.g. `Q[s, a] = v` or `Q[s] = row`;
+    `Q[s][a] = v` only modifies a copy.
     """
 
+    param_fields = ("w", "beta", "beta_c", "eta", "eta_c")
+    hidden_state_fields = ("CK", "Q")
+
     @overrides
     def __init__(self, *args, n_action, n_obs, **kwargs):
         """
@@ -57,38 +238,54 @@ class RWCKAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation):
         """
         self.set_action_space(n_action)
         self.set_observation_space(n_obs)
+        # policy object reused by act
+        self._act_rv = CategoricalRV(np.zeros(n_action))
         super().__init__(*args, **kwargs)
 
     def reset(self):
-        w = self.get_paras()["w"]
+        shape = (self.n_obs(), self.n_action())
         self.set_hidden_state(
             {
-                "CK": np.zeros((self.n_obs(), self.n_action())),
-                "Q": np.full((self.n_obs(), self.n_action()), w),
+                "CK": LazyRowMatrix(*shape, fill=0.0),
+                "Q": LazyRowMatrix(*shape, fill=self._paras.w),
             }
         )
 
+    @overrides
+    def set_hidden_state(self, state):
+        """
+        Set the hidden state. CK and Q may also be given as dense arrays, which are converted to
+        :class:`LazyRowMatrix` objects.
+        """
+        if state is not None and any(
+            not isinstance(state[k], LazyRowMatrix) for k in ("CK", "Q") if k in state
+        ):
+            state = {
+                k: v
+                if k not in ("CK", "Q") or isinstance(v, LazyRowMatrix)
+                else LazyRowMatrix.from_array(v)
+                for k, v in state.items()
+            }
+        super().set_hidden_state(state)
+
     def eval_policy(self, stimulus):
         """
         Return a random variable object from the given stimulus.
         """
-        assert self.get_observation_space().contains(stimulus)
-        CK_i = self.get_hidden_state()["CK"][stimulus]
-        Q_i = self.get_hidden_state()["Q"][stimulus]
-
-        beta = self.get_paras()["beta"]
-        beta_c = self.get_paras()["beta_c"]
-        V = beta * Q_i + beta_c * CK_i
-
-        # xk = np.arange(self.n_action())
-        pk = softmax(V)
-        rv = DiscreteRV(pk)
+        rv = CategoricalRV(self._logits(stimulus))
         rv.random_state = self.rng
-        # rv = stats.rv_discrete(values=(xk, pk))
-        # rv.random_state = self.rng
-
         return rv
 
+    def _logits(self, stimulus):
+        if settings["VALIDATION"] == "strict":
+            assert self.get_observation_space().contains(stimulus)
+        CK_i = self._hidden_state.CK.row(stimulus)
+        Q_i = self._hidden_state.Q.row(stimulus)
+
+        beta = self._paras.beta
+        beta_c = self._paras.beta_c
+        return beta * Q_i + beta_c * CK_i
+
     def act(self, stimulus):
         """
         Return an action for the given stimulus.
@@ -103,7 +300,9 @@ class RWCKAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation):
         int
             An action from the action space.
         """
-        return self.eval_policy(stimulus).rvs()
+        rv = self._act_rv.set_logits(self._logits(stimulus))
+        rv.random_state = self.rng
+        return rv.rvs()
 
     def update(self, stimulus, reward, action, done=False):
         """
@@ -124,32 +323,278 @@ class RWCKAgent(CNBAgent, ProducesPolicy, DiscreteAction, DiscreteObservation):
         done : bool
             If `True`, do not do any update.
         """
-        assert self.get_action_space().contains(action)
-        assert self.get_observation_space().contains(stimulus)
+        if settings["VALIDATION"] == "strict":
+            assert self.get_action_space().contains(action)
+            assert self.get_observation_space().contains(stimulus)
 
         # get model's state
-        CK, Q = (
-            self.get_hidden_state()["CK"][stimulus],
-            self.get_hidden_state()["Q"][stimulus],
-        )
+        CK = self._hidden_state.CK
+        Q = self._hidden_state.Q
 
         if not done:
             # unpack parameters
-            eta = self.get_paras()["eta"]
-            eta_c = self.get_paras()["eta_c"]
+            eta = self._paras.eta
+            eta_c = self._paras.eta_c
 
             # update choice kernel
-            CK = (1 - eta_c) * CK
-            CK[action] += eta_c
+            k = CK.slot(stimulus)
+            CK.scale(k, 1 - eta_c)
+            CK.add(k, action, eta_c)
 
             # update Q weights
-            delta = reward - Q[action]
-            Q[action] += eta * delta
+            k = Q.slot(stimulus)
+            delta = reward - Q.get(k, action)
+            Q.add(k, action, eta * delta)
 
-            self.get_hidden_state()["CK"][stimulus] = CK
-            self.get_hidden_state()["Q"][stimulus] = Q
+        return CK.row(stimulus), Q.row(stimulus)
 
-        return CK, Q
+    def sequence_loglik(self, stimuli, rewards, actions, eps=1e-8):
+        """
+        Compute the log-likelihood of each action in the given sequence of trials and update the hidden state as if
+        `eval_policy` and `update` were called for each trial in order.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the action space.
+
+        eps : float
+            Additive constant used when taking the logarithm of probabilities. Same as in
+            :class:`cognibench.distr.CategoricalRV`.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        n_trials = len(actions)
+
+        beta = self._paras.beta
+        beta_c = self._paras.beta_c
+        eta = self._paras.eta
+        eta_c = self._paras.eta_c
+        CK = self._hidden_state.CK
+        Q = self._hidden_state.Q
+
+        if recursions.numba_enabled():
+            k_CK, k_Q = self._allocate_rows(stimuli)
+            return recursions.rwck_loglik(
+                k_CK,
+                k_Q,
+                np.asarray(rewards, dtype=np.float64),
+                actions,
+                CK.raw,
+                CK.scales,
+                Q.raw,
+                Q.scales,
+                float(beta),
+                float(beta_c),
+                float(eta),
+                float(eta_c),
+                CK.min_scale,
+                eps,
+            )
+
+        decay = 1 - eta_c
+        logits = np.empty((n_trials, self.n_action()), dtype=np.float64)
+        for i, (s, r, a) in enumerate(zip(stimuli, rewards, actions)):
+            k_CK, k_Q = CK.slot(s), Q.slot(s)
+            CK_raw, Q_raw = CK.raw[k_CK], Q.raw[k_Q]
+            c_CK, c_Q = float(CK.scales[k_CK]), float(Q.scales[k_Q])
+            logits[i] = (beta * c_Q) * Q_raw + (beta_c * c_CK) * CK_raw
+
+            # same as CK.scale and CK.add, inlined
+            c_CK *= decay
+            if c_CK < CK.min_scale:
+                CK_raw *= c_CK
+                c_CK = 1.0
+            CK.scales[k_CK] = c_CK
+            CK_raw[a] += eta_c / c_CK
+            Q_raw[a] += eta * (r - c_Q * Q_raw[a]) / c_Q
+
+        pk = softmax(logits, axis=1)
+        return np.log(pk[np.arange(n_trials), actions] + eps)
+
+    def sequence_loglik_grad(self, stimuli, rewards, actions, eps=1e-8):
+        """
+        Compute the per-trial log-likelihoods as in `sequence_loglik` together with the exact gradient of their sum
+        with respect to each agent parameter. The gradient is computed by propagating the derivatives of Q and CK
+        matrices with respect to the parameters (forward-mode sensitivities) alongside the trials.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli from the observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the action space.
+
+        eps : float
+            Additive constant used when taking the logarithm of probabilities. Same as in
+            :class:`cognibench.distr.CategoricalRV`.
+
+        Returns
+        -------
+        loglik : :class:`numpy.ndarray`
+            Per-trial log-likelihood values.
+
+        grad : dict
+            Dictionary mapping each parameter name to the derivative of the total log-likelihood.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        n_trials = len(actions)
+
+        beta = self._paras.beta
+        beta_c = self._paras.beta_c
+        eta = self._paras.eta
+        eta_c = self._paras.eta_c
+        CK = self._hidden_state.CK
+        Q = self._hidden_state.Q
+
+        if recursions.numba_enabled():
+            k_CK, k_Q = self._allocate_rows(stimuli)
+            for M, k in ((CK, k_CK), (Q, k_Q)):
+                k = np.unique(k)
+                M.raw[k] *= M.scales[k, None]
+                M.scales[k] = 1.0
+            loglik, dloglik = recursions.rwck_loglik_grad(
+                k_CK,
+                k_Q,
+                np.asarray(rewards, dtype=np.float64),
+                actions,
+                CK.raw,
+                Q.raw,
+                float(beta),
+                float(beta_c),
+                float(eta),
+                float(eta_c),
+                eps,
+            )
+            return loglik, dict(zip(("beta", "beta_c", "w", "eta", "eta_c"), dloglik))
+
+        # derivatives of Q with respect to w and eta, and of CK with respect to eta_c, allocated per stimulus
+        sens = {}
+        sens_coef = np.array([beta, beta, beta_c])
+
+        # derivatives of the logits with respect to beta, beta_c, w, eta and eta_c
+        dV = np.empty((self.n_action(), 5))
+        dloglik = np.zeros(5)
+        loglik = np.empty(n_trials, dtype=np.float64)
+        for i, (s, r, a) in enumerate(zip(stimuli, rewards, actions)):
+            CK_i, Q_i = CK.row(s), Q.row(s)
+            sens_i = sens.get(s)
+            if sens_i is None:
+                sens_i = sens[s] = np.zeros((self.n_action(), 3))
+                sens_i[:, 0] = 1
+            V = beta * Q_i + beta_c * CK_i
+            pk = np.exp(V - V.max())
+            pk /= pk.sum()
+            loglik[i] = np.log(pk[a] + eps)
+
+            # d log(p_a + eps) = p_a / (p_a + eps) * (dV_a - sum_k p_k dV_k)
+            dV[:, 0] = Q_i
+            dV[:, 1] = CK_i
+            np.multiply(sens_i, sens_coef, out=dV[:, 2:])
+            dloglik += pk[a] / (pk[a] + eps) * (dV[a] - np.dot(pk, dV))
+
+            sens_i[:, 2] *= 1 - eta_c
+            sens_i[:, 2] -= CK_i
+            sens_i[a, 2] += 1
+            CK_i *= 1 - eta_c
+            CK_i[a] += eta_c
+
+            delta = r - Q_i[a]
+            sens_i[a, 0] *= 1 - eta
+            sens_i[a, 1] = (1 - eta) * sens_i[a, 1] + delta
+            Q_i[a] += eta * delta
+            CK[s], Q[s] = CK_i, Q_i
+
+        grad = dict(zip(("beta", "beta_c", "w", "eta", "eta_c"), dloglik))
+        return loglik, grad
+
+    def _allocate_rows(self, stimuli):
+        """
+        Allocate the CK and Q rows of every stimulus of a sequence in order of first appearance, as the trial by trial
+        updates do, and return the storage slots of the rows of each trial.
+        """
+        CK = self._hidden_state.CK
+        Q = self._hidden_state.Q
+        distinct, first, inverse = np.unique(
+            np.asarray(stimuli, dtype=np.int64), return_index=True, return_inverse=True
+        )
+        k_CK = np.empty(len(distinct), dtype=np.int64)
+        k_Q = np.empty(len(distinct), dtype=np.int64)
+        for u in np.argsort(first):
+            k_CK[u] = CK.slot(int(distinct[u]))
+            k_Q[u] = Q.slot(int(distinct[u]))
+        return k_CK[inverse], k_Q[inverse]
+
+    def batch_negloglike(self, paras, stimuli, rewards, actions, eps=1e-8):
+        """
+        Compute the negative log-likelihood of the given sequence of trials for a batch of K parameter settings at
+        once. K hidden states, each reset using its own parameters, are advanced in lockstep, so the cost of a batch
+        is close to the cost of a single `sequence_loglik` call for moderate K. The agent parameters and hidden state
+        are not modified.
+
+        Parameters
+        ----------
+        paras : dict
+            Dictionary mapping each parameter name ('w', 'beta', 'beta_c', 'eta', 'eta_c') to an array of K values.
+
+        stimuli : array-like
+            Sequence of stimuli from the observation space.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions from the action space.
+
+        eps : float
+            Additive constant used when taking the logarithm of probabilities. Same as in
+            :class:`cognibench.distr.CategoricalRV`.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Negative log-likelihood of each of the K parameter settings.
+        """
+        w, beta, beta_c, eta, eta_c = (
+            np.asarray(paras[k], dtype=np.float64)[:, None]
+            for k in ("w", "beta", "beta_c", "eta", "eta_c")
+        )
+        K = len(w)
+        # rows of each stimulus are allocated when it is first seen
+        CK, Q = {}, {}
+
+        arange_K = np.arange(K)
+        nll = np.zeros(K)
+        for s, r, a in zip(stimuli, rewards, actions):
+            if s not in Q:
+                CK[s] = np.zeros((K, self.n_action()))
+                Q[s] = np.empty((K, self.n_action()))
+                Q[s][:] = w
+            CK_s, Q_s = CK[s], Q[s]
+            V = beta * Q_s + beta_c * CK_s
+            V -= V.max(axis=1, keepdims=True)
+            np.exp(V, out=V)
+            nll -= np.log(V[arange_K, a] / V.sum(axis=1) + eps)
+
+            CK_s *= 1 - eta_c
+            CK_s[:, a] += eta_c[:, 0]
+            Q_s[:, a] += eta[:, 0] * (r - Q_s[:, a])
+
+        return nll
 
 
 class RWCKModel(PolicyModel, DiscreteAction, DiscreteObservation):
@@ -165,15 +610,6 @@ class RWCKModel(PolicyModel, DiscreteAction, DiscreteObservation):
         self.set_observation_space(n_obs)
         agent = RWCKAgent(n_action=n_action, n_obs=n_obs, seed=seed)
 
-        def initializer(seed):
-            return {
-                "w": 0.5,
-                "beta": stats.expon.rvs(scale=1, random_state=seed),
-                "beta_c": 0.5 + stats.expon.rvs(scale=1, random_state=seed),
-                "eta": stats.uniform.rvs(scale=1, random_state=seed),
-                "eta_c": stats.uniform.rvs(scale=1, random_state=seed),
-            }
-
         self.param_bounds = {
             "w": (0.5, 0.5),
             "beta": (0, None),
@@ -183,9 +619,18 @@ class RWCKModel(PolicyModel, DiscreteAction, DiscreteObservation):
         }
 
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
 
+    def _initializer(self, seed):
+        return {
+            "w": 0.5,
+            "beta": stats.expon.rvs(scale=1, random_state=seed),
+            "beta_c": 0.5 + stats.expon.rvs(scale=1, random_state=seed),
+            "eta": stats.uniform.rvs(scale=1, random_state=seed),
+            "eta_c": stats.uniform.rvs(scale=1, random_state=seed),
+        }
+
     @overrides
     def n_params(self):
         return 4
@@ -204,15 +649,6 @@ class RWModel(PolicyModel, DiscreteAction, DiscreteObservation):
         self.set_observation_space(n_obs)
         agent = RWCKAgent(n_action=n_action, n_obs=n_obs, seed=seed)
 
-        def initializer(seed):
-            return {
-                "w": 0.5,
-                "beta": stats.expon.rvs(scale=1, random_state=seed),
-                "beta_c": 0,
-                "eta": stats.uniform.rvs(scale=1, random_state=seed),
-                "eta_c": 0,
-            }
-
         self.param_bounds = {
             "w": (0.5, 0.5),
             "beta": (0, None),
@@ -222,9 +658,18 @@ class RWModel(PolicyModel, DiscreteAction, DiscreteObservation):
         }
 
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
 
+    def _initializer(self, seed):
+        return {
+            "w": 0.5,
+            "beta": stats.expon.rvs(scale=1, random_state=seed),
+            "beta_c": 0,
+            "eta": stats.uniform.rvs(scale=1, random_state=seed),
+            "eta_c": 0,
+        }
+
     @overrides
     def n_params(self):
         return 2
@@ -243,15 +688,6 @@ class CKModel(PolicyModel, DiscreteAction, DiscreteObservation):
         self.set_observation_space(n_obs)
         agent = RWCKAgent(n_action=n_action, n_obs=n_obs, seed=seed)
 
-        def initializer(seed):
-            return {
-                "w": 0.5,
-                "beta": 0,
-                "beta_c": 0.5 + stats.expon.rvs(scale=1, random_state=seed),
-                "eta": 0,
-                "eta_c": stats.uniform.rvs(scale=1, random_state=seed),
-            }
-
         self.param_bounds = {
             "w": (0.5, 0.5),
             "beta": (0, 0),
@@ -261,9 +697,18 @@ class CKModel(PolicyModel, DiscreteAction, DiscreteObservation):
         }
 
         super().__init__(
-            *args, agent=agent, param_initializer=initializer, seed=seed, **kwargs
+            *args, agent=agent, param_initializer=self._initializer, seed=seed, **kwargs
         )
 
+    def _initializer(self, seed):
+        return {
+            "w": 0.5,
+            "beta": 0,
+            "beta_c": 0.5 + stats.expon.rvs(scale=1, random_state=seed),
+            "eta": 0,
+            "eta_c": stats.uniform.rvs(scale=1, random_state=seed),
+        }
+
     @overrides
     def n_params(self):
         return 2
@@ -0,0 +1,606 @@
+import threading
+import time
+import numpy as np
+from scipy.optimize import minimize
+
+from cognibench.distr import CategoricalRV
+from cognibench.logging import logger
+from cognibench.models import CNBModel, FitReport
+from cognibench.models.policy_model import (
+    _ParameterTransform,
+    _point_key,
+    _flatten_dict_into_array,
+)
+from cognibench.models.decision_making.rwck import RWCKModel, RWModel, CKModel
+from cognibench.capabilities import (
+    Interactive,
+    PredictsLogpdf,
+    ReturnsNumParams,
+    MultiSubjectModel,
+    DiscreteAction,
+    DiscreteObservation,
+)
+from overrides import overrides
+
+
+_PARA_NAMES = ("w", "beta", "beta_c", "eta", "eta_c")
+
+
+class StackedRWCKModel(
+    CNBModel,
+    Interactive,
+    PredictsLogpdf,
+    ReturnsNumParams,
+    MultiSubjectModel,
+    DiscreteAction,
+    DiscreteObservation,
+):
+    """
+    Multi-subject Rescorla-Wagner choice kernel model that stores the parameters and hidden states of all the subjects
+    as arrays.
+
+    In contrast to a model created by :py:func:`cognibench.models.utils.multi_from_single_cls`, this model does not
+    create a separate model object for each subject. Log-likelihoods of all the subjects are computed in a single
+    recursion over trials that is vectorized over subjects; trial sequences of different lengths are padded and masked.
+    Since the subjects do not share parameters, `fit_jointly` runs a separate optimization with exact gradients for
+    each subject, and evaluates the points requested by all the unfinished optimizations in a single vectorized
+    recursion.
+
+    Parameter bounds and initializers are the same as the ones of the corresponding single-subject model given by
+    `single_cls`. All the subjects are initialized with the same parameters.
+    """
+
+    name = "StackedRWCKModel"
+    single_cls = RWCKModel
+    multi_subject_methods = [
+        "fit",
+        "predict",
+        "update",
+        "act",
+        "reset",
+        "sequence_loglik",
+        "get_paras",
+        "set_paras",
+        "n_params",
+    ]
+
+    @overrides
+    def __init__(
+        self,
+        *args,
+        n_subj,
+        n_action,
+        n_obs,
+        seed=None,
+        optim_kwargs=None,
+        transform_params=False,
+        **kwargs,
+    ):
+        """
+        Parameters
+        ----------
+        n_subj : int
+            Number of subjects.
+
+        n_action : int
+            Dimension of the action space.
+
+        n_obs : int
+            Dimension of the observation space.
+
+        seed : int (optional)
+            Random seed.
+
+        optim_kwargs : dict (optional)
+            Optimization parameters to be passed to :py:func:`scipy.optimize.minimize` function. By default it only
+            defines `'method'` argument as 'L-BFGS-B'. Bounds and gradient are always computed by the model.
+
+        transform_params : bool (optional)
+            If True, bounded parameters are optimized in an unconstrained space. See
+            :class:`cognibench.models.policy_model.PolicyModel`.
+        """
+        self.set_action_space(n_action)
+        self.set_observation_space(n_obs)
+        self.n_subjects = n_subj
+        self._single_model = self.single_cls(n_action=n_action, n_obs=n_obs, seed=seed)
+        self.param_bounds = self._single_model.param_bounds
+        self.optim_kwargs = optim_kwargs
+        if self.optim_kwargs is None:
+            self.optim_kwargs = {"method": "L-BFGS-B"}
+        self.transform_params = transform_params
+        self.fit_report = None
+        super().__init__(
+            *args,
+            param_initializer=self._single_model.param_initializer,
+            seed=seed,
+            **kwargs,
+        )
+        self.init_paras()
+
+    @overrides
+    def init_paras(self, seed=None):
+        """
+        Initialize the parameters of every subject using the initializer of the single-subject model.
+        """
+        self._paras = {
+            k: np.empty(self.n_subjects, dtype=np.float64) for k in _PARA_NAMES
+        }
+        self._init_subject_paras(np.arange(self.n_subjects), seed)
+        self.reset()
+
+    def _init_subject_paras(self, subj_indices, seed=None):
+        """
+        Initialize the parameters of the given subjects only, leaving the parameters of the others untouched.
+        """
+        self._single_model.init_paras(seed=self.get_seed() if seed is None else seed)
+        paras = self._single_model.get_paras()
+        for k in _PARA_NAMES:
+            self._paras[k][subj_indices] = paras[k]
+
+    @overrides
+    def n_params(self, subj_idx=None):
+        """
+        Return the number of free parameters of a single subject.
+        """
+        return self._single_model.n_params()
+
+    @overrides
+    def get_paras(self, subj_idx=None):
+        """
+        Parameters
+        ----------
+        subj_idx : int (optional)
+            Subject index.
+
+        Returns
+        -------
+        dict
+            If `subj_idx` is None, dictionary mapping each parameter name to an array containing the values of all the
+            subjects. Otherwise, dictionary containing the parameter values of the given subject.
+        """
+        if subj_idx is None:
+            return self._paras
+        return {k: float(v[subj_idx]) for k, v in self._paras.items()}
+
+    @overrides
+    def set_paras(self, subj_idx, paras_dict=None):
+        """
+        Set the parameters of the given subject and reset its hidden state. If only a dictionary is given, it must map
+        each parameter name to the values of all the subjects, and all the subjects are set and reset.
+        """
+        if paras_dict is None:
+            for k in _PARA_NAMES:
+                self._paras[k][:] = subj_idx[k]
+            self.reset()
+        else:
+            for k in _PARA_NAMES:
+                self._paras[k][subj_idx] = paras_dict[k]
+            self.reset(subj_idx)
+
+    @overrides
+    def reset(self, subj_idx=None):
+        """
+        Reset the hidden state of the given subject, or of all the subjects if no index is given.
+        """
+        shape = (self.n_subjects, self.n_obs(), self.n_action())
+        if subj_idx is None:
+            self._CK = np.zeros(shape)
+            self._Q = np.empty(shape)
+            self._Q[:] = self._paras["w"][:, None, None]
+        else:
+            self._CK[subj_idx] = 0
+            w = self._paras["w"][subj_idx]
+            self._Q[subj_idx] = w[..., None, None] if np.ndim(w) > 0 else w
+
+    def get_hidden_state(self, subj_idx):
+        """
+        Return views of the choice kernel and Q matrices of the given subject.
+        """
+        return {"CK": self._CK[subj_idx], "Q": self._Q[subj_idx]}
+
+    def _policy(self, subj_idx, stimulus):
+        beta = self._paras["beta"][subj_idx]
+        beta_c = self._paras["beta_c"][subj_idx]
+        V = beta * self._Q[subj_idx, stimulus] + beta_c * self._CK[subj_idx, stimulus]
+        rv = CategoricalRV(V)
+        rv.random_state = self.rng
+        return rv
+
+    @overrides
+    def predict(self, subj_idx, stimulus):
+        return self._policy(subj_idx, stimulus).logpmf
+
+    @overrides
+    def act(self, subj_idx, stimulus):
+        return self._policy(subj_idx, stimulus).rvs()
+
+    @overrides
+    def update(self, subj_idx, stimulus, reward, action, done=False):
+        if not done:
+            eta = self._paras["eta"][subj_idx]
+            eta_c = self._paras["eta_c"][subj_idx]
+            CK = self._CK[subj_idx, stimulus]
+            Q = self._Q[subj_idx, stimulus]
+            CK *= 1 - eta_c
+            CK[action] += eta_c
+            Q[action] += eta * (reward - Q[action])
+
+    def sequence_loglik(self, subj_idx, stimuli, rewards, actions):
+        """
+        Compute the log-likelihood of each action of the given subject starting from its current hidden state, and
+        update the hidden state as if each trial had been passed to `predict` and `update` in order.
+        """
+        return self.sequence_loglik_jointly(
+            [stimuli], [rewards], [actions], [subj_idx]
+        )[0]
+
+    def sequence_loglik_jointly(self, stimuli, rewards, actions, subj_indices=None):
+        """
+        Compute the per-trial log-likelihoods of several subjects at once, starting from their current hidden states,
+        and update the hidden states accordingly.
+
+        Parameters
+        ----------
+        stimuli, rewards, actions : list of array-like
+            Trial sequences of each subject. Sequences of different subjects may have different lengths.
+
+        subj_indices : list of int (optional)
+            Index of the subject of each sequence. By default, the i-th sequence belongs to the i-th subject.
+
+        Returns
+        -------
+        list of :class:`numpy.ndarray`
+            Per-trial log-likelihoods of each subject.
+        """
+        if subj_indices is None:
+            subj_indices = np.arange(len(stimuli))
+        subj_indices = np.asarray(subj_indices, dtype=np.int64)
+        stimuli, mask = _pad_sequences(stimuli, np.int64)
+        rewards, _ = _pad_sequences(rewards, np.float64)
+        actions, _ = _pad_sequences(actions, np.int64)
+
+        paras = {k: v[subj_indices] for k, v in self._paras.items()}
+        CK, Q = self._CK[subj_indices], self._Q[subj_indices]
+        loglik = _stacked_loglik(paras, CK, Q, stimuli, rewards, actions, mask)
+        self._CK[subj_indices], self._Q[subj_indices] = CK, Q
+        return [ll[m] for ll, m in zip(loglik, mask)]
+
+    @overrides
+    def fit(self, subj_idx, stimuli, rewards, actions):
+        """
+        Fit the parameters of a single subject. See `fit_jointly`.
+        """
+        return self._fit_subjects([subj_idx], [stimuli], [rewards], [actions])
+
+    @overrides
+    def fit_jointly(self, stimuli, rewards, actions):
+        """
+        Fit the parameters of all the subjects by minimizing the negative log-likelihood of each subject with its own
+        :py:func:`scipy.optimize.minimize` call. The optimizations run in lockstep: each evaluation of the objective
+        and its gradient is a single recursion over trials vectorized over the subjects whose optimization has not
+        finished yet.
+
+        Parameters
+        ----------
+        stimuli, rewards, actions : list of array-like
+            Trial sequences of each subject, in subject order.
+
+        Returns
+        -------
+        :class:`cognibench.models.FitReport`
+            Diagnostics of the optimization. `n_fev` counts vectorized evaluations, `fun` and `trace` are sums over
+            subjects, `n_iter` is the largest number of iterations of a subject and `success` is True if every
+            optimization succeeded. The report is also stored in `self.fit_report`.
+        """
+        assert len(stimuli) == self.n_subjects, "data must be given for every subject"
+        return self._fit_subjects(np.arange(self.n_subjects), stimuli, rewards, actions)
+
+    def _fit_subjects(self, subj_indices, stimuli, rewards, actions):
+        subj_indices = np.asarray(subj_indices, dtype=np.int64)
+        n_subj = len(subj_indices)
+        stimuli, mask = _pad_sequences(stimuli, np.int64)
+        rewards, _ = _pad_sequences(rewards, np.float64)
+        actions, _ = _pad_sequences(actions, np.int64)
+
+        self._init_subject_paras(subj_indices)
+        bounds, _ = _flatten_dict_into_array(self.param_bounds, dtype=object)
+        bounds = bounds.reshape(len(bounds) // 2, 2)
+        transform = _ParameterTransform(
+            bounds, len(_PARA_NAMES), unconstrained=self.transform_params
+        )
+        x0 = np.column_stack([self._paras[k][subj_indices] for k in _PARA_NAMES])
+
+        telemetry = {"n_fev": 0, "eval_time": 0.0}
+
+        def objective(rows, Z):
+            beg = time.perf_counter()
+            x = np.array([transform.to_natural(z) for z in Z])
+            paras = dict(zip(_PARA_NAMES, x.T))
+            shape = (len(rows), self.n_obs(), self.n_action())
+            CK = np.zeros(shape)
+            Q = np.empty(shape)
+            Q[:] = paras["w"][:, None, None]
+            # drop the trailing trials that are padding for every subject of this batch
+            n_trials = np.max(np.nonzero(np.any(mask[rows], axis=0))[0], initial=-1) + 1
+            loglik, grad = _stacked_loglik(
+                paras,
+                CK,
+                Q,
+                stimuli[rows, :n_trials],
+                rewards[rows, :n_trials],
+                actions[rows, :n_trials],
+                mask[rows, :n_trials],
+                with_grad=True,
+            )
+            nll = -np.sum(loglik, axis=1)
+            grad_z = [-transform.grad(z, g) for z, g in zip(Z, grad)]
+            telemetry["eval_time"] += time.perf_counter() - beg
+            telemetry["n_fev"] += 1
+            return nll, grad_z
+
+        optim_kwargs = dict(self.optim_kwargs)
+        optim_kwargs.update(jac=True, bounds=transform.bounds())
+        optim_kwargs.pop("callback", None)
+        beg = time.perf_counter()
+        results, trace = _minimize_lockstep(
+            objective, [transform.to_internal(x) for x in x0], optim_kwargs
+        )
+        wall_time = time.perf_counter() - beg
+
+        failed = [res for res in results if not res.success]
+        for res in failed:
+            logger().debug(
+                f"Fitting on {self.name} has not finished successfully! Cause of termination: {res.message}"
+            )
+
+        x = np.array([transform.to_natural(res.x) for res in results])
+        for k, col in zip(_PARA_NAMES, x.T):
+            self._paras[k][subj_indices] = col
+        self.reset(subj_indices)
+
+        self.fit_report = FitReport(
+            n_fev=telemetry["n_fev"],
+            n_jev=telemetry["n_fev"],
+            eval_time=telemetry["eval_time"],
+            wall_time=wall_time,
+            trace=trace,
+            success=not failed,
+            message=failed[0].message
+            if failed
+            else "Optimization of every subject terminated successfully.",
+            fun=float(np.sum([res.fun for res in results])),
+            n_iter=max((res.get("nit", 0) for res in results), default=0),
+        )
+        return self.fit_report
+
+
+class StackedRWModel(StackedRWCKModel):
+    """
+    Multi-subject Rescorla-Wagner model that stores the parameters and hidden states of all the subjects as arrays.
+    See :class:`StackedRWCKModel`.
+    """
+
+    name = "StackedRWModel"
+    single_cls = RWModel
+
+
+class StackedCKModel(StackedRWCKModel):
+    """
+    Multi-subject choice kernel model that stores the parameters and hidden states of all the subjects as arrays.
+    See :class:`StackedRWCKModel`.
+    """
+
+    name = "StackedCKModel"
+    single_cls = CKModel
+
+
+def _pad_sequences(sequences, dtype):
+    """
+    Stack the given sequences of possibly different lengths into a zero padded 2D array.
+
+    Returns
+    -------
+    arr : :class:`numpy.ndarray`
+        Array of shape (n_sequences, max_length).
+
+    mask : :class:`numpy.ndarray`
+        Boolean array of the same shape that is True for the entries that belong to a sequence.
+    """
+    lengths = [len(seq) for seq in sequences]
+    arr = np.zeros((len(sequences), max(lengths, default=0)), dtype=dtype)
+    mask = np.zeros(arr.shape, dtype=bool)
+    for i, (seq, n) in enumerate(zip(sequences, lengths)):
+        arr[i, :n] = seq
+        mask[i, :n] = True
+    return arr, mask
+
+
+def _stacked_loglik(
+    paras, CK, Q, stimuli, rewards, actions, mask, with_grad=False, eps=1e-8
+):
+    """
+    Compute the per-trial log-likelihoods of several subjects with the Rescorla-Wagner choice kernel equations in a
+    single recursion over trials vectorized over subjects. Hidden states of masked trials are not updated.
+
+    Parameters
+    ----------
+    paras : dict
+        Dictionary mapping each parameter name to an array containing the values of each subject.
+
+    CK, Q : :class:`numpy.ndarray`
+        Hidden state arrays of shape (n_subj, n_obs, n_action). They are updated in place.
+
+    stimuli, rewards, actions, mask : :class:`numpy.ndarray`
+        Padded trial data and mask of shape (n_subj, n_trials).
+
+    with_grad : bool
+        If True, additionally return the gradient of the total log-likelihood of each subject with respect to its
+        parameters. Gradients are only correct if the hidden states are at their reset values.
+
+    eps : float
+        Additive constant used when taking the logarithm of probabilities.
+
+    Returns
+    -------
+    loglik : :class:`numpy.ndarray`
+        Per-trial log-likelihoods of shape (n_subj, n_trials). Masked entries are zero.
+
+    grad : :class:`numpy.ndarray`
+        Only returned if `with_grad` is True. Array of shape (n_subj, 5) containing the derivatives with respect to
+        'w', 'beta', 'beta_c', 'eta' and 'eta_c' parameters, in this order.
+    """
+    n_subj, n_trials = stimuli.shape
+    n_action = Q.shape[2]
+    subj = np.arange(n_subj)
+    beta, beta_c, eta, eta_c = (
+        paras[k][:, None] for k in ("beta", "beta_c", "eta", "eta_c")
+    )
+
+    loglik = np.zeros((n_subj, n_trials))
+    if with_grad:
+        # derivatives of Q with respect to w and eta, and of CK with respect to eta_c
+        sens = np.zeros(Q.shape + (3,))
+        sens[..., 0] = 1
+        sens_coef = np.column_stack([beta, beta, beta_c])[:, None, :]
+        dV = np.empty((n_subj, n_action, 5))
+        grad = np.zeros((n_subj, 5))
+
+    for t in range(n_trials):
+        m = mask[:, t]
+        s, r, a = stimuli[:, t], rewards[:, t], actions[:, t]
+        CK_s, Q_s = CK[subj, s], Q[subj, s]
+
+        V = beta * Q_s + beta_c * CK_s
+        pk = np.exp(V - V.max(axis=1, keepdims=True))
+        pk /= pk.sum(axis=1, keepdims=True)
+        pk_a = pk[subj, a]
+        loglik[m, t] = np.log(pk_a[m] + eps)
+
+        delta = r - Q_s[subj, a]
+        if with_grad:
+            sens_s = sens[subj, s]
+            # dV columns in the order beta, beta_c, w, eta, eta_c
+            dV[:, :, 0] = Q_s
+            dV[:, :, 1] = CK_s
+            np.multiply(sens_s, sens_coef, out=dV[:, :, 2:])
+            dll = (pk_a / (pk_a + eps))[:, None] * (
+                dV[subj, a] - np.einsum("sk,skp->sp", pk, dV)
+            )
+            grad[m] += dll[m][:, [2, 0, 1, 3, 4]]
+
+            sens_s[:, :, 2] *= 1 - eta_c
+            sens_s[:, :, 2] -= CK_s
+            sens_s[subj, a, 2] += 1
+            sens_s[subj, a, 0] *= 1 - eta[:, 0]
+            sens_s[subj, a, 1] = (1 - eta[:, 0]) * sens_s[subj, a, 1] + delta
+            sens[subj[m], s[m]] = sens_s[m]
+
+        CK_s *= 1 - eta_c
+        CK_s[subj, a] += eta_c[:, 0]
+        Q_s[subj, a] += eta[:, 0] * delta
+        CK[subj[m], s[m]] = CK_s[m]
+        Q[subj[m], s[m]] = Q_s[m]
+
+    if with_grad:
+        return loglik, grad
+    return loglik
+
+
+def _minimize_lockstep(fun, z0_list, optim_kwargs):
+    """
+    Run one :py:func:`scipy.optimize.minimize` call per subject with its own convergence criterion, and evaluate the
+    points requested by all the running optimizations with a single call to `fun`. Each optimization runs in its own
+    thread and waits while the points of the others are collected; subjects whose optimization has finished are left
+    out of the following evaluations.
+
+    Parameters
+    ----------
+    fun : callable
+        Batched objective. `fun(rows, Z)` receives the indices of the requesting subjects and their points, and
+        returns the objective values and gradients of each of them.
+
+    z0_list : list of :class:`numpy.ndarray`
+        Initial point of each subject.
+
+    optim_kwargs : dict
+        Keyword arguments passed to every :py:func:`scipy.optimize.minimize` call.
+
+    Returns
+    -------
+    results : list of :class:`scipy.optimize.OptimizeResult`
+        Result of the optimization of each subject.
+
+    trace : list of float
+        Sum of the objective values of the subjects at their latest iterates, after every evaluation in which at
+        least one subject completed an iteration.
+    """
+    n = len(z0_list)
+    cond = threading.Condition()
+    requests, replies = {}, {}
+    state = {"n_finished": 0, "error": None, "n_iter": 0}
+    results = [None] * n
+    errors = []
+    # objective value of each subject at its latest iterate
+    current = np.full(n, np.nan)
+
+    def run(i):
+        evaluated = {}
+
+        def f(z):
+            with cond:
+                requests[i] = np.array(z, dtype=np.float64)
+                cond.notify_all()
+                cond.wait_for(lambda: i in replies or state["error"] is not None)
+                if i not in replies:
+                    raise RuntimeError("evaluation of the objective failed")
+                out = replies.pop(i)
+            evaluated[_point_key(z)] = out[0]
+            if np.isnan(current[i]):
+                current[i] = out[0]
+            return out
+
+        def callback(zk, *args):
+            current[i] = evaluated.get(_point_key(zk), np.nan)
+            with cond:
+                state["n_iter"] += 1
+
+        try:
+            results[i] = minimize(f, z0_list[i], callback=callback, **optim_kwargs)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            with cond:
+                state["n_finished"] += 1
+                cond.notify_all()
+
+    threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(n)]
+    for t in threads:
+        t.start()
+
+    trace = []
+    n_iter = 0
+    with cond:
+        while True:
+            cond.wait_for(lambda: len(requests) + state["n_finished"] == n)
+            if state["n_iter"] > n_iter:
+                n_iter = state["n_iter"]
+                trace.append(float(np.sum(current)))
+            if not requests:
+                break
+            rows = sorted(requests)
+            try:
+                values, grads = fun(np.array(rows), [requests.pop(i) for i in rows])
+            except Exception as e:
+                state["error"] = e
+                cond.notify_all()
+                break
+            for i, value, grad in zip(rows, values, grads):
+                replies[i] = (value, grad)
+            cond.notify_all()
+    for t in threads:
+        t.join()
+    if state["error"] is not None:
+        raise state["error"]
+    if errors:
+        raise errors[0]
+    return results, trace
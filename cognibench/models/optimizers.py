@@ -0,0 +1,196 @@
+import time
+import numpy as np
+from scipy.optimize import OptimizeResult
+from cognibench.utils import make_rng
+
+
+class Optimizer:
+    """
+    Base class for optimizers that :class:`cognibench.models.policy_model.PolicyModel` can use instead of
+    :py:func:`scipy.optimize.minimize`.
+
+    An optimizer minimizes a batched objective function. The function takes a matrix of shape (K, n) whose rows are
+    candidate solutions and returns their K objective values, so that a whole set of candidates (e.g. a generation of
+    a population-based method) can be evaluated in a single vectorized or parallel call.
+    """
+
+    def minimize(self, fun, x0, bounds, seed=None):
+        """
+        Minimize the given batched objective function.
+
+        Parameters
+        ----------
+        fun : callable
+            Objective function mapping a matrix of shape (K, n) to an array of K objective values.
+
+        x0 : :class:`numpy.ndarray`
+            Initial solution of length n.
+
+        bounds : :class:`numpy.ndarray`
+            Array of shape (n, 2) containing finite lower and upper bounds of each variable.
+
+        seed : int or :class:`numpy.random.SeedSequence` (optional)
+            Random seed.
+
+        Returns
+        -------
+        :class:`scipy.optimize.OptimizeResult`
+            Result containing at least `x`, `fun`, `nfev`, `nit`, `success` and `message` attributes, and a `trace`
+            attribute holding the best objective value after each iteration.
+        """
+        raise NotImplementedError("Must implement minimize.")
+
+
+class DifferentialEvolution(Optimizer):
+    """
+    Differential evolution (DE/rand/1/bin) global optimizer.
+
+    Every generation is evaluated with a single call to the objective function. Optimization stops when the objective
+    values of the population have converged, or when the iteration, evaluation or wall-clock budget is exhausted. A
+    generation is only started if it fits in the evaluation budget; the wall-clock budget is checked between
+    generations. If the initial population does not fit in the evaluation budget, only the initial solution is
+    evaluated and returned.
+    """
+
+    def __init__(
+        self,
+        popsize=15,
+        mutation=(0.5, 1.0),
+        recombination=0.7,
+        max_iter=1000,
+        max_fev=None,
+        max_time=None,
+        tol=0.01,
+        atol=0.0,
+    ):
+        """
+        Parameters
+        ----------
+        popsize : int (optional)
+            Multiplier for the population size. The population has `max(5, popsize * n)` members where n is the
+            number of variables. (Default: 15)
+
+        mutation : float or tuple (optional)
+            Differential weight. If a tuple `(min, max)` is given, the weight is drawn uniformly from this interval in
+            every generation (dithering). (Default: (0.5, 1.0))
+
+        recombination : float (optional)
+            Crossover probability in [0, 1]. (Default: 0.7)
+
+        max_iter : int (optional)
+            Maximum number of generations. (Default: 1000)
+
+        max_fev : int (optional)
+            Maximum number of objective function evaluations, counting every candidate. (Default: no limit)
+
+        max_time : float (optional)
+            Wall-clock budget in seconds. (Default: no limit)
+
+        tol, atol : float (optional)
+            Relative and absolute convergence tolerances. Optimization is successful when the standard deviation of
+            the objective values of the population is at most `atol + tol * abs(mean)`.
+        """
+        assert popsize >= 1, "popsize must be positive"
+        assert 0 <= recombination <= 1, "recombination must be in [0, 1]"
+        assert max_fev is None or max_fev >= 1, "max_fev must be positive"
+        self.popsize = popsize
+        self.mutation = mutation
+        self.recombination = recombination
+        self.max_iter = max_iter
+        self.max_fev = max_fev
+        self.max_time = max_time
+        self.tol = tol
+        self.atol = atol
+
+    def __repr__(self):
+        return (
+            f"DifferentialEvolution(popsize={self.popsize}, mutation={self.mutation}, "
+            f"recombination={self.recombination}, max_iter={self.max_iter}, max_fev={self.max_fev}, "
+            f"max_time={self.max_time}, tol={self.tol}, atol={self.atol})"
+        )
+
+    def minimize(self, fun, x0, bounds, seed=None):
+        """
+        See :py:meth:`Optimizer.minimize`. The initial solution is included in the initial population, which is
+        otherwise drawn uniformly within the bounds.
+        """
+        beg = time.perf_counter()
+        rng = make_rng(seed)
+        bounds = np.asarray(bounds, dtype=np.float64)
+        lo, hi = bounds[:, 0], bounds[:, 1]
+        n = len(lo)
+        n_pop = max(5, self.popsize * n)
+
+        pop = lo + rng.random((n_pop, n)) * (hi - lo)
+        pop[0] = np.clip(x0, lo, hi)
+        if self.max_fev is not None and n_pop > self.max_fev:
+            return OptimizeResult(
+                x=pop[0],
+                fun=self._evaluate(fun, pop[:1])[0],
+                nfev=1,
+                nit=0,
+                success=False,
+                message="Maximum number of function evaluations is smaller than the population size.",
+                trace=[],
+            )
+        f_pop = self._evaluate(fun, pop)
+        nfev, nit = n_pop, 0
+        trace = []
+        success, message = False, "Maximum number of iterations has been exceeded."
+
+        rows = np.arange(n_pop)
+        while nit < self.max_iter:
+            if self.max_fev is not None and nfev + n_pop > self.max_fev:
+                message = "Maximum number of function evaluations has been exceeded."
+                break
+            if self.max_time is not None and time.perf_counter() - beg >= self.max_time:
+                message = "Maximum wall-clock time has been exceeded."
+                break
+
+            if np.isscalar(self.mutation):
+                weight = self.mutation
+            else:
+                weight = rng.uniform(*self.mutation)
+            # three distinct members different from the target for each row
+            keys = rng.random((n_pop, n_pop))
+            keys[rows, rows] = np.inf
+            r0, r1, r2 = np.argsort(keys, axis=1)[:, :3].T
+            mutant = pop[r0] + weight * (pop[r1] - pop[r2])
+            outside = (mutant < lo) | (mutant > hi)
+            mutant[outside] = (lo + rng.random((n_pop, n)) * (hi - lo))[outside]
+
+            cross = rng.random((n_pop, n)) < self.recombination
+            cross[rows, rng.integers(n, size=n_pop)] = True
+            trial = np.where(cross, mutant, pop)
+            f_trial = self._evaluate(fun, trial)
+            nfev += n_pop
+            nit += 1
+
+            improved = f_trial <= f_pop
+            pop[improved] = trial[improved]
+            f_pop[improved] = f_trial[improved]
+            trace.append(float(np.min(f_pop)))
+
+            if np.all(np.isfinite(f_pop)) and self._converged(f_pop):
+                success, message = True, "Optimization terminated successfully."
+                break
+
+        best = int(np.argmin(f_pop))
+        return OptimizeResult(
+            x=pop[best],
+            fun=f_pop[best],
+            nfev=nfev,
+            nit=nit,
+            success=success,
+            message=message,
+            trace=trace,
+        )
+
+    def _converged(self, f_pop):
+        return np.std(f_pop) <= self.atol + self.tol * abs(np.mean(f_pop))
+
+    @staticmethod
+    def _evaluate(fun, X):
+        out = np.asarray(fun(X), dtype=np.float64)
+        out[np.isnan(out)] = np.inf
+        return out
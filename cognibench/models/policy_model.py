@@ -1,6 +1,16 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 from cognibench.logging import logger
-from cognibench.utils import negloglike, is_arraylike
-from scipy.optimize import minimize
+from cognibench.utils import (
+    negloglike,
+    is_arraylike,
+    validate_sequences,
+    spawn_seeds,
+)
+from scipy.optimize import minimize, OptimizeResult
+from scipy.special import expit
 import numpy as np
 from collections.abc import Mapping
 from gym import spaces
@@ -11,10 +21,17 @@ from cognibench.capabilities import (
     ReturnsNumParams,
 )
 from cognibench.continuous import ContinuousSpace
-from cognibench.models import CNBModel
+from cognibench.models import CNBModel, FitReport
 from overrides import overrides
 
 
+# scipy.optimize.minimize methods that do not use gradient information
+_GRADIENT_FREE_METHODS = ("nelder-mead", "powell", "cobyla")
+
+# half width of the search interval of batched optimizers for variables without finite bounds
+_SEARCH_RADIUS = 5.0
+
+
 class PolicyModel(CNBModel, Interactive, PredictsLogpdf, ReturnsNumParams):
     """
     PolicyModel provides a model implementation that can be created from agents satisfying
@@ -27,7 +44,17 @@ class PolicyModel(CNBModel, Interactive, PredictsLogpdf, ReturnsNumParams):
     """
 
     # TODO: can we adapt action and obs spaces according to the Agent (probably not worth it for now)
-    def __init__(self, *args, agent, optim_kwargs=None, **kwargs):
+    def __init__(
+        self,
+        *args,
+        agent,
+        optim_kwargs=None,
+        n_starts=1,
+        n_workers=None,
+        transform_params=False,
+        optimizer=None,
+        **kwargs,
+    ):
         """
         Parameters
         ----------
@@ -37,19 +64,56 @@ class PolicyModel(CNBModel, Interactive, PredictsLogpdf, ReturnsNumParams):
         optim_kwargs : dict (optional)
             Optimization parameters to be passed to :py:func:`scipy.optimize.minimize` function.
             By default it only defines `'method'` argument as 'L-BFGS-B'.
+
+        n_starts : int (optional)
+            Number of optimization starts to perform in `fit`, each from a different parameter initialization.
+            (Default: 1)
+
+        n_workers : int (optional)
+            Maximum number of worker processes used to run the optimization starts concurrently. If None, the number
+            of CPUs is used. If 1, the starts are run sequentially in the current process. (Default: None)
+
+        transform_params : bool (optional)
+            If True, bounded parameters are optimized in an unconstrained space: parameters with only a lower (upper)
+            bound are optimized on log scale and parameters with both bounds on logit scale. Fitted parameters are
+            always stored in their natural units. (Default: False)
+
+        optimizer : :class:`cognibench.models.optimizers.Optimizer` (optional)
+            Batched optimizer, e.g. :class:`cognibench.models.optimizers.DifferentialEvolution`, used instead of
+            :py:func:`scipy.optimize.minimize`. In this case `transform_params` and all the entries of `optim_kwargs`
+            except 'bounds' are ignored. See `fit` for how parameters without finite bounds are searched.
+            (Default: None)
         """
         assert isinstance(
             agent, ProducesPolicy
         ), "PolicyModel can only accept agents satisfying ProducesPolicy capability"
         super().__init__(*args, **kwargs)
+        assert n_starts >= 1, "n_starts must be a positive integer"
         self.agent = agent
+        self.agent.set_seed(spawn_seeds(self.get_seed(), 1)[0])
         self.optim_kwargs = optim_kwargs
+        self.n_starts = n_starts
+        self.n_workers = n_workers
+        self.transform_params = transform_params
+        self.optimizer = optimizer
+        self.start_results = []
+        self.fit_report = None
         self.init_paras()
         if self.optim_kwargs is None:
             self.optim_kwargs = {
                 "method": "L-BFGS-B",
             }
 
+    @overrides
+    def set_seed(self, value):
+        """
+        Set the model seed. The agent is seeded with a child of the model seed so that the model and the agent draw
+        from independent streams.
+        """
+        super().set_seed(value)
+        if hasattr(self, "agent"):
+            self.agent.set_seed(spawn_seeds(value, 1)[0])
+
     @overrides
     def n_params(self):
         cnt = 0
@@ -79,35 +143,83 @@ class PolicyModel(CNBModel, Interactive, PredictsLogpdf, ReturnsNumParams):
         :py:func:`scipy.optimize.minimize`. f and x0 parameters to the function is computed here; all
         the other keyword arguments can be modified in class initialization by providing 'optim_kwargs'
         argument.
+
+        If the agent implements `sequence_loglik_grad(stimuli, rewards, actions)`, the exact gradient of the
+        objective is passed to gradient-based optimizers (`jac=True`). Set `'jac'` in 'optim_kwargs' to override this
+        behaviour.
+
+        Parameters whose lower and upper bounds are equal are fixed to that value and left out of the optimization.
+        If the model was created with `transform_params=True`, the remaining bounded parameters are optimized in an
+        unconstrained space.
+
+        If the model was created with `n_starts > 1`, the optimization is started from `n_starts` different initial
+        parameters drawn from `param_initializer` and the starts are run concurrently on a process pool. The first
+        start uses the model seed and the others use seeds derived from it; the solution with the lowest negative
+        log-likelihood is kept. Results of all the starts are stored in `self.start_results` in start order.
+
+        If the model was created with an `optimizer`, each start runs that optimizer seeded with the seed of the start.
+        The starts are run sequentially and the candidates of each iteration are evaluated with `batch_negloglike`. If
+        the agent does not implement a batched likelihood, the candidates are instead split across a process pool of
+        `n_workers` processes. Parameters with both bounds are searched within their bounds. Parameters with a single
+        bound `b` are searched on log scale, i.e. `log|x - b|` in [-5, 5], and unbounded parameters in [-5, 5]. The
+        search interval of a parameter is widened to contain its initial value.
+
+        The stimuli and actions are validated once against the observation and action spaces according to the
+        "VALIDATION" policy in :py:data:`cognibench.settings`.
+
+        Returns
+        -------
+        :class:`cognibench.models.FitReport`
+            Diagnostics of the optimization start whose solution is kept. The report is also stored in
+            `self.fit_report`.
         """
         if "args" in self.optim_kwargs:
             raise ValueError(
                 'PolicyModel.fit: self.optim_kwargs cannot contain "args" key as this is used internally'
             )
+        validate_sequences(self, stimuli, actions)
+
+        seeds = self._start_seeds()
+        x0_list = []
+        for seed in seeds:
+            self.init_paras(seed=seed)
+            x0, lens = _flatten_dict_into_array(self.agent.get_paras())
+            x0_list.append(x0)
 
-        self.init_paras()
-        x0, lens = _flatten_dict_into_array(self.agent.get_paras())
         optim_kwargs = {k: v for k, v in self.optim_kwargs.items()}
-        optim_kwargs["args"] = (lens,)
-        if "bounds" not in optim_kwargs:
+        if "bounds" in optim_kwargs:
+            bounds = optim_kwargs["bounds"]
+        else:
             try:
                 bounds, _ = _flatten_dict_into_array(self.param_bounds, dtype=object)
                 bounds = bounds.reshape(len(bounds) // 2, 2)
             except AttributeError:
                 bounds = None
-            optim_kwargs["bounds"] = bounds
-
-        def f(x, lens):
-            _unpack_array_into_dict(self.agent.get_paras(), x, lens)
-            predictions = []
-            # TODO: essentially the same logic as InteractiveTesting; refactor?
-            self.reset()
-            for s, r, a in zip(stimuli, rewards, actions):
-                predictions.append(self.predict(s))
-                self.update(s, r, a)
-            return negloglike(actions, predictions)
-
-        opt_res = minimize(f, x0, **optim_kwargs)
+
+        if self.optimizer is not None:
+            results = self._minimize_batched(
+                x0_list, seeds, bounds, stimuli, rewards, actions
+            )
+        else:
+            results = self._minimize_local(
+                x0_list, lens, bounds, optim_kwargs, stimuli, rewards, actions
+            )
+
+        self.start_results = [
+            {
+                "seed": seed,
+                "x0": x0,
+                "x": res.x,
+                "fun": res.fun,
+                "success": res.success,
+                "message": res.message,
+                "report": report,
+            }
+            for seed, x0, (res, report) in zip(seeds, x0_list, results)
+        ]
+        funs = np.array([res.fun for res, _ in results], dtype=np.float64)
+        best = int(np.nanargmin(funs)) if not np.all(np.isnan(funs)) else 0
+        opt_res, self.fit_report = results[best]
         if not opt_res.success:
             logger().debug(
                 f"Fitting on {self.name} has not finished successfully! Cause of termination: {opt_res.message}"
@@ -118,6 +230,201 @@ class PolicyModel(CNBModel, Interactive, PredictsLogpdf, ReturnsNumParams):
         logger().debug(
             f"Agent parameters has been set to the outputs of optimization procedure."
         )
+        logger().debug(f"{self.name} : {self.fit_report}")
+        return self.fit_report
+
+    def _minimize_local(
+        self, x0_list, lens, bounds, optim_kwargs, stimuli, rewards, actions
+    ):
+        """
+        Run one :py:func:`scipy.optimize.minimize` call per initial parameter array, concurrently if multiple workers
+        are allowed, and return the list of (result, report) pairs.
+        """
+        transform = _ParameterTransform(
+            bounds, len(x0_list[0]), unconstrained=self.transform_params
+        )
+        optim_kwargs["bounds"] = transform.bounds()
+
+        args = (lens, optim_kwargs, stimuli, rewards, actions, transform)
+        n_workers = min(self.n_workers or os.cpu_count() or 1, len(x0_list))
+        if n_workers == 1:
+            results = [_minimize_negloglike(self.agent, x0, *args) for x0 in x0_list]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [
+                    executor.submit(_minimize_negloglike, self.agent, x0, *args)
+                    for x0 in x0_list
+                ]
+                results = [fut.result() for fut in futures]
+        return results
+
+    def _minimize_batched(self, x0_list, seeds, bounds, stimuli, rewards, actions):
+        """
+        Run `self.optimizer` once per initial parameter array and return the list of (result, report) pairs. Fixed
+        parameters are left out of the optimization.
+        """
+        transform = _ParameterTransform(
+            bounds, len(x0_list[0]), unconstrained=True, intervals=False
+        )
+        free_bounds = transform.search_bounds(_SEARCH_RADIUS)
+
+        n_workers = self.n_workers or os.cpu_count() or 1
+        executor = None
+        if n_workers > 1 and not hasattr(self.agent, "batch_negloglike"):
+            # the model and the data are sent to each worker once instead of with every chunk
+            executor = ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_worker,
+                initargs=(self, stimuli, rewards, actions),
+            )
+        telemetry = {"eval_time": 0.0}
+
+        def fun(Z):
+            beg = time.perf_counter()
+            X = np.array([transform.to_natural(z) for z in Z])
+            if executor is None:
+                out = self.batch_negloglike(X, stimuli, rewards, actions)
+            else:
+                chunks = [c for c in np.array_split(X, n_workers) if len(c) > 0]
+                futures = [executor.submit(_worker_batch_negloglike, c) for c in chunks]
+                out = np.concatenate([fut.result() for fut in futures])
+            telemetry["eval_time"] += time.perf_counter() - beg
+            return out
+
+        results = []
+        try:
+            for x0, seed in zip(x0_list, seeds):
+                telemetry["eval_time"] = 0.0
+                beg = time.perf_counter()
+                z0 = transform.to_internal(x0)
+                if len(z0) == 0:
+                    opt_res = OptimizeResult(
+                        x=z0,
+                        fun=fun(z0[None, :])[0],
+                        nfev=1,
+                        nit=0,
+                        success=True,
+                        message="All parameters are fixed",
+                        trace=[],
+                    )
+                else:
+                    # widen the search box of this start so that it contains the initial solution
+                    start_bounds = np.column_stack(
+                        [
+                            np.minimum(free_bounds[:, 0], z0),
+                            np.maximum(free_bounds[:, 1], z0),
+                        ]
+                    )
+                    opt_res = self.optimizer.minimize(fun, z0, start_bounds, seed=seed)
+                opt_res.x = transform.to_natural(opt_res.x)
+                report = FitReport(
+                    n_fev=opt_res.nfev,
+                    n_jev=0,
+                    eval_time=telemetry["eval_time"],
+                    wall_time=time.perf_counter() - beg,
+                    trace=opt_res.trace,
+                    success=opt_res.success,
+                    message=opt_res.message,
+                    fun=opt_res.fun,
+                    n_iter=opt_res.nit,
+                )
+                results.append((opt_res, report))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return results
+
+    def _start_seeds(self):
+        """
+        Return the parameter initialization seeds of each optimization start. The first seed is the model seed and
+        the remaining ones are spawned from it with :py:func:`cognibench.utils.spawn_seeds`, so they do not depend on
+        the number of workers. If the model seed is None, every start is seeded randomly.
+        """
+        seed = self.get_seed()
+        return [seed] + spawn_seeds(seed, self.n_starts)[1:]
+
+    def sequence_loglik(self, stimuli, rewards, actions):
+        """
+        Compute the log-likelihood of each action in a whole sequence of trials, starting from the current hidden
+        state. After the call, the hidden state of the agent is the same as if each trial had been passed to `predict`
+        and `update` in order.
+
+        If the underlying agent implements `sequence_loglik(stimuli, rewards, actions)`, the computation is delegated
+        to it. Otherwise, the log-likelihoods are computed by replaying the trials one at a time.
+
+        Parameters
+        ----------
+        stimuli : array-like
+            Sequence of stimuli.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Array of per-trial log-likelihood values with the same length as `actions`.
+        """
+        return _agent_sequence_loglik(self.agent, stimuli, rewards, actions)
+
+    def batch_negloglike(self, paras_matrix, stimuli, rewards, actions):
+        """
+        Compute the negative log-likelihood of a sequence of trials for K parameter vectors at once. Each parameter
+        vector is evaluated starting from the reset hidden state. The model parameters and hidden state are left
+        unchanged.
+
+        If the underlying agent implements `batch_negloglike(paras, stimuli, rewards, actions)`, where `paras` is a
+        dictionary of parameter arrays with a leading axis of length K, the K hidden states are advanced in lockstep
+        by the agent. Otherwise, the parameter vectors are evaluated one at a time.
+
+        Parameters
+        ----------
+        paras_matrix : array-like
+            Matrix of shape (K, n_params). Each row is a full flat parameter vector in natural units, i.e. the values
+            of the parameter dictionary in key order, including fixed parameters. This is not the optimization vector
+            used by `fit`, which leaves out fixed parameters and may be in a transformed space.
+
+        stimuli : array-like
+            Sequence of stimuli.
+
+        rewards : array-like
+            Sequence of rewards.
+
+        actions : array-like
+            Sequence of actions.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Negative log-likelihood of each parameter vector.
+        """
+        paras_matrix = np.atleast_2d(np.asarray(paras_matrix, dtype=np.float64))
+        paras = self.agent.get_paras()
+        _, lens = _flatten_dict_into_array(paras)
+        if hasattr(self.agent, "batch_negloglike"):
+            batch = {
+                k: paras_matrix[:, beg] if end - beg == 1 else paras_matrix[:, beg:end]
+                for k, beg, end in zip(paras.keys(), lens[:-1], lens[1:])
+            }
+            return self.agent.batch_negloglike(batch, stimuli, rewards, actions)
+
+        hidden_state = self.agent.get_hidden_state()
+        saved_paras = {
+            k: np.copy(v) if is_arraylike(v) else v for k, v in paras.items()
+        }
+        out = np.empty(len(paras_matrix), dtype=np.float64)
+        for i, x in enumerate(paras_matrix):
+            _unpack_array_into_dict(paras, x, lens)
+            self.agent.reset()
+            out[i] = negloglike(
+                actions, _agent_sequence_loglik(self.agent, stimuli, rewards, actions)
+            )
+        paras.update(saved_paras)
+        self.agent.set_hidden_state(hidden_state)
+        return out
 
     @overrides
     def predict(self, stimulus):
@@ -138,6 +445,301 @@ class PolicyModel(CNBModel, Interactive, PredictsLogpdf, ReturnsNumParams):
         return self.agent.act(stimulus)
 
 
+def _agent_sequence_loglik(agent, stimuli, rewards, actions):
+    """
+    Compute the per-trial log-likelihoods of the given actions using `agent.sequence_loglik` if it exists, and by
+    replaying the trials through `agent.eval_policy` and `agent.update` otherwise.
+    """
+    if hasattr(agent, "sequence_loglik"):
+        return agent.sequence_loglik(stimuli, rewards, actions)
+    out = np.empty(len(actions), dtype=np.float64)
+    for i, (s, r, a) in enumerate(zip(stimuli, rewards, actions)):
+        policy = agent.eval_policy(s)
+        out[i] = policy.logpdf(a) if hasattr(policy, "logpdf") else policy.logpmf(a)
+        agent.update(s, r, a, False)
+    return out
+
+
+# model and fitting data of a worker process started by `_init_worker`
+_WORKER_STATE = None
+
+
+def _init_worker(model, stimuli, rewards, actions):
+    """
+    Store the model and the fitting data in the worker process so that they are only sent to it once.
+    """
+    global _WORKER_STATE
+    _WORKER_STATE = (model, stimuli, rewards, actions)
+
+
+def _worker_batch_negloglike(paras_matrix):
+    """
+    Evaluate `batch_negloglike` of the model stored by `_init_worker` on its fitting data. This is a module level
+    function so that it can be sent to worker processes.
+    """
+    model, stimuli, rewards, actions = _WORKER_STATE
+    return model.batch_negloglike(paras_matrix, stimuli, rewards, actions)
+
+
+def _minimize_negloglike(
+    agent, x0, lens, optim_kwargs, stimuli, rewards, actions, transform
+):
+    """
+    Run a single optimization start that minimizes the negative log-likelihood of the given actions with respect to
+    the agent parameters. This is a module level function so that it can be sent to worker processes.
+
+    Parameters
+    ----------
+    agent : :class:`cognibench.models.CNBAgent`, :class:`cognibench.capabilities.ProducesPolicy`
+        Agent whose parameters are optimized. Its parameter dictionary is modified in place.
+
+    x0 : :class:`numpy.ndarray`
+        Initial parameters as a flat array in natural units.
+
+    lens : :class:`numpy.ndarray`
+        Beginning indices of each parameter in `x0` as returned by `_flatten_dict_into_array`.
+
+    optim_kwargs : dict
+        Keyword arguments passed to :py:func:`scipy.optimize.minimize`. Bounds must be given in the internal space of
+        `transform`.
+
+    stimuli, rewards, actions : array-like
+        Fitting data.
+
+    transform : `_ParameterTransform`
+        Mapping between the flat parameter array and the vector seen by the optimizer.
+
+    Returns
+    -------
+    opt_res : :class:`scipy.optimize.OptimizeResult`
+        Result of the optimization. `opt_res.x` is converted back to a flat parameter array in natural units.
+
+    report : :class:`cognibench.models.FitReport`
+        Evaluation counts, timings and convergence trace of the optimization.
+    """
+    optim_kwargs = dict(optim_kwargs)
+    optim_kwargs["args"] = (lens,)
+
+    def f(z, lens):
+        _unpack_array_into_dict(agent.get_paras(), transform.to_natural(z), lens)
+        agent.reset()
+        return negloglike(
+            actions, _agent_sequence_loglik(agent, stimuli, rewards, actions)
+        )
+
+    def f_and_grad(z, lens):
+        paras = agent.get_paras()
+        _unpack_array_into_dict(paras, transform.to_natural(z), lens)
+        agent.reset()
+        loglik, grad = agent.sequence_loglik_grad(stimuli, rewards, actions)
+        grad_arr, _ = _flatten_dict_into_array(
+            {k: grad[k] for k in paras.keys()}, dtype=np.float64
+        )
+        return negloglike(actions, loglik), -transform.grad(z, grad_arr)
+
+    method = optim_kwargs.get("method", None)
+    use_grad = (
+        hasattr(agent, "sequence_loglik_grad")
+        and optim_kwargs.get("jac", True) is True
+        and not (isinstance(method, str) and method.lower() in _GRADIENT_FREE_METHODS)
+    )
+    if use_grad:
+        optim_kwargs["jac"] = True
+
+    telemetry = {"n_fev": 0, "eval_time": 0.0}
+    # objective value of every evaluated point, so that the trace does not need extra evaluations
+    evaluated = {}
+    trace = []
+
+    def objective(x, lens):
+        beg = time.perf_counter()
+        out = f_and_grad(x, lens) if use_grad else f(x, lens)
+        telemetry["eval_time"] += time.perf_counter() - beg
+        telemetry["n_fev"] += 1
+        evaluated[_point_key(x)] = out[0] if use_grad else out
+        return out
+
+    user_callback = optim_kwargs.get("callback", None)
+
+    def callback(xk, *args):
+        trace.append(float(evaluated.get(_point_key(xk), np.nan)))
+        if user_callback is not None:
+            return user_callback(xk, *args)
+
+    optim_kwargs["callback"] = callback
+
+    beg = time.perf_counter()
+    z0 = transform.to_internal(x0)
+    if len(z0) == 0:
+        opt_res = OptimizeResult(
+            x=z0,
+            fun=f(z0, lens),
+            success=True,
+            message="All parameters are fixed",
+            nit=0,
+        )
+    else:
+        opt_res = minimize(objective, z0, **optim_kwargs)
+    opt_res.x = transform.to_natural(opt_res.x)
+    wall_time = time.perf_counter() - beg
+
+    report = FitReport(
+        n_fev=telemetry["n_fev"],
+        n_jev=telemetry["n_fev"] if use_grad else opt_res.get("njev", 0),
+        eval_time=telemetry["eval_time"],
+        wall_time=wall_time,
+        trace=trace,
+        success=opt_res.success,
+        message=opt_res.message,
+        fun=opt_res.fun,
+        n_iter=opt_res.get("nit", None),
+    )
+    return opt_res, report
+
+
+def _point_key(x):
+    """
+    Return a hashable key identifying the given point of the optimization space.
+    """
+    return np.asarray(x, dtype=np.float64).tobytes()
+
+
+class _ParameterTransform:
+    """
+    Mapping between the flat array of parameters in natural units and the vector optimized by the optimizer.
+
+    Parameters whose lower and upper bounds are equal are fixed to that value and left out of the optimization vector.
+    If `unconstrained` is True, parameters with only a lower bound `lo` are represented as `log(x - lo)`, parameters with
+    only an upper bound `hi` as `log(hi - x)`, and parameters with both bounds as `logit((x - lo) / (hi - lo))`, so that
+    the optimization vector is unbounded. If `intervals` is False, parameters with both bounds are optimized as they
+    are. Otherwise, the remaining parameters are optimized as they are.
+    """
+
+    def __init__(self, bounds, n, unconstrained=False, intervals=True):
+        """
+        Parameters
+        ----------
+        bounds : array-like or None
+            Sequence of (lower, upper) pairs for each of the `n` parameters. None values denote no bound. If None, no
+            parameter is bounded.
+
+        n : int
+            Number of parameters.
+
+        unconstrained : bool
+            Whether to map bounded parameters to the real line.
+
+        intervals : bool
+            Whether to map parameters with both bounds to the real line when `unconstrained` is True.
+        """
+        lo = np.full(n, -np.inf)
+        hi = np.full(n, np.inf)
+        if bounds is not None:
+            for i, (b_lo, b_hi) in enumerate(bounds):
+                lo[i] = -np.inf if b_lo is None else b_lo
+                hi[i] = np.inf if b_hi is None else b_hi
+        self.n = n
+        self.fixed = np.isfinite(lo) & (lo == hi)
+        self.free = ~self.fixed
+        self.fixed_values = lo[self.fixed]
+        self.lo = lo[self.free]
+        self.hi = hi[self.free]
+
+        n_free = len(self.lo)
+        if unconstrained:
+            has_lo, has_hi = np.isfinite(self.lo), np.isfinite(self.hi)
+            self.lower = has_lo & ~has_hi
+            self.upper = ~has_lo & has_hi
+            self.interval = (
+                has_lo & has_hi if intervals else np.zeros(n_free, dtype=bool)
+            )
+        else:
+            self.lower = self.upper = self.interval = np.zeros(n_free, dtype=bool)
+        self.identity = ~(self.lower | self.upper | self.interval)
+
+    def bounds(self):
+        """
+        Returns
+        -------
+        list of tuple
+            Bounds of the optimization vector in the format expected by :py:func:`scipy.optimize.minimize`.
+        """
+        out = []
+        for lo, hi, identity in zip(self.lo, self.hi, self.identity):
+            if not identity:
+                out.append((None, None))
+            else:
+                out.append((None if np.isinf(lo) else lo, None if np.isinf(hi) else hi))
+        return out
+
+    def search_bounds(self, radius):
+        """
+        Parameters
+        ----------
+        radius : float
+            Half width of the search interval used for the optimization variables that are unbounded.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Array of shape (n_free, 2) with finite lower and upper bounds of the optimization vector. Variables with
+            finite bounds keep them; the other variables are searched in `[-radius, radius]`.
+        """
+        out = np.tile([-radius, radius], (len(self.lo), 1)).astype(np.float64)
+        finite = self.identity & np.isfinite(self.lo) & np.isfinite(self.hi)
+        out[finite, 0] = self.lo[finite]
+        out[finite, 1] = self.hi[finite]
+        return out
+
+    def to_internal(self, x, eps=1e-8):
+        """
+        Map the flat array of parameters in natural units to the optimization vector. Values on the bounds of
+        transformed parameters are moved `eps` (relative to the width of the interval for two-sided bounds) inside.
+        """
+        x = np.asarray(x, dtype=np.float64)[self.free]
+        z = np.copy(x)
+        lower, upper, interval = self.lower, self.upper, self.interval
+        z[lower] = np.log(np.maximum(x[lower] - self.lo[lower], eps))
+        z[upper] = np.log(np.maximum(self.hi[upper] - x[upper], eps))
+        width = self.hi[interval] - self.lo[interval]
+        u = np.clip((x[interval] - self.lo[interval]) / width, eps, 1 - eps)
+        z[interval] = np.log(u) - np.log1p(-u)
+        return z
+
+    def to_natural(self, z):
+        """
+        Map the optimization vector to the flat array of parameters in natural units.
+        """
+        z = np.asarray(z, dtype=np.float64)
+        x = np.copy(z)
+        lower, upper, interval = self.lower, self.upper, self.interval
+        x[lower] = self.lo[lower] + np.exp(z[lower])
+        x[upper] = self.hi[upper] - np.exp(z[upper])
+        x[interval] = self.lo[interval] + (
+            self.hi[interval] - self.lo[interval]
+        ) * expit(z[interval])
+
+        out = np.empty(self.n, dtype=np.float64)
+        out[self.fixed] = self.fixed_values
+        out[self.free] = x
+        return out
+
+    def grad(self, z, grad_natural):
+        """
+        Given the gradient of a function with respect to the flat array of parameters in natural units, return its
+        gradient with respect to the optimization vector `z`.
+        """
+        z = np.asarray(z, dtype=np.float64)
+        g = np.asarray(grad_natural, dtype=np.float64)[self.free]
+        dx_dz = np.ones(len(z))
+        lower, upper, interval = self.lower, self.upper, self.interval
+        dx_dz[lower] = np.exp(z[lower])
+        dx_dz[upper] = -np.exp(z[upper])
+        s = expit(z[interval])
+        dx_dz[interval] = (self.hi[interval] - self.lo[interval]) * s * (1 - s)
+        return g * dx_dz
+
+
 def _unpack_array_into_dict(dictionary, arr, beg_indices):
     """
     Given an array of scalar values `arr` and a list of begin indices `beg_indices`, assign `i`ith sequence of scalars,
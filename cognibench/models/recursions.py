@@ -0,0 +1,331 @@
+"""
+Per-trial recursions of the built-in agents written as loops over plain arrays, so that they can be compiled to
+machine code by Numba.
+
+The backend is selected by the "BACKEND" setting in :py:data:`cognibench.settings`. If it is "numba" and Numba is
+installed, agents run the sequence likelihood and gradient recursions through the compiled functions of this module.
+Otherwise, they use their NumPy implementations. Functions are compiled on their first call and the compiled code is
+cached on disk.
+"""
+import math
+import numpy as np
+from cognibench.settings import settings
+from cognibench.logging import logger
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def numba_enabled():
+    """
+    Returns
+    -------
+    bool
+        True if the "BACKEND" setting is "numba" and Numba is installed. If Numba is selected but not installed, a
+        warning is logged once and False is returned.
+    """
+    if settings["BACKEND"] != "numba":
+        return False
+    if numba is None:
+        if not numba_enabled.warned:
+            logger().warning(
+                'BACKEND setting is "numba" but numba is not installed; using the Python backend'
+            )
+            numba_enabled.warned = True
+        return False
+    return True
+
+
+numba_enabled.warned = False
+
+
+def as_vector(x, n):
+    """
+    Return a scalar or an array-like parameter as a contiguous float vector of length n, as expected by the
+    recursions.
+    """
+    return np.ascontiguousarray(np.broadcast_to(x, n), dtype=np.float64)
+
+
+class _Kernel:
+    """
+    Function compiled by Numba on its first call. The uncompiled function is available as `py_func`.
+    """
+
+    def __init__(self, fn):
+        self.py_func = fn
+        self.__doc__ = fn.__doc__
+        self._compiled = None
+
+    def __call__(self, *args):
+        if self._compiled is None:
+            self._compiled = numba.njit(cache=True)(self.py_func)
+        return self._compiled(*args)
+
+
+def kernel(fn):
+    """
+    Decorator marking a function as a recursion that is compiled by Numba on its first call.
+    """
+    return _Kernel(fn)
+
+
+@kernel
+def rwck_loglik(
+    k_CK,
+    k_Q,
+    rewards,
+    actions,
+    CK_raw,
+    CK_scales,
+    Q_raw,
+    Q_scales,
+    beta,
+    beta_c,
+    eta,
+    eta_c,
+    min_scale,
+    eps,
+):
+    """
+    Sequence log-likelihood of :class:`cognibench.models.decision_making.RWCKAgent`. Rows of the CK and Q matrices
+    of each trial are given by their storage slots `k_CK` and `k_Q` and are updated in place.
+    """
+    n_trials = len(actions)
+    n_action = CK_raw.shape[1]
+    decay = 1 - eta_c
+    logits = np.empty(n_action)
+    loglik = np.empty(n_trials)
+    for i in range(n_trials):
+        kc, kq, a = k_CK[i], k_Q[i], actions[i]
+        c_CK, c_Q = CK_scales[kc], Q_scales[kq]
+        v_max = -np.inf
+        for j in range(n_action):
+            logits[j] = (beta * c_Q) * Q_raw[kq, j] + (beta_c * c_CK) * CK_raw[kc, j]
+            v_max = max(v_max, logits[j])
+        total = 0.0
+        for j in range(n_action):
+            total += math.exp(logits[j] - v_max)
+        loglik[i] = math.log(math.exp(logits[a] - v_max) / total + eps)
+
+        c_CK *= decay
+        if c_CK < min_scale:
+            for j in range(n_action):
+                CK_raw[kc, j] *= c_CK
+            c_CK = 1.0
+        CK_scales[kc] = c_CK
+        CK_raw[kc, a] += eta_c / c_CK
+        Q_raw[kq, a] += eta * (rewards[i] - c_Q * Q_raw[kq, a]) / c_Q
+    return loglik
+
+
+@kernel
+def rwck_loglik_grad(k_CK, k_Q, rewards, actions, CK, Q, beta, beta_c, eta, eta_c, eps):
+    """
+    Sequence log-likelihood of :class:`cognibench.models.decision_making.RWCKAgent` and its gradient with respect to
+    (beta, beta_c, w, eta, eta_c). Rows of the CK and Q matrices must have unit scale factors and are updated in
+    place.
+    """
+    n_trials = len(actions)
+    n_action = CK.shape[1]
+    # derivatives of Q with respect to w and eta, and of CK with respect to eta_c, per storage slot of Q
+    sens = np.zeros((Q.shape[0], n_action, 3))
+    sens[:, :, 0] = 1
+    seen = np.zeros(Q.shape[0], dtype=np.bool_)
+    pk = np.empty(n_action)
+    dV = np.empty((n_action, 5))
+    dloglik = np.zeros(5)
+    loglik = np.empty(n_trials)
+    for i in range(n_trials):
+        kc, kq, a = k_CK[i], k_Q[i], actions[i]
+        if not seen[kq]:
+            seen[kq] = True
+            sens[kq] = 0
+            sens[kq, :, 0] = 1
+        v_max = -np.inf
+        for j in range(n_action):
+            pk[j] = beta * Q[kq, j] + beta_c * CK[kc, j]
+            v_max = max(v_max, pk[j])
+        total = 0.0
+        for j in range(n_action):
+            pk[j] = math.exp(pk[j] - v_max)
+            total += pk[j]
+        for j in range(n_action):
+            pk[j] /= total
+        loglik[i] = math.log(pk[a] + eps)
+
+        for j in range(n_action):
+            dV[j, 0] = Q[kq, j]
+            dV[j, 1] = CK[kc, j]
+            dV[j, 2] = beta * sens[kq, j, 0]
+            dV[j, 3] = beta * sens[kq, j, 1]
+            dV[j, 4] = beta_c * sens[kq, j, 2]
+        coef = pk[a] / (pk[a] + eps)
+        for c in range(5):
+            mean = 0.0
+            for j in range(n_action):
+                mean += pk[j] * dV[j, c]
+            dloglik[c] += coef * (dV[a, c] - mean)
+
+        for j in range(n_action):
+            sens[kq, j, 2] = (1 - eta_c) * sens[kq, j, 2] - CK[kc, j]
+            CK[kc, j] *= 1 - eta_c
+        sens[kq, a, 2] += 1
+        CK[kc, a] += eta_c
+
+        delta = rewards[i] - Q[kq, a]
+        sens[kq, a, 0] *= 1 - eta
+        sens[kq, a, 1] = (1 - eta) * sens[kq, a, 1] + delta
+        Q[kq, a] += eta * delta
+    return loglik, dloglik
+
+
+@kernel
+def rw_norm_mean(stimuli, rewards, w, b0, b1, eta):
+    """
+    Predicted mean action of each trial of :class:`cognibench.models.associative_learning.RwNormAgent`. The weight
+    vector `w` is updated in place.
+    """
+    n_trials, n_obs = stimuli.shape
+    mu = np.empty(n_trials)
+    for i in range(n_trials):
+        pred, rhat = 0.0, 0.0
+        for j in range(n_obs):
+            pred += b1[j] * (stimuli[i, j] * w[j])
+            rhat += stimuli[i, j] * w[j]
+        mu[i] = b0 + pred
+        step = eta * (rewards[i] - rhat)
+        for j in range(n_obs):
+            w[j] += step * stimuli[i, j]
+    return mu
+
+
+@kernel
+def rw_norm_mean_grad(stimuli, rewards, w, b0, b1, eta):
+    """
+    Predicted mean action of each trial of :class:`cognibench.models.associative_learning.RwNormAgent` together with
+    its derivatives with respect to the initial weights, b1 and eta. The weight vector `w` is updated in place.
+    """
+    n_trials, n_obs = stimuli.shape
+    dw_dw0 = np.identity(n_obs)
+    dw_deta = np.zeros(n_obs)
+    s_dw = np.empty(n_obs)
+    mu = np.empty(n_trials)
+    dmu_dw0 = np.zeros((n_trials, n_obs))
+    dmu_db1 = np.empty((n_trials, n_obs))
+    dmu_deta = np.empty(n_trials)
+    for i in range(n_trials):
+        pred, rhat, d_eta, s_deta = 0.0, 0.0, 0.0, 0.0
+        for j in range(n_obs):
+            s_j = stimuli[i, j]
+            dmu_db1[i, j] = s_j * w[j]
+            pred += b1[j] * dmu_db1[i, j]
+            rhat += s_j * w[j]
+            d_eta += b1[j] * s_j * dw_deta[j]
+            s_deta += s_j * dw_deta[j]
+            for c in range(n_obs):
+                dmu_dw0[i, c] += b1[j] * s_j * dw_dw0[j, c]
+        mu[i] = b0 + pred
+        dmu_deta[i] = d_eta
+
+        delta = rewards[i] - rhat
+        for c in range(n_obs):
+            s_dw[c] = 0.0
+            for j in range(n_obs):
+                s_dw[c] += stimuli[i, j] * dw_dw0[j, c]
+        for j in range(n_obs):
+            s_j = stimuli[i, j]
+            dw_deta[j] += delta * s_j - eta * s_deta * s_j
+            for c in range(n_obs):
+                dw_dw0[j, c] -= eta * s_j * s_dw[c]
+            w[j] += eta * delta * s_j
+    return mu, dmu_dw0, dmu_db1, dmu_deta
+
+
+@kernel
+def lsspd_mean(stimuli, rewards, w, alpha, b0, b1, eta, kappa, mix_coef):
+    """
+    Predicted mean action of each trial of :class:`cognibench.models.associative_learning.LSSPDAgent`. The weight
+    and associability vectors `w` and `alpha` are updated in place.
+    """
+    n_trials, n_obs = stimuli.shape
+    mu = np.empty(n_trials)
+    for i in range(n_trials):
+        pred, rhat = 0.0, 0.0
+        for j in range(n_obs):
+            s_j = stimuli[i, j]
+            pred += b1[j] * (s_j * (mix_coef * w[j] + (1 - mix_coef) * alpha[j]))
+            rhat += s_j * w[j]
+        mu[i] = b0 + pred
+
+        delta = rewards[i] - rhat
+        for j in range(n_obs):
+            s_j = stimuli[i, j]
+            w[j] += kappa * delta * alpha[j] * s_j
+            alpha[j] = min(alpha[j] + s_j * (eta * abs(delta) - eta * alpha[j]), 1.0)
+    return mu
+
+
+@kernel
+def lsspd_mean_grad(stimuli, rewards, w, alpha, b0, b1, eta, kappa, mix_coef):
+    """
+    Predicted mean action of each trial of :class:`cognibench.models.associative_learning.LSSPDAgent` together with
+    its derivatives with respect to the state parameters (initial w, initial alpha, eta, kappa), b1 and mix_coef. The
+    weight and associability vectors `w` and `alpha` are updated in place.
+    """
+    n_trials, n_obs = stimuli.shape
+    n_cols = 2 * n_obs + 2
+    eta_col, kappa_col = 2 * n_obs, 2 * n_obs + 1
+    dw = np.zeros((n_obs, n_cols))
+    dalpha = np.zeros((n_obs, n_cols))
+    for j in range(n_obs):
+        dw[j, j] = 1
+        dalpha[j, n_obs + j] = 1
+    ddelta = np.empty(n_cols)
+    mu = np.empty(n_trials)
+    dmu_dstate = np.zeros((n_trials, n_cols))
+    dmu_db1 = np.empty((n_trials, n_obs))
+    dmu_dmix = np.empty(n_trials)
+    for i in range(n_trials):
+        pred, rhat, d_mix = 0.0, 0.0, 0.0
+        for j in range(n_obs):
+            s_j = stimuli[i, j]
+            b1_s = b1[j] * s_j
+            dmu_db1[i, j] = s_j * (mix_coef * w[j] + (1 - mix_coef) * alpha[j])
+            pred += b1[j] * dmu_db1[i, j]
+            rhat += s_j * w[j]
+            d_mix += b1_s * (w[j] - alpha[j])
+            for c in range(n_cols):
+                dmu_dstate[i, c] += b1_s * (
+                    mix_coef * dw[j, c] + (1 - mix_coef) * dalpha[j, c]
+                )
+        mu[i] = b0 + pred
+        dmu_dmix[i] = d_mix
+
+        delta = rewards[i] - rhat
+        sign = np.sign(delta)
+        for c in range(n_cols):
+            ddelta[c] = 0.0
+            for j in range(n_obs):
+                ddelta[c] -= stimuli[i, j] * dw[j, c]
+        for j in range(n_obs):
+            s_j = stimuli[i, j]
+            for c in range(n_cols):
+                dw[j, c] += kappa * (
+                    alpha[j] * s_j * ddelta[c] + delta * s_j * dalpha[j, c]
+                )
+                dalpha[j, c] = (1 - eta * s_j) * dalpha[j, c] + eta * (
+                    s_j * sign * ddelta[c]
+                )
+            dw[j, kappa_col] += delta * alpha[j] * s_j
+            dalpha[j, eta_col] += s_j * (abs(delta) - alpha[j])
+
+            w[j] += kappa * delta * alpha[j] * s_j
+            alpha[j] += s_j * (eta * abs(delta) - eta * alpha[j])
+            if alpha[j] > 1:
+                alpha[j] = 1.0
+                for c in range(n_cols):
+                    dalpha[j, c] = 0.0
+    return mu, dmu_dstate, dmu_db1, dmu_dmix
@@ -1,9 +1,12 @@
 import gym
+import os
 import types
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 import sciunit
 import numpy as np
 from cognibench.capabilities import Interactive, MultiSubjectModel
+from cognibench.utils import spawn_seeds
 
 
 def multi_from_single_cls(single_cls):
@@ -20,7 +23,10 @@ def multi_from_single_cls(single_cls):
     out_cls : :class:`cognibench.model.CNBModel`
         A multi-subject model class. Each method of the new class now takes an additional subject index (0-based) as
         their first argument. If a subject index is not provided during a method call, the method of subject with index
-        0 is called by default.
+        0 is called by default. In addition to the arguments of `single_cls`, the constructor of the new class takes
+        the number of subjects `n_subj` and an optional `n_fit_workers` argument (default 1) that sets the number of
+        processes used to fit the subject models in `fit_jointly`. If a `seed` is given, each subject model is seeded
+        with its own child seed spawned from it by :py:func:`cognibench.utils.spawn_seeds`.
     """
     multi_cls_name = "Multi" + single_cls.__name__
     return MultiMeta(
@@ -133,10 +139,12 @@ class MultiMeta(type):
             and not (f.startswith("__") and f.endswith("__"))
         ]
 
-        def multi_init(self, *args, n_subj, **kwargs):
+        def multi_init(self, *args, n_subj, n_fit_workers=1, **kwargs):
+            self.n_fit_workers = n_fit_workers
             self.subject_models = []
-            for _ in range(n_subj):
-                self.subject_models.append(single_cls(*args, **kwargs))
+            subj_seeds = spawn_seeds(kwargs.pop("seed", None), n_subj)
+            for subj_seed in subj_seeds:
+                self.subject_models.append(single_cls(*args, seed=subj_seed, **kwargs))
             self.n_subjects = len(self.subject_models)
 
             def new_fn(*args, fn_name, **kwargs):
@@ -167,19 +175,68 @@ class MultiMeta(type):
             kwargs : dict
                 Each keyword argument to this function must be an iterable that contains the subject-specific fitting
                 keyword arguments.
+
+            Notes
+            -----
+            If the model was created with `n_fit_workers` other than 1, subject models are fitted concurrently on a
+            process pool with at most `n_fit_workers` workers (number of CPUs if None). Each subject model is sent to a
+            worker together with its data. The worker sends back the fitted parameters and the fitting diagnostics
+            (`fit_report`, `start_results`), which are set on the original subject model. Hence, subject models must
+            be picklable. The fitted parameters are the same as the ones obtained by fitting serially.
             """
             # TODO: provide an example of item (2) above.
-            for i, model in enumerate(self.subject_models):
+            subject_data = []
+            for i in range(len(self.subject_models)):
                 curr_args = []
                 curr_kwargs = dict()
                 for arg in args:
                     curr_args.append(arg[i])
                 for k, v in kwargs.items():
                     curr_kwargs[k] = v[i]
-                model.fit(*curr_args, **curr_kwargs)
+                subject_data.append((curr_args, curr_kwargs))
+
+            n_workers = self.n_fit_workers or os.cpu_count() or 1
+            n_workers = min(n_workers, len(self.subject_models))
+            if n_workers <= 1:
+                for model, (curr_args, curr_kwargs) in zip(
+                    self.subject_models, subject_data
+                ):
+                    model.fit(*curr_args, **curr_kwargs)
+                return
+
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [
+                    executor.submit(_fit_subject_model, model, curr_args, curr_kwargs)
+                    for model, (curr_args, curr_kwargs) in zip(
+                        self.subject_models, subject_data
+                    )
+                ]
+                for model, fut in zip(self.subject_models, futures):
+                    paras, diagnostics = fut.result()
+                    model.set_paras(paras)
+                    for attr, value in diagnostics.items():
+                        setattr(model, attr, value)
 
         out_cls.__init__ = multi_init
         out_cls.fit_jointly = fit_jointly
         out_cls.multi_subject_methods = methods_to_define
 
         return out_cls
+
+
+# Model attributes storing fitting diagnostics that are sent back from the fitting workers.
+_FIT_DIAGNOSTIC_ATTRS = ("fit_report", "start_results")
+
+
+def _fit_subject_model(model, args, kwargs):
+    """
+    Fit a single subject model on the given data and return its fitted parameters and fitting diagnostics. This is a
+    module level function so that it can be sent to worker processes.
+    """
+    model.fit(*args, **kwargs)
+    diagnostics = {
+        attr: getattr(model, attr)
+        for attr in _FIT_DIAGNOSTIC_ATTRS
+        if hasattr(model, attr)
+    }
+    return model.get_paras(), diagnostics
@@ -2,5 +2,21 @@
 settings = {
     # If True, then the code will throw an exception when an error occurs; otherwise, the code catches exceptional
     # situations and continues to execute. Settings this option to True is useful for debugging purposes.
-    "CRASH_EARLY": False
+    "CRASH_EARLY": False,
+    # Validation policy for the stimuli and actions given to models and agents. Possible values are
+    #   "sequence": whole stimulus and action sequences are validated once with vectorized checks when a CNBTest judges
+    #       a model and when PolicyModel.fit is called. Agents do not check the inputs of individual trials.
+    #   "strict": in addition to sequence validation, agents check the stimulus and action of every trial. Useful for
+    #       debugging.
+    #   "none": no validation.
+    "VALIDATION": "sequence",
+    # Number of uniforms and normals that the random number generators of models and agents draw at once and hand out
+    # one at a time (see cognibench.utils.BufferedRNG). Sampled values depend on the seed and this block size. If None,
+    # models and agents use an unbuffered numpy.random.Generator.
+    "RNG_BLOCK_SIZE": 4096,
+    # Backend running the per-trial likelihood and gradient recursions of the built-in agents. Possible values are
+    #   "python": NumPy implementations of the agents.
+    #   "numba": recursions compiled by Numba (see cognibench.models.recursions). Falls back to "python" if Numba is
+    #       not installed.
+    "BACKEND": "python",
 }
@@ -9,7 +9,62 @@ from cognibench.logging import logger
 from cognibench import settings
 
 
-def simulate(env, model_or_agent, n_trials, check_env_model=True):
+class SimulationResult:
+    """
+    Columnar result of :py:func:`simulate`. Stimuli, rewards and actions of every trial are stored in preallocated
+    :class:`numpy.ndarray` columns so that they can be passed to the sequence likelihood methods of the models without
+    conversion.
+
+    For backward compatibility, a result can be unpacked and indexed like the `(stimuli, rewards, actions)` tuple
+    returned by earlier versions.
+
+    Attributes
+    ----------
+    stimuli : :class:`numpy.ndarray`
+        Stimuli produced after each trial, of shape `(n_trials,) + stimulus_shape`. Stimulus of trial `i + 1` is
+        `stimuli[i]`; the initial stimulus of the environment is not included.
+
+    rewards : :class:`numpy.ndarray`
+        Float array of rewards obtained after each trial.
+
+    actions : :class:`numpy.ndarray`
+        Actions performed by the model in each trial, of shape `(n_trials,) + action_shape`. Integer actions are stored
+        as int64 and the others as float64.
+
+    hidden_states : dict
+        If the hidden state was recorded, maps each hidden state variable to an array of shape
+        `(n_trials,) + variable_shape` whose i-th entry is the value of the variable when the model acted in trial i.
+        Empty otherwise.
+    """
+
+    __slots__ = ("stimuli", "rewards", "actions", "hidden_states")
+
+    def __init__(self, stimuli, rewards, actions, hidden_states=None):
+        self.stimuli = stimuli
+        self.rewards = rewards
+        self.actions = actions
+        self.hidden_states = {} if hidden_states is None else hidden_states
+
+    def __iter__(self):
+        return iter((self.stimuli, self.rewards, self.actions))
+
+    def __getitem__(self, idx):
+        return (self.stimuli, self.rewards, self.actions)[idx]
+
+    def __len__(self):
+        return 3
+
+    @property
+    def n_trials(self):
+        return len(self.rewards)
+
+    def __repr__(self):
+        return f"SimulationResult(n_trials={self.n_trials}, hidden_states={list(self.hidden_states)})"
+
+
+def simulate(
+    env, model_or_agent, n_trials, check_env_model=True, record_hidden_state=False
+):
     """
     Simulate the evolution of an environment and a model or an agent for a
     fixed number of steps.
@@ -30,42 +85,49 @@ def simulate(env, model_or_agent, n_trials, check_env_model=True):
     check_env_model : bool
         Whether to check if the model/agent and the environment has matching action and observation spaces.
 
+    record_hidden_state : bool
+        Whether to record the hidden state of the agent in each trial. Models must expose their agent as the `agent`
+        attribute, as :class:`cognibench.models.policy_model.PolicyModel` does.
+
     Returns
     -------
-    stimuli : list
-        List of all the stimuli produced after each trial. This list does not
-        contain the initial state of the environment. Hence, its size is `n_trials`.
-
-    rewards : list
-        List of rewards obtained after each trial.
-
-    actions : list
-        List of actions performed by the model in each trial.
+    :class:`SimulationResult`
+        Stimuli, rewards and actions of each trial, and the hidden state traces if requested. It can be unpacked as
+        `stimuli, rewards, actions = simulate(...)`.
     """
     if check_env_model and not _model_env_capabilities_match(env, model_or_agent):
         error_msg = f"simulate : Env {env} and model {model_or_agent} action and observation spaces aren't the same!"
         logger().error(error_msg)
         if settings["CRASH_EARLY"]:
             raise ValueError(error_msg)
-        return [], [], []
+        return SimulationResult(np.empty(0), np.empty(0), np.empty(0))
 
-    actions = []
-    rewards = []
-    stimuli = []
-    initial_stimulus = env.reset()
-    stimuli.append(initial_stimulus)
+    if record_hidden_state:
+        agent = _agent_of(model_or_agent)
+    rewards = np.empty(n_trials, dtype=np.float64)
+    stimuli = actions = None
+    hidden_states = {}
+    s = env.reset()
     for i in range(n_trials):
-        s = stimuli[-1]
+        if record_hidden_state:
+            _record(hidden_states, agent.get_hidden_state(), i, n_trials)
         a = model_or_agent.act(s)
         s_next, r, done, _ = env.step(a)
         model_or_agent.update(s, r, a, done)
         env.update(s, r, a, done)
-        actions.append(a)
-        rewards.append(r)
-        stimuli.append(s_next)
+        if i == 0:
+            stimuli = _allocate(s_next, n_trials)
+            actions = _allocate(a, n_trials)
+        actions[i] = a
+        rewards[i] = r
+        stimuli[i] = s_next
+        s = s_next
     env.close()
 
-    return stimuli[1:], rewards, actions
+    if n_trials == 0:
+        stimuli = _allocate(s, 0)
+        actions = np.empty(0)
+    return SimulationResult(stimuli, rewards, actions, hidden_states)
 
 
 def simulate_multienv_multimodel(
@@ -93,17 +155,14 @@ def simulate_multienv_multimodel(
 
     Returns
     -------
-    stimuli : list of list
-        Each element of this list is a subject list which is the result of the simulation with the
-        corresponding environment.
+    stimuli : tuple of :class:`numpy.ndarray`
+        Each element is the stimulus array of the simulation with the corresponding environment.
 
-    rewards : list of list
-        Each element of this list is a reward list which is the result of the simulation with the
-        corresponding environment.
+    rewards : tuple of :class:`numpy.ndarray`
+        Each element is the reward array of the simulation with the corresponding environment.
 
-    actions : list of list
-        Each element of this list is a action list which is the result of the simulation with the
-        corresponding environment.
+    actions : tuple of :class:`numpy.ndarray`
+        Each element is the action array of the simulation with the corresponding environment.
 
     See Also
     --------
@@ -144,6 +203,45 @@ def simulate_multienv_multimodel(
     return stimuli, rewards, actions
 
 
+def _allocate(first_value, n_trials):
+    """
+    Allocate a column of `n_trials` entries shaped like `first_value`. Integer and boolean values are stored as int64
+    and the others as float64.
+    """
+    first_value = np.asarray(first_value)
+    is_int = first_value.dtype.kind in "biu"
+    return np.empty(
+        (n_trials,) + first_value.shape, dtype=np.int64 if is_int else np.float64
+    )
+
+
+def _agent_of(model_or_agent):
+    """
+    Return the object whose hidden state is recorded during a simulation.
+    """
+    if isinstance(model_or_agent, CNBAgent):
+        return model_or_agent
+    agent = getattr(model_or_agent, "agent", None)
+    if agent is None:
+        raise ValueError(
+            f"simulate : Model {model_or_agent} does not expose an agent whose hidden state can be recorded!"
+        )
+    return agent
+
+
+def _record(hidden_states, hidden_state, idx, n_trials):
+    """
+    Write the values of the given hidden state to the trial `idx` of the trace arrays, allocating them first if needed.
+    """
+    for key, val in hidden_state.items():
+        if key not in hidden_states:
+            val_arr = np.asarray(val)
+            hidden_states[key] = np.empty(
+                (n_trials,) + val_arr.shape, dtype=val_arr.dtype
+            )
+        hidden_states[key][idx] = val
+
+
 def _model_env_capabilities_match(env, model_or_agent):
     """
     Check if capabilities, action spaces and observation spaces of the environment and model/agent matches.
@@ -1,2 +1,3 @@
 from .base import CNBTest
 from .tests import InteractiveTest, BatchTest, BatchTestWithSplit
+from .cache import FitCache
@@ -1,4 +1,5 @@
 from os import makedirs
+import json
 import traceback
 from os.path import join as pathjoin
 import numpy as np
@@ -8,6 +9,7 @@ from cognibench.models import CNBModel
 from cognibench import settings
 from cognibench.capabilities import MultiSubjectModel
 from cognibench.models.utils import single_from_multi_obj, reverse_single_from_multi_obj
+from cognibench.utils import validate_sequences
 from overrides import overrides
 from cognibench.logging import logger
 from collections import defaultdict
@@ -39,6 +41,7 @@ class CNBTest(SciunitTest):
         persist_path=None,
         fn_kwargs_for_score=None,
         optimize_models=True,
+        fit_cache=None,
         **kwargs,
     ):
         """
@@ -86,12 +89,18 @@ class CNBTest(SciunitTest):
         optimize_models : bool
             If `True`, models' `fit` method will be called on the given observation data before generating the
             predictions. If `False`, no model fitting is performed.
+
+        fit_cache : :class:`cognibench.testing.FitCache` (Optional)
+            Cache of fitting results. If given, models that have already been fitted on the same fitting observations
+            with the same settings are loaded from the cache instead of being fitted again. If `None`, models are always
+            fitted.
         """
         self.multi_subject = multi_subject
         self.score_aggr_fn = score_aggr_fn
         self.persist_path = persist_path
         self.fn_kwargs_for_score = fn_kwargs_for_score
         self.optimize_models = optimize_models
+        self.fit_cache = fit_cache
 
         if multi_subject:
             assert isinstance(observation, list)
@@ -184,6 +193,14 @@ class CNBTest(SciunitTest):
         Add optional model optimization functionality to :py:meth:`sciunit.Test.judge` method, and delegate the rest
         of the work to the superclass.
         """
+        try:
+            self.validate_observations(model)
+        except Exception as e:
+            logger().error(
+                f"{self.name} : Observations are not valid for model {model.name}! Exception {e}"
+            )
+            if settings["CRASH_EARLY"]:
+                raise e
         if self.optimize_models:
             try:
                 self.optimize(model)
@@ -196,6 +213,33 @@ class CNBTest(SciunitTest):
 
         return super().judge(model, *args, **kwargs)
 
+    def validate_observations(self, model):
+        """
+        Validate the 'stimuli' and 'actions' sequences of the fitting and testing observations of every subject
+        against the observation and action spaces of the model, according to the "VALIDATION" policy in
+        :py:data:`cognibench.settings`. Each sequence is checked once with vectorized checks, so that models do not
+        need to validate individual trials.
+
+        Raises
+        ------
+        ValueError
+            If a sequence contains an element that is not in the corresponding space.
+        """
+        if settings["VALIDATION"] == "none":
+            return
+        fitting = self.get_fitting_observations()
+        testing = self.get_testing_observations()
+        if not self.multi_subject:
+            fitting, testing = [fitting], [testing]
+        # models created by multi_from_single_cls dispatch the space methods to their subject models
+        subject_models = getattr(model, "subject_models", None)
+        for subj_idx, (fit_obs, test_obs) in enumerate(zip(fitting, testing)):
+            subj_model = model if subject_models is None else subject_models[subj_idx]
+            for obs in (fit_obs,) if fit_obs is test_obs else (fit_obs, test_obs):
+                validate_sequences(
+                    subj_model, obs.get("stimuli", None), obs.get("actions", None)
+                )
+
     @overrides
     def optimize(self, model):
         """
@@ -208,8 +252,16 @@ class CNBTest(SciunitTest):
         then `fit_jointly` will be called as:
 
             `fit_jointly(k0=[v00, v10], k1=[v01, v11])`
+
+        If `self.fit_cache` is given and contains the fitting results for the model and observations, the results are
+        loaded from the cache and no fitting is performed.
         """
         obs = self.get_fitting_observations()
+        if self.fit_cache is not None and self.fit_cache.load(model, obs):
+            logger().info(
+                f"{self.name} : Fitting results of {model.name} model are loaded from cache"
+            )
+            return
         logger().info(f"{self.name} : Optimizing {model.name} model...")
         if self.multi_subject:
             dict_of_lists = defaultdict(list)
@@ -220,6 +272,9 @@ class CNBTest(SciunitTest):
         else:
             model.fit(**obs)
 
+        if self.fit_cache is not None:
+            self.fit_cache.store(model, obs)
+
     @overrides
     def generate_prediction(self, model):
         """
@@ -240,19 +295,31 @@ class CNBTest(SciunitTest):
             n_subj = len(observations)
             predictions = []
             score_kwargs = []
+            try:
+                joint_predictions = self.predict_jointly(model, observations)
+            except Exception as e:
+                logger().error(
+                    f"{self.name} : {model.name} predict_jointly call has failed! Exception: {e}"
+                )
+                if settings["CRASH_EARLY"]:
+                    raise e
+                joint_predictions = [[] for _ in range(n_subj)]
             for subj_idx in range(n_subj):
                 single_subj_adapter = single_from_multi_obj(model, subj_idx)
-                try:
-                    pred_single = self.predict_single(
-                        single_subj_adapter, observations[subj_idx]
-                    )
-                except Exception as e:
-                    logger().error(
-                        f"{self.name} : {model.name} predict_single call has failed! Exception: {e}"
-                    )
-                    if settings["CRASH_EARLY"]:
-                        raise e
-                    pred_single = []
+                if joint_predictions is not None:
+                    pred_single = joint_predictions[subj_idx]
+                else:
+                    try:
+                        pred_single = self.predict_single(
+                            single_subj_adapter, observations[subj_idx]
+                        )
+                    except Exception as e:
+                        logger().error(
+                            f"{self.name} : {model.name} predict_single call has failed! Exception: {e}"
+                        )
+                        if settings["CRASH_EARLY"]:
+                            raise e
+                        pred_single = []
 
                 predictions.append(pred_single)
                 score_kwargs.append(
@@ -325,6 +392,27 @@ class CNBTest(SciunitTest):
                 score = self.score_type(np.NaN)
         return score
 
+    def predict_jointly(self, model, observations):
+        """
+        Generate the predictions of all the subjects of a multi-subject model at once. Tests can override this method
+        for models that can process the data of every subject in a single call. Returning None means that predictions
+        are generated subject by subject using `predict_single`.
+
+        Parameters
+        ----------
+        model : :class:`cognibench.models.CNBModel`
+            A multi-subject model.
+
+        observations : list of dict
+            Testing observations of each subject.
+
+        Returns
+        -------
+        list or None
+            List of predictions of each subject, or None.
+        """
+        return None
+
     def predict_single(self, model, observations, **kwargs):
         """
         Generate predictions for one group of testing. In the single subject case, this is the main prediction
@@ -407,6 +495,7 @@ class CNBTest(SciunitTest):
         folderpath = pathjoin(self.persist_path, model.name)
         makedirs(folderpath, exist_ok=True)
         score_filepath = pathjoin(folderpath, "score")
+        fit_report_filepath = pathjoin(folderpath, "fit_report.json")
         pred_filepath = pathjoin(folderpath, "predictions")
         model_filepath = pathjoin(folderpath, "model")
         try:
@@ -415,6 +504,14 @@ class CNBTest(SciunitTest):
             logger().error(f"{self.name} : persist_score has failed! Exception {e}")
             if settings["CRASH_EARLY"]:
                 raise e
+        try:
+            self.persist_fit_report(fit_report_filepath, model)
+        except Exception as e:
+            logger().error(
+                f"{self.name} : persist_fit_report has failed! Exception {e}"
+            )
+            if settings["CRASH_EARLY"]:
+                raise e
         try:
             self.persist_predictions(pred_filepath, prediction)
         except Exception as e:
@@ -439,6 +536,32 @@ class CNBTest(SciunitTest):
         np.save(path, np.asarray(score.score))
         logger().debug(f"Score is saved in {path}")
 
+    def persist_fit_report(self, path, model):
+        """
+        Persist the fitting diagnostics of the model as JSON in the given path, if the model stores a `fit_report`
+        (see :class:`cognibench.models.FitReport`). In the multi-subject case, a list containing the report of each
+        subject is saved.
+        """
+        if self.multi_subject:
+            models = getattr(model, "subject_models", [])
+            reports = [getattr(m, "fit_report", None) for m in models]
+            if all(r is None for r in reports):
+                reports = None
+            else:
+                reports = [None if r is None else r.to_dict() for r in reports]
+        else:
+            report = getattr(model, "fit_report", None)
+            reports = None if report is None else report.to_dict()
+
+        if reports is None:
+            logger().debug(
+                f"Model {model.name} does not have a fit report; fit report has not been saved."
+            )
+            return
+        with open(path, "w") as f:
+            json.dump(reports, f, indent=2)
+        logger().debug(f"Fit report is saved in {path}")
+
     def persist_predictions(self, path, predictions):
         """
         Persist the predictions in the given path.
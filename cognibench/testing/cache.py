@@ -0,0 +1,267 @@
+import os
+import hashlib
+import pickle
+from os.path import join as pathjoin
+import numpy as np
+import gym
+from collections.abc import Mapping
+from cognibench.capabilities import MultiSubjectModel
+from cognibench.utils import int_seed
+from cognibench.logging import logger
+
+
+class FitCache:
+    """
+    On-disk cache of model fitting results.
+
+    Each entry is addressed by a hash of everything that determines the outcome of fitting a model: the model class and
+    version, its action and observation spaces, the public attributes of its agent (such as the distinct stimuli of
+    a beta-binomial agent), the initial parameters produced by `param_initializer` for the model seed, optimization
+    settings (`optim_kwargs`, `optimizer`), parameter bounds (`param_bounds`), the random seed and the fitting
+    observations. An entry stores the fitted parameters and the optimizer diagnostics of the model.
+    When the total size of the cache exceeds the given limit, least recently used entries are evicted.
+
+    Models whose seed is None are never cached since their fitting results are not reproducible.
+
+    A cache object can be passed to :class:`cognibench.testing.CNBTest` via `fit_cache` argument so that repeated
+    tests on the same model and data skip fitting.
+    """
+
+    # Model attributes storing optimizer diagnostics that are saved alongside the fitted parameters.
+    diagnostic_attrs = ("start_results", "fit_report")
+
+    def __init__(self, path, max_size=2 ** 30):
+        """
+        Parameters
+        ----------
+        path : str
+            Path to the folder where cache entries will be saved. Directory is automatically created if it does not
+            exist.
+
+        max_size : int (optional)
+            Maximum total size of the cache entries in bytes. (Default: 1 GiB)
+        """
+        assert max_size > 0, "max_size must be positive"
+        self.path = path
+        self.max_size = max_size
+        os.makedirs(path, exist_ok=True)
+
+    def key(self, model, observations):
+        """
+        Compute the cache key of fitting the given model on the given observations.
+
+        Parameters
+        ----------
+        model : :class:`cognibench.models.CNBModel`
+            Single- or multi-subject model.
+
+        observations : dict or list of dict
+            Fitting observations as returned by :py:meth:`cognibench.testing.CNBTest.get_fitting_observations`.
+
+        Returns
+        -------
+        str or None
+            Hexadecimal digest of the fitting inputs, or None if the fitting results of the model are not reproducible.
+        """
+        h = hashlib.sha256()
+        cls = type(model)
+        _hash_update(h, f"{cls.__module__}.{cls.__qualname__}")
+        for m in _fitted_models(model):
+            if m.get_seed() is None:
+                return None
+            _hash_update(h, getattr(m, "version", None))
+            _hash_update(h, getattr(m, "optim_kwargs", None))
+            _hash_update(h, getattr(m, "param_bounds", None))
+            _hash_update(h, getattr(m, "n_starts", None))
+            _hash_update(h, getattr(m, "transform_params", None))
+            _hash_update(h, getattr(m, "optimizer", None))
+            _hash_update(h, m.get_seed())
+            _hash_update(h, _spaces(m))
+            agent = getattr(m, "agent", None)
+            if agent is not None:
+                _hash_update(h, _spaces(agent))
+                _hash_update(h, _public_attrs(agent))
+            _hash_update(h, _initial_paras(m))
+        _hash_update(h, observations)
+        return h.hexdigest()
+
+    def load(self, model, observations):
+        """
+        Set the fitted parameters and diagnostics of the model from the cache, if an entry exists.
+
+        Parameters
+        ----------
+        model : :class:`cognibench.models.CNBModel`
+            Single- or multi-subject model.
+
+        observations : dict or list of dict
+            Fitting observations.
+
+        Returns
+        -------
+        bool
+            True if the model has been loaded from the cache; False otherwise.
+        """
+        key = self.key(model, observations)
+        if key is None:
+            return False
+        filepath = self._filepath(key)
+        try:
+            with open(filepath, "rb") as f:
+                entries = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger().warning(f"Cache entry {filepath} could not be read! Exception {e}")
+            return False
+
+        for m, entry in zip(_fitted_models(model), entries):
+            m.set_paras(entry["paras"])
+            for attr, value in entry["diagnostics"].items():
+                setattr(m, attr, value)
+        # mark as recently used
+        os.utime(filepath)
+        logger().debug(f"Fitting results of {model.name} are loaded from {filepath}")
+        return True
+
+    def store(self, model, observations):
+        """
+        Save the fitted parameters and diagnostics of the model to the cache and evict least recently used entries if
+        the cache is over its size limit.
+
+        Parameters
+        ----------
+        model : :class:`cognibench.models.CNBModel`
+            Single- or multi-subject model that has been fitted on `observations`.
+
+        observations : dict or list of dict
+            Fitting observations.
+        """
+        key = self.key(model, observations)
+        if key is None:
+            return
+        entries = [
+            {
+                "paras": m.get_paras(),
+                "diagnostics": {
+                    attr: getattr(m, attr)
+                    for attr in self.diagnostic_attrs
+                    if hasattr(m, attr)
+                },
+            }
+            for m in _fitted_models(model)
+        ]
+        filepath = self._filepath(key)
+        tmp_filepath = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, "wb") as f:
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filepath, filepath)
+        logger().debug(f"Fitting results of {model.name} are saved in {filepath}")
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the total size of the cache is at most `self.max_size` bytes.
+        """
+        entries = []
+        for filename in os.listdir(self.path):
+            if filename.endswith(".pkl"):
+                stat = os.stat(pathjoin(self.path, filename))
+                entries.append((stat.st_mtime, stat.st_size, filename))
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, filename in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(pathjoin(self.path, filename))
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def clear(self):
+        """
+        Remove all the entries in the cache.
+        """
+        for filename in os.listdir(self.path):
+            if filename.endswith(".pkl"):
+                os.remove(pathjoin(self.path, filename))
+
+    def _filepath(self, key):
+        return pathjoin(self.path, f"{key}.pkl")
+
+
+def _fitted_models(model):
+    """
+    Return the list of single-subject models whose parameters are set by fitting the given model.
+    """
+    if isinstance(model, MultiSubjectModel) and hasattr(model, "subject_models"):
+        return model.subject_models
+    return [model]
+
+
+def _spaces(obj):
+    """
+    Return the action and observation spaces of a model or an agent; a space is None if the object does not have it.
+    """
+    return [
+        getattr(obj, getter)() if hasattr(obj, getter) else None
+        for getter in ("get_action_space", "get_observation_space")
+    ]
+
+
+def _public_attrs(obj):
+    """
+    Return the instance attributes of the given object whose names do not start with an underscore.
+    """
+    return {k: v for k, v in vars(obj).items() if not k.startswith("_")}
+
+
+def _initial_paras(model):
+    """
+    Return the parameters that `model.init_paras` would set, i.e. the starting point of fitting.
+    """
+    initializer = getattr(model, "param_initializer", None)
+    if initializer is None or isinstance(initializer, Mapping):
+        return initializer
+    return initializer(seed=int_seed(model.get_seed()))
+
+
+def _hash_update(h, obj):
+    """
+    Update the hash object `h` with a canonical byte representation of the given object. Containers are traversed
+    recursively, arrays are hashed by their dtype, shape and content, seed sequences by their entropy and spawn key,
+    spaces by their type and public attributes, and callables by their qualified name.
+    """
+    if isinstance(obj, Mapping):
+        h.update(b"{")
+        for k in sorted(obj.keys(), key=repr):
+            _hash_update(h, k)
+            _hash_update(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for x in obj:
+            _hash_update(h, x)
+        h.update(b"]")
+    elif isinstance(obj, np.ndarray) and obj.dtype != object:
+        arr = np.ascontiguousarray(obj)
+        h.update(f"ndarray{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"ndarray{obj.shape}".encode())
+        _hash_update(h, obj.tolist())
+    elif isinstance(obj, np.random.SeedSequence):
+        h.update(b"SeedSequence")
+        _hash_update(h, (obj.entropy, obj.spawn_key, obj.pool_size))
+    elif isinstance(obj, gym.Space):
+        h.update(f"{type(obj).__qualname__}".encode())
+        _hash_update(
+            h, {k: v for k, v in _public_attrs(obj).items() if k != "np_random"}
+        )
+    elif callable(obj):
+        name = getattr(obj, "__qualname__", type(obj).__qualname__)
+        h.update(f"callable{getattr(obj, '__module__', None)}.{name}".encode())
+    else:
+        h.update(f"{type(obj).__name__}{obj!r}".encode())
+    h.update(b";")
@@ -8,6 +8,14 @@ class InteractiveTest(CNBTest):
     """
     Perform interactive tests by feeding the input samples (stimuli, rewards, actions) one at a time and updating the
     model after each sample with the corresponding reward.
+
+    If the model implements `sequence_loglik(stimuli, rewards, actions)` (e.g. every
+    :class:`cognibench.models.policy_model.PolicyModel`), the predictions are the per-trial log-likelihoods of the
+    observed actions computed in a single call. Otherwise, the predictions are the logpdf/logpmf callables returned by
+    `predict` for each stimulus. Multi-subject models that implement
+    `sequence_loglik_jointly(stimuli, rewards, actions)` (e.g.
+    :class:`cognibench.models.decision_making.StackedRWCKModel`) compute the predictions of all the subjects in a single
+    call.
     """
 
     required_capabilities = (Interactive,)
@@ -26,14 +34,27 @@ class InteractiveTest(CNBTest):
         """
         super().__init__(*args, **kwargs)
 
+    @overrides
+    def predict_jointly(self, model, observations):
+        if not hasattr(model, "sequence_loglik_jointly"):
+            return None
+        model.reset()
+        return model.sequence_loglik_jointly(
+            [obs["stimuli"] for obs in observations],
+            [obs["rewards"] for obs in observations],
+            [obs["actions"] for obs in observations],
+        )
+
     @overrides
     def predict_single(self, model, observations, **kwargs):
         stimuli = observations["stimuli"]
         rewards = observations["rewards"]
         actions = observations["actions"]
 
-        predictions = []
         model.reset()
+        if hasattr(model, "sequence_loglik"):
+            return model.sequence_loglik(stimuli, rewards, actions)
+        predictions = []
         for s, r, a in zip(stimuli, rewards, actions):
             predictions.append(model.predict(s))
             model.update(s, r, a, False)
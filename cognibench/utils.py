@@ -1,5 +1,7 @@
 import functools
 import numpy as np
+from itertools import islice
+from cognibench.settings import settings
 
 
 def partialclass(cls, *args, **kwargs):
@@ -53,14 +55,350 @@ def negloglike(actions, predictions):
 
     predictions : array-like
         Sequence of logpdf/logpmf predictions. For an action `a` and prediction `P`, logpdf/logpmf
-        value at a must be equal to `P(a)`.
+        value at a must be equal to `P(a)`. Alternatively, a :class:`numpy.ndarray` of per-trial log-likelihood
+        values (e.g. as returned by `sequence_loglik` methods) whose sum is the total log-likelihood, or a single
+        random variable of the whole sequence (e.g. as returned by `eval_policy_sequence` methods) whose logpdf/logpmf
+        accepts the array of actions.
 
     Returns
     -------
     float
         Negative log-likelihood.
     """
+    if isinstance(predictions, np.ndarray) and predictions.dtype.kind == "f":
+        return -float(np.sum(predictions))
+    if hasattr(predictions, "logpdf"):
+        return -float(np.sum(predictions.logpdf(np.asarray(actions, dtype=np.float64))))
     out = float(0)
     for act, logpdf in zip(actions, predictions):
         out -= logpdf(act)
     return out
+
+
+def check_loglik_grad(agent, stimuli, rewards, actions, step=1e-6):
+    """
+    Compare the analytic gradient returned by `agent.sequence_loglik_grad` against central finite differences of the
+    total log-likelihood computed by `agent.sequence_loglik`. The agent parameters are restored after the check.
+
+    Parameters
+    ----------
+    agent : :class:`cognibench.models.CNBAgent`
+        Agent implementing both `sequence_loglik` and `sequence_loglik_grad` methods.
+
+    stimuli : array-like
+        Sequence of stimuli.
+
+    rewards : array-like
+        Sequence of rewards.
+
+    actions : array-like
+        Sequence of actions.
+
+    step : float
+        Finite difference step size.
+
+    Returns
+    -------
+    dict
+        Mapping from each parameter name to the maximum absolute difference between the analytic and the numerical
+        derivatives of that parameter.
+    """
+    paras = agent.get_paras()
+    original = {k: np.copy(v) if is_arraylike(v) else v for k, v in paras.items()}
+
+    def total_loglik(perturbed):
+        agent.set_paras(perturbed)
+        return np.sum(agent.sequence_loglik(stimuli, rewards, actions))
+
+    agent.set_paras({k: np.copy(v) for k, v in original.items()})
+    _, grad = agent.sequence_loglik_grad(stimuli, rewards, actions)
+
+    errors = dict()
+    for k, v in original.items():
+        numerical = np.zeros(np.shape(v))
+        for idx in np.ndindex(numerical.shape):
+            perturbed = {
+                key: np.array(val, dtype=np.float64) for key, val in original.items()
+            }
+            perturbed[k][idx] += step
+            plus = total_loglik(perturbed)
+            perturbed[k][idx] -= 2 * step
+            minus = total_loglik(perturbed)
+            numerical[idx] = (plus - minus) / (2 * step)
+        errors[k] = np.max(np.abs(np.asarray(grad[k]) - numerical), initial=0)
+
+    agent.set_paras(original)
+    return errors
+
+
+def validate_sequences(model, stimuli=None, actions=None):
+    """
+    Validate whole sequences of stimuli and actions against the observation and action spaces of a model or agent,
+    according to the "VALIDATION" policy in :py:data:`cognibench.settings`. The checks are done with the vectorized
+    `_check_observation` and `_check_action` methods of the space capabilities, if the model has them.
+
+    Parameters
+    ----------
+    model : object
+        Model or agent with observation and action space capabilities.
+
+    stimuli : array-like (optional)
+        Sequence of stimuli.
+
+    actions : array-like (optional)
+        Sequence of actions.
+
+    Raises
+    ------
+    ValueError
+        If a sequence contains an element that is not in the corresponding space.
+    """
+    if settings["VALIDATION"] == "none":
+        return
+    name = getattr(model, "name", type(model).__name__)
+    if (
+        stimuli is not None
+        and hasattr(model, "_check_observation")
+        and not model._check_observation(stimuli)
+    ):
+        raise ValueError(f"{name} : stimuli are not in the observation space")
+    if (
+        actions is not None
+        and hasattr(model, "_check_action")
+        and not model._check_action(actions)
+    ):
+        raise ValueError(f"{name} : actions are not in the action space")
+
+
+def make_rng(seed=None):
+    """
+    Create a random number generator using the PCG64 bit generator.
+
+    Parameters
+    ----------
+    seed : int or :class:`numpy.random.SeedSequence` or None
+        Seed of the generator. If None, fresh entropy is drawn from the operating system.
+
+    Returns
+    -------
+    :class:`numpy.random.Generator`
+        Random number generator.
+    """
+    return np.random.Generator(np.random.PCG64(seed))
+
+
+def spawn_seeds(seed, n):
+    """
+    Derive `n` independent child seeds from a seed. Each child seeds its own reproducible stream, e.g. one per
+    subject, worker, simulation or environment. The children only depend on the given seed and their index, so
+    spawning again from the same seed returns the same children.
+
+    Parameters
+    ----------
+    seed : int or :class:`numpy.random.SeedSequence` or None
+        Parent seed. If None, every child is None, i.e. seeded randomly.
+
+    n : int
+        Number of child seeds.
+
+    Returns
+    -------
+    list of :class:`numpy.random.SeedSequence` or None
+        Child seeds.
+    """
+    if seed is None:
+        return [None] * n
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [
+        np.random.SeedSequence(
+            seed.entropy, spawn_key=seed.spawn_key + (i,), pool_size=seed.pool_size
+        )
+        for i in range(n)
+    ]
+
+
+def int_seed(seed):
+    """
+    Convert a seed to an integer seed for functions that only accept legacy seeds, such as the `random_state`
+    argument of :py:mod:`scipy.stats` distributions. Integers and None are returned unchanged.
+
+    Parameters
+    ----------
+    seed : int or :class:`numpy.random.SeedSequence` or None
+        Seed to convert.
+
+    Returns
+    -------
+    int or None
+        Integer seed in [0, 2**32).
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return int(seed.generate_state(1)[0])
+    return seed
+
+
+# Largest number of categories for which BufferedRNG.choice inverts the cumulative distribution in a Python loop
+_CHOICE_LOOP_MAX = 16
+
+# Tolerance on the sum of choice probabilities, the same as numpy.random.Generator.choice
+_CHOICE_P_ATOL = np.sqrt(np.finfo(np.float64).eps)
+
+
+class BufferedRNG:
+    """
+    Facade over a :class:`numpy.random.Generator` that draws uniforms and standard normals in blocks and hands them
+    out one at a time. Drawing single values from a generator pays the full NumPy dispatch cost per call, which
+    dominates the per-trial cost of simulations; here most draws take the next value of a list.
+
+    Uniform and normal blocks are drawn from the underlying generator when the corresponding buffer runs out. Hence,
+    the drawn values only depend on the seed of the generator, the block size and the sequence of calls. Values drawn
+    with `random` and `standard_normal` are the same as the ones of the underlying generator.
+
+    The methods used by :py:mod:`cognibench.distr` (`random`, `uniform`, `normal`, `standard_normal` and `choice`) are
+    buffered. All the other attributes are forwarded to the underlying generator, which draws from its state directly.
+    """
+
+    __slots__ = ("generator", "block_size", "_uniforms", "_normals")
+
+    def __init__(self, generator, block_size=4096):
+        """
+        Parameters
+        ----------
+        generator : :class:`numpy.random.Generator`
+            Underlying random number generator.
+
+        block_size : int
+            Number of values drawn from the generator when a buffer is refilled. (Default: 4096)
+        """
+        assert block_size >= 1, "block_size must be a positive integer"
+        self.generator = generator
+        self.block_size = block_size
+        self._uniforms = iter(())
+        self._normals = iter(())
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.generator, name)
+
+    def __getstate__(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
+    def _next_uniform(self):
+        try:
+            return next(self._uniforms)
+        except StopIteration:
+            self._uniforms = iter(self.generator.random(self.block_size).tolist())
+            return next(self._uniforms)
+
+    def _next_normal(self):
+        try:
+            return next(self._normals)
+        except StopIteration:
+            self._normals = iter(
+                self.generator.standard_normal(self.block_size).tolist()
+            )
+            return next(self._normals)
+
+    def _take(self, buffer, draw, size):
+        """
+        Return an array of the given size filled with the values left in the given buffer, followed by values drawn
+        at once with `draw(n)` if the buffer runs out. The values are the same as the ones successive single draws
+        would return.
+        """
+        shape = (size,) if np.ndim(size) == 0 else tuple(size)
+        n = int(np.prod(shape))
+        out = np.empty(n, dtype=np.float64)
+        buffered = list(islice(buffer, n))
+        out[: len(buffered)] = buffered
+        if len(buffered) < n:
+            out[len(buffered) :] = draw(n - len(buffered))
+        return out.reshape(shape)
+
+    def random(self, size=None):
+        """
+        Uniform samples from [0, 1). See :py:meth:`numpy.random.Generator.random`.
+        """
+        if size is None:
+            return self._next_uniform()
+        return self._take(self._uniforms, self.generator.random, size)
+
+    def standard_normal(self, size=None):
+        """
+        Standard normal samples. See :py:meth:`numpy.random.Generator.standard_normal`.
+        """
+        if size is None:
+            return self._next_normal()
+        return self._take(self._normals, self.generator.standard_normal, size)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        """
+        Uniform samples from [low, high). See :py:meth:`numpy.random.Generator.uniform`.
+        """
+        if size is None and _is_scalar(low) and _is_scalar(high):
+            return low + (high - low) * self._next_uniform()
+        low, high = np.asarray(low), np.asarray(high)
+        if size is None:
+            size = np.broadcast(low, high).shape
+        return low + (high - low) * self.random(size)
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        """
+        Normal samples. See :py:meth:`numpy.random.Generator.normal`.
+        """
+        if size is None and _is_scalar(loc) and _is_scalar(scale):
+            return loc + scale * self._next_normal()
+        loc, scale = np.asarray(loc), np.asarray(scale)
+        if size is None:
+            size = np.broadcast(loc, scale).shape
+        return loc + scale * self.standard_normal(size)
+
+    def choice(self, a, size=None, replace=True, p=None):
+        """
+        Sample from a 1D array or from `range(a)` if `a` is an integer. See :py:meth:`numpy.random.Generator.choice`.
+        Single samples are drawn by inverting the cumulative distribution at a single buffered uniform; other calls
+        are forwarded to the underlying generator. Probabilities are validated as by the underlying generator.
+        """
+        if size is not None or not replace:
+            return self.generator.choice(a, size=size, replace=replace, p=p)
+        n = a if _is_scalar(a) else len(a)
+        if p is not None and len(p) != n:
+            raise ValueError("a and p must have same size")
+        if p is None:
+            idx = int(self._next_uniform() * n)
+        elif n <= _CHOICE_LOOP_MAX:
+            # inverting the cumulative distribution in Python is faster than NumPy for a few categories
+            p = p.tolist() if isinstance(p, np.ndarray) else p
+            total = sum(p)
+            _check_probabilities(min(p), total)
+            u = self._next_uniform() * total
+            idx, acc = 0, p[0]
+            while acc <= u and idx < n - 1:
+                idx += 1
+                acc += p[idx]
+        else:
+            cdf = np.cumsum(p)
+            _check_probabilities(np.min(p), cdf[-1])
+            idx = int(cdf.searchsorted(self._next_uniform() * cdf[-1], side="right"))
+        # guard against rounding up to n for uniforms close to 1
+        idx = min(idx, n - 1)
+        return idx if _is_scalar(a) else a[idx]
+
+
+def _check_probabilities(p_min, total):
+    """
+    Raise ValueError for choice probabilities that :py:meth:`numpy.random.Generator.choice` rejects.
+    """
+    if p_min < 0:
+        raise ValueError("probabilities are not non-negative")
+    if abs(total - 1) > _CHOICE_P_ATOL:
+        raise ValueError("probabilities do not sum to 1")
+
+
+def _is_scalar(x):
+    return isinstance(x, (int, float)) or np.ndim(x) == 0
@@ -0,0 +1,100 @@
+"""
+Measure the per-trial cost of replaying a sequence of trials through `eval_policy` and `update` for the built-in
+agents, with per-trial input checks ("strict" validation) and without them ("sequence" validation), and the cost of reading a parameter from a plain dictionary through `get_paras` compared to reading the same
+parameter from the slot-based record the agents store their parameters in.
+"""
+import timeit
+import numpy as np
+
+from cognibench import settings
+from cognibench.models import make_record
+from cognibench.models.decision_making import RWCKAgent, NWSLSAgent
+from cognibench.models.associative_learning import RwNormAgent, KrwNormAgent
+
+
+SEED = 42
+N_TRIALS = 300
+
+
+def replay(agent, stimuli, rewards, actions):
+    agent.reset()
+    for s, r, a in zip(stimuli, rewards, actions):
+        agent.eval_policy(s)
+        agent.update(s, r, a, False)
+
+
+def per_trial(fn):
+    return min(timeit.repeat(fn, number=1, repeat=10)) / N_TRIALS
+
+
+def main():
+    rng = np.random.RandomState(SEED)
+    n_action, n_obs = 4, 5
+    dm_data = (
+        rng.randint(n_obs, size=N_TRIALS),
+        rng.randint(2, size=N_TRIALS),
+        rng.randint(n_action, size=N_TRIALS),
+    )
+    al_data = (
+        rng.randint(0, 2, size=(N_TRIALS, n_obs)),
+        rng.randint(2, size=N_TRIALS),
+        rng.normal(size=N_TRIALS),
+    )
+    rwck_paras = {"w": 0.5, "beta": 2.0, "beta_c": 1.0, "eta": 0.3, "eta_c": 0.2}
+    agents = (
+        (RWCKAgent(n_action=n_action, n_obs=n_obs, paras_dict=rwck_paras), dm_data),
+        (
+            NWSLSAgent(n_action=n_action, n_obs=n_obs, paras_dict={"epsilon": 0.5}),
+            dm_data,
+        ),
+        (
+            RwNormAgent(
+                n_obs=n_obs,
+                paras_dict={"w": 0.0, "sigma": 1.0, "b0": 0.0, "b1": 1.0, "eta": 0.1},
+            ),
+            al_data,
+        ),
+        (
+            KrwNormAgent(
+                n_obs=n_obs,
+                paras_dict={
+                    "tauSq": 0.1,
+                    "sigmaRSq": 0.5,
+                    "w": 0.0,
+                    "sigma": 1.0,
+                    "b0": 0.0,
+                    "b1": 1.0,
+                    "sigmaWInit": 1.0,
+                },
+            ),
+            al_data,
+        ),
+    )
+
+    validation = settings["VALIDATION"]
+    print(f"{'agent':<14}{'strict':>10}{'sequence':>10}")
+    for agent, data in agents:
+        settings["VALIDATION"] = "strict"
+        t_strict = per_trial(lambda: replay(agent, *data))
+        settings["VALIDATION"] = "sequence"
+        t_sequence = per_trial(lambda: replay(agent, *data))
+        print(
+            f"{type(agent).__name__:<14}{1e6 * t_strict:>8.2f}us{1e6 * t_sequence:>8.2f}us"
+        )
+    settings["VALIDATION"] = validation
+
+    dict_agent = RWCKAgent(n_action=n_action, n_obs=n_obs)
+    dict_agent._paras = dict(rwck_paras)
+    record = make_record(tuple(rwck_paras), rwck_paras)
+    n = 1000000
+    t_dict = min(
+        timeit.repeat(lambda: dict_agent.get_paras()["eta"], number=n, repeat=5)
+    )
+    t_record = min(timeit.repeat(lambda: record.eta, number=n, repeat=5))
+    print()
+    print(f"get_paras()['eta'] on a dict: {1e9 * t_dict / n:.1f}ns")
+    print(f"record attribute access:      {1e9 * t_record / n:.1f}ns")
+
+
+if __name__ == "__main__":
+    main()
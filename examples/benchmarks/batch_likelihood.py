@@ -0,0 +1,87 @@
+"""
+Compare evaluating the negative log-likelihood of many parameter vectors one at a time against evaluating them in a
+single batch using `PolicyModel.batch_negloglike`. For each model and batch size K, the time taken by both approaches
+is reported.
+"""
+import time
+import numpy as np
+
+from cognibench.envs import BanditEnv, ClassicalConditioningEnv
+from cognibench.simulation import simulate
+from cognibench.utils import negloglike
+from cognibench.models.decision_making import RWCKModel
+from cognibench.models.associative_learning import RwNormModel, KrwNormModel
+from cognibench.models.policy_model import (
+    _flatten_dict_into_array,
+    _unpack_array_into_dict,
+)
+
+
+SEED = 42
+N_TRIALS = 300
+BATCH_SIZES = (10, 100, 1000)
+
+
+def sample_paras(model, K):
+    """
+    Draw K parameter vectors from the model parameter initializer.
+    """
+    rng = np.random.RandomState(SEED)
+    rows = []
+    for seed in rng.randint(np.iinfo(np.int32).max, size=K):
+        model.init_paras(seed=int(seed))
+        rows.append(_flatten_dict_into_array(model.get_paras(), dtype=np.float64)[0])
+    return np.array(rows)
+
+
+def time_one_by_one(model, paras_matrix, stimuli, rewards, actions):
+    paras = model.get_paras()
+    _, lens = _flatten_dict_into_array(paras)
+    beg = time.perf_counter()
+    for x in paras_matrix:
+        _unpack_array_into_dict(paras, x, lens)
+        model.reset()
+        negloglike(actions, model.sequence_loglik(stimuli, rewards, actions))
+    return time.perf_counter() - beg
+
+
+def time_batch(model, paras_matrix, stimuli, rewards, actions):
+    beg = time.perf_counter()
+    model.batch_negloglike(paras_matrix, stimuli, rewards, actions)
+    return time.perf_counter() - beg
+
+
+def main():
+    n_action, n_obs = 4, 5
+    env = BanditEnv(p_dist=np.linspace(0.1, 0.9, n_action), seed=SEED)
+    dm_model = RWCKModel(n_action=n_action, n_obs=1, seed=SEED)
+    dm_data = simulate(env, dm_model, N_TRIALS)
+
+    rng = np.random.RandomState(SEED)
+    stimuli = [rng.randint(0, 2, size=n_obs) for _ in range(4)]
+    env = ClassicalConditioningEnv(
+        stimuli=stimuli, p_stimuli=[0.25] * 4, p_reward=[0.2, 0.4, 0.6, 0.8], seed=SEED
+    )
+    al_model = RwNormModel(n_obs=n_obs, seed=SEED)
+    al_data = simulate(env, al_model, N_TRIALS)
+    krw_model = KrwNormModel(n_obs=n_obs, seed=SEED)
+    krw_data = simulate(env, krw_model, N_TRIALS)
+
+    print(f"{'model':<14}{'K':>6}{'one by one':>12}{'batch':>10}{'speedup':>9}")
+    for model, data in (
+        (dm_model, dm_data),
+        (al_model, al_data),
+        (krw_model, krw_data),
+    ):
+        for K in BATCH_SIZES:
+            paras_matrix = sample_paras(model, K)
+            t_single = time_one_by_one(model, paras_matrix, *data)
+            t_batch = time_batch(model, paras_matrix, *data)
+            print(
+                f"{model.name:<14}{K:>6}{t_single:>11.3f}s{t_batch:>9.3f}s"
+                f"{t_single / t_batch:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare the per-trial cost of evaluating and sampling discrete softmax policies using `scipy.special.softmax` with
+:class:`cognibench.distr.DiscreteRV`, which is what decision-making agents used to do, against
+:class:`cognibench.distr.CategoricalRV`. For action sampling, a single `CategoricalRV` object is reused across trials
+as the agents do in `act`.
+"""
+import timeit
+import numpy as np
+from scipy.special import softmax
+
+from cognibench.distr import DiscreteRV, CategoricalRV
+
+
+SEED = 42
+N_TRIALS = 20000
+N_ACTIONS = (2, 4, 16)
+
+
+def per_trial_us(fn, logits):
+    it = iter(logits)
+    return 1e6 * timeit.timeit(lambda: fn(next(it)), number=len(logits)) / len(logits)
+
+
+def main():
+    rng = np.random.RandomState(SEED)
+    print(
+        f"{'n_action':>8}{'op':>9}{'DiscreteRV':>13}{'CategoricalRV':>15}{'speedup':>9}"
+    )
+    for n in N_ACTIONS:
+        logits = rng.normal(scale=3, size=(N_TRIALS, n))
+        random_state = np.random.RandomState(SEED)
+
+        def old_logpmf(V):
+            return DiscreteRV(softmax(V)).logpmf(0)
+
+        def new_logpmf(V):
+            return CategoricalRV(V).logpmf(0)
+
+        def old_act(V):
+            rv = DiscreteRV(softmax(V))
+            rv.random_state = random_state
+            return rv.rvs()
+
+        reused = CategoricalRV(np.zeros(n))
+        reused.random_state = random_state
+
+        def new_act(V):
+            return reused.set_logits(V).rvs()
+
+        for op, old, new in (
+            ("logpmf", old_logpmf, new_logpmf),
+            ("act", old_act, new_act),
+        ):
+            t_old = per_trial_us(old, logits)
+            t_new = per_trial_us(new, logits)
+            print(
+                f"{n:>8}{op:>9}{t_old:>11.2f}us{t_new:>13.2f}us{t_old / t_new:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
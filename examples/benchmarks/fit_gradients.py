@@ -0,0 +1,94 @@
+"""
+Compare the cost of fitting built-in models with finite difference gradients against fitting with the analytic
+gradients provided by `sequence_loglik_grad`. For each model, the number of full trajectory evaluations performed by
+the optimizer, the total wall time and the final negative log-likelihood are reported.
+"""
+import time
+import numpy as np
+
+from cognibench.envs import BanditEnv, ClassicalConditioningEnv
+from cognibench.simulation import simulate
+from cognibench.models.decision_making import RWCKModel, RWModel, CKModel
+from cognibench.models.associative_learning import (
+    RwNormModel,
+    KrwNormModel,
+    LSSPDModel,
+)
+
+
+SEED = 42
+N_TRIALS = 300
+
+
+def count_evaluations(model, stimuli, rewards, actions, use_grad):
+    """
+    Fit the model and return the number of trajectory evaluations, the elapsed time and the final negative
+    log-likelihood.
+    """
+    counter = {"n": 0}
+    agent = model.agent
+    for name in ("sequence_loglik", "sequence_loglik_grad"):
+        method = getattr(agent, name)
+
+        def counted(*args, method=method, **kwargs):
+            counter["n"] += 1
+            return method(*args, **kwargs)
+
+        setattr(agent, name, counted)
+
+    model.optim_kwargs = {"method": "L-BFGS-B", "jac": use_grad}
+    model.set_seed(SEED)
+    beg = time.perf_counter()
+    model.fit(stimuli, rewards, actions)
+    elapsed = time.perf_counter() - beg
+
+    for name in ("sequence_loglik", "sequence_loglik_grad"):
+        delattr(agent, name)
+    model.reset()
+    nll = -np.sum(model.sequence_loglik(stimuli, rewards, actions))
+    return counter["n"], elapsed, nll
+
+
+def decision_making_data(n_action=4):
+    env = BanditEnv(p_dist=np.linspace(0.1, 0.9, n_action), seed=SEED)
+    model = RWCKModel(n_action=n_action, n_obs=1, seed=SEED)
+    return simulate(env, model, N_TRIALS)
+
+
+def assoc_learning_data(n_obs=5):
+    rng = np.random.RandomState(SEED)
+    stimuli = [rng.randint(0, 2, size=n_obs) for _ in range(4)]
+    env = ClassicalConditioningEnv(
+        stimuli=stimuli, p_stimuli=[0.25] * 4, p_reward=[0.2, 0.4, 0.6, 0.8], seed=SEED,
+    )
+    model = RwNormModel(n_obs=n_obs, seed=SEED)
+    return simulate(env, model, N_TRIALS)
+
+
+def main():
+    n_action, n_obs = 4, 5
+    dm_data = decision_making_data(n_action)
+    al_data = assoc_learning_data(n_obs)
+    models = [
+        (RWCKModel(n_action=n_action, n_obs=1, seed=SEED), dm_data),
+        (RWModel(n_action=n_action, n_obs=1, seed=SEED), dm_data),
+        (CKModel(n_action=n_action, n_obs=1, seed=SEED), dm_data),
+        (RwNormModel(n_obs=n_obs, seed=SEED), al_data),
+        (KrwNormModel(n_obs=n_obs, seed=SEED), al_data),
+        (LSSPDModel(n_obs=n_obs, seed=SEED), al_data),
+    ]
+    print(
+        f"{'model':<14}{'fd evals':>10}{'fd time':>10}{'fd nll':>10}"
+        f"{'grad evals':>12}{'grad time':>11}{'grad nll':>10}"
+    )
+    for model, data in models:
+        n_fd, t_fd, nll_fd = count_evaluations(model, *data, use_grad=False)
+        n_grad, t_grad, nll_grad = count_evaluations(model, *data, use_grad=True)
+        print(
+            f"{model.name:<14}{n_fd:>10}{t_fd:>9.2f}s{nll_fd:>10.2f}"
+            f"{n_grad:>12}{t_grad:>10.2f}s{nll_grad:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
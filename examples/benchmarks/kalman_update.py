@@ -0,0 +1,80 @@
+"""
+Compare the per-trial cost of the Kalman filter update of `KrwNormAgent` against the textbook implementation that
+builds the transition noise matrix and the full outer product on every trial. For each observation space size, the
+per-trial latency and the peak memory allocated for temporaries during a single update (measured with
+:py:mod:`tracemalloc`) are reported.
+"""
+import timeit
+import tracemalloc
+import numpy as np
+
+from cognibench.models.associative_learning import KrwNormAgent
+
+
+SEED = 42
+N_TRIALS = 200
+N_OBS = (5, 10, 50, 100, 200, 500)
+
+
+def reference_update(state, stimulus, reward, paras, eps=1e-8):
+    """
+    Kalman update that allocates new matrices on every trial.
+    """
+    Q = paras["tauSq"] * np.identity(len(stimulus))
+    C_pred = state["C"] + Q
+    K = C_pred.dot(stimulus) / (
+        stimulus.dot(C_pred.dot(stimulus)) + paras["sigmaRSq"] + eps
+    )
+    state["w"] = state["w"] + K * (reward - np.dot(stimulus, state["w"]))
+    state["C"] = C_pred - np.dot(K[:, None], np.dot(stimulus[None, :], C_pred))
+
+
+def peak_bytes(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    rng = np.random.RandomState(SEED)
+    print(
+        f"{'n_obs':>6}{'reference':>12}{'in place':>11}{'speedup':>9}"
+        f"{'ref peak':>12}{'new peak':>11}"
+    )
+    for n_obs in N_OBS:
+        paras = {
+            "w": np.zeros(n_obs),
+            "sigma": 1.0,
+            "b0": 0.0,
+            "b1": np.ones(n_obs),
+            "sigmaWInit": 1.0,
+            "tauSq": 0.1,
+            "sigmaRSq": 0.5,
+        }
+        agent = KrwNormAgent(n_obs=n_obs, paras_dict=paras, seed=SEED)
+        stimuli = rng.randint(0, 2, size=(N_TRIALS, n_obs)).astype(np.float64)
+        rewards = rng.normal(size=N_TRIALS)
+        state = {"w": np.zeros(n_obs), "C": np.identity(n_obs)}
+
+        def run_reference():
+            for s, r in zip(stimuli, rewards):
+                reference_update(state, s, r, paras)
+
+        def run_agent():
+            for s, r in zip(stimuli, rewards):
+                agent.update(s, r, 0.0)
+
+        t_ref = min(timeit.repeat(run_reference, number=1, repeat=5)) / N_TRIALS
+        t_new = min(timeit.repeat(run_agent, number=1, repeat=5)) / N_TRIALS
+        peak_ref = peak_bytes(lambda: reference_update(state, stimuli[0], 1.0, paras))
+        peak_new = peak_bytes(lambda: agent.update(stimuli[0], 1.0, 0.0))
+        print(
+            f"{n_obs:>6}{1e6 * t_ref:>10.1f}us{1e6 * t_new:>9.1f}us{t_ref / t_new:>8.1f}x"
+            f"{peak_ref / 1024:>10.1f}KiB{peak_new / 1024:>8.1f}KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
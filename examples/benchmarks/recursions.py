@@ -0,0 +1,93 @@
+"""
+Measure the per-trial cost of `sequence_loglik` and `sequence_loglik_grad` of the agents whose recursions can be
+compiled by Numba, with the "python" and the "numba" backends. Compilation time is excluded by running each
+recursion once before timing.
+"""
+import timeit
+import numpy as np
+
+from cognibench import settings
+from cognibench.models import recursions
+from cognibench.models.decision_making import RWCKAgent
+from cognibench.models.associative_learning import RwNormAgent, LSSPDAgent
+
+
+SEED = 42
+N_TRIALS = 1000
+
+
+def per_trial(agent, method, data):
+    def run():
+        agent.reset()
+        getattr(agent, method)(*data)
+
+    run()
+    return min(timeit.repeat(run, number=1, repeat=10)) / N_TRIALS
+
+
+def main():
+    if recursions.numba is None:
+        print("numba is not installed; both columns use the Python backend")
+    rng = np.random.RandomState(SEED)
+    n_action, n_obs = 4, 5
+    dm_data = (
+        rng.randint(n_obs, size=N_TRIALS),
+        rng.randint(2, size=N_TRIALS),
+        rng.randint(n_action, size=N_TRIALS),
+    )
+    al_data = (
+        rng.randint(0, 2, size=(N_TRIALS, n_obs)),
+        rng.normal(size=N_TRIALS),
+        rng.normal(size=N_TRIALS),
+    )
+    rwck_paras = {"w": 0.5, "beta": 2.0, "beta_c": 1.0, "eta": 0.3, "eta_c": 0.2}
+    agents = (
+        (RWCKAgent(n_action=n_action, n_obs=n_obs, paras_dict=rwck_paras), dm_data),
+        (
+            RwNormAgent(
+                n_obs=n_obs,
+                paras_dict={
+                    "w": np.zeros(n_obs),
+                    "sigma": 1.0,
+                    "b0": 0.0,
+                    "b1": np.ones(n_obs),
+                    "eta": 0.1,
+                },
+            ),
+            al_data,
+        ),
+        (
+            LSSPDAgent(
+                n_obs=n_obs,
+                paras_dict={
+                    "w": np.zeros(n_obs),
+                    "alpha": 0.5,
+                    "sigma": 1.0,
+                    "b0": 0.0,
+                    "b1": np.ones(n_obs),
+                    "mix_coef": 0.5,
+                    "eta": 0.1,
+                    "kappa": 0.3,
+                },
+            ),
+            al_data,
+        ),
+    )
+
+    backend = settings["BACKEND"]
+    print(f"{'agent':<14}{'method':<22}{'python':>10}{'numba':>10}")
+    for agent, data in agents:
+        for method in ("sequence_loglik", "sequence_loglik_grad"):
+            times = []
+            for b in ("python", "numba"):
+                settings["BACKEND"] = b
+                times.append(per_trial(agent, method, data))
+            print(
+                f"{type(agent).__name__:<14}{method:<22}"
+                f"{1e6 * times[0]:>8.2f}us{1e6 * times[1]:>8.2f}us"
+            )
+    settings["BACKEND"] = backend
+
+
+if __name__ == "__main__":
+    main()
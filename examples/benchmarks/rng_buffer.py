@@ -0,0 +1,92 @@
+"""
+Measure the per-call cost of drawing single samples from `NormalRV`, `DiscreteRV` and `CategoricalRV` and the
+per-trial cost of `simulate` for the built-in agents, with the buffered random number generator of the agents
+(`RNG_BLOCK_SIZE` setting) and with an unbuffered `numpy.random.Generator`.
+"""
+import timeit
+import numpy as np
+
+from cognibench import settings
+from cognibench.distr import DiscreteRV, CategoricalRV, NormalRV
+from cognibench.envs import BanditEnv, ClassicalConditioningEnv
+from cognibench.models.decision_making import RWCKAgent, NWSLSAgent
+from cognibench.models.associative_learning import RwNormAgent
+from cognibench.simulation import simulate
+
+
+SEED = 42
+N_TRIALS = 2000
+N_DRAWS = 20000
+
+
+def per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def make_agents(n_action, n_obs):
+    rwck_paras = {"w": 0.5, "beta": 2.0, "beta_c": 1.0, "eta": 0.3, "eta_c": 0.2}
+    rwnorm_paras = {
+        "w": np.zeros(n_obs),
+        "sigma": 1.0,
+        "b0": 0.0,
+        "b1": np.ones(n_obs),
+        "eta": 0.1,
+    }
+    return (
+        RWCKAgent(n_action=n_action, n_obs=1, paras_dict=rwck_paras, seed=SEED),
+        NWSLSAgent(n_action=n_action, n_obs=1, paras_dict={"epsilon": 0.5}, seed=SEED),
+        RwNormAgent(n_obs=n_obs, paras_dict=rwnorm_paras, seed=SEED),
+    )
+
+
+def make_envs(n_action, n_obs):
+    stimuli = [np.eye(n_obs, dtype=np.int64)[i] for i in range(n_obs)]
+    bandit = BanditEnv(p_dist=np.linspace(0.2, 0.8, n_action), seed=SEED)
+    conditioning = ClassicalConditioningEnv(
+        stimuli=stimuli,
+        p_stimuli=[1 / n_obs] * n_obs,
+        p_reward=np.linspace(0.2, 0.8, n_obs),
+        seed=SEED,
+    )
+    return bandit, bandit, conditioning
+
+
+def main():
+    n_action, n_obs = 4, 3
+    block_size = settings["RNG_BLOCK_SIZE"]
+    p = np.array([0.1, 0.2, 0.3, 0.4])
+    rvs = (
+        ("NormalRV", NormalRV(loc=0.5, scale=1.5)),
+        ("DiscreteRV", DiscreteRV(p)),
+        ("CategoricalRV", CategoricalRV.from_probs(p)),
+    )
+
+    results = {}
+    for label, size in (("buffered", block_size), ("unbuffered", None)):
+        settings["RNG_BLOCK_SIZE"] = size
+        rng = RWCKAgent(n_action=n_action, n_obs=1, seed=SEED).rng
+        for name, rv in rvs:
+            rv.random_state = rng
+            results[name, label] = per_call(rv.rvs, N_DRAWS)
+        for agent, env in zip(make_agents(n_action, n_obs), make_envs(n_action, n_obs)):
+            results[type(agent).__name__, label] = (
+                per_call(lambda: simulate(env, agent, N_TRIALS), 1) / N_TRIALS
+            )
+    settings["RNG_BLOCK_SIZE"] = block_size
+
+    print(f"block size: {block_size}")
+    print(f"{'':<24}{'buffered':>12}{'unbuffered':>12}")
+    for name in [name for name, _ in rvs]:
+        print(
+            f"{name + '.rvs':<24}{1e9 * results[name, 'buffered']:>10.0f}ns"
+            f"{1e9 * results[name, 'unbuffered']:>10.0f}ns"
+        )
+    for name in ("RWCKAgent", "NWSLSAgent", "RwNormAgent"):
+        print(
+            f"{'simulate ' + name:<24}{1e6 * results[name, 'buffered']:>10.2f}us"
+            f"{1e6 * results[name, 'unbuffered']:>10.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
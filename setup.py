@@ -14,7 +14,7 @@ setuptools.setup(
     url="https://github.com/fmelinscak/cognibench",
     packages=setuptools.find_packages(),
     install_requires=[
-        "numpy>=1.16.2",
+        "numpy>=1.17",
         "scipy>=1.2.1",
         "pandas>=0.24.2",
         "gym",
@@ -23,6 +23,7 @@ setuptools.setup(
         "oct2py",
         "rpy2",
     ],
+    extras_require={"numba": ["numba"]},
     python_requires=">=3.6.8",
     classifiers=[
         "Programming Language :: Python :: 3",
@@ -4,7 +4,42 @@ import numpy as np
 import numpy.testing as npt
 from scipy import stats
 from cognibench.models import associative_learning
+from cognibench.models.associative_learning.krw_norm import _kalman_update
 from cognibench.continuous import ContinuousSpace
+from cognibench.utils import check_loglik_grad, negloglike
+from cognibench.distr import NormalRV
+
+
+def _replay_loglik(agent, stimuli, rewards, actions):
+    agent.reset()
+    out = []
+    for s, r, a in zip(stimuli, rewards, actions):
+        out.append(agent.eval_policy(s).logpdf(a))
+        agent.update(s, r, a, False)
+    return np.array(out)
+
+
+_STIMULI = np.array(
+    [[1, 0, 0], [0, 1, 0], [0, 0, 1], [0, 1, 0], [1, 0, 0], [0, 0, 1]], dtype=np.int8
+)
+_REWARDS = [1, 0, 1, 1, 0, 1]
+_ACTIONS = [0.4, -0.3, 1.2, 0.9, 0.1, 0.7]
+
+
+class Test_NormalRV(unittest.TestCase):
+    def test_logpdf(self):
+        loc = np.array([0.0, 1.0, -2.0])
+        scale = np.array([0.5, 1.0, 2.0])
+        e = np.array([0.3, 1.5, 0.0])
+        rv = NormalRV(loc=loc, scale=scale)
+        npt.assert_almost_equal(rv.logpdf(e), stats.norm.logpdf(e, loc, scale))
+        for i in range(3):
+            self.assertAlmostEqual(
+                NormalRV(loc=loc[i], scale=scale[i]).logpdf(e[i]), rv.logpdf(e)[i]
+            )
+        # normalizing constants follow scale updates
+        rv.scale = 1.0
+        npt.assert_almost_equal(rv.logpdf(e), stats.norm.logpdf(e, loc, 1.0))
 
 
 class Test_RwNormModel(unittest.TestCase):
@@ -40,6 +75,62 @@ class Test_RwNormModel(unittest.TestCase):
             npt.assert_almost_equal(self.agent.get_hidden_state()["w"], w)
         )
 
+    def test_sequence_loglik(self):
+        expected = _replay_loglik(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        hidden = {k: np.copy(v) for k, v in self.agent.get_hidden_state().items()}
+        self.agent.reset()
+        actual = self.agent.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+        for k, v in hidden.items():
+            npt.assert_almost_equal(self.agent.get_hidden_state()[k], v)
+
+    def test_sequence_loglik_grad(self):
+        errors = check_loglik_grad(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        for k, err in errors.items():
+            self.assertLess(err, 1e-6, k)
+
+    def test_eval_policy_sequence(self):
+        self.agent.reset()
+        expected_loc = []
+        for s, r, a in zip(_STIMULI, _REWARDS, _ACTIONS):
+            expected_loc.append(self.agent.eval_policy(s).loc)
+            self.agent.update(s, r, a, False)
+        self.agent.reset()
+        rv = self.agent.eval_policy_sequence(_STIMULI, _REWARDS)
+        npt.assert_almost_equal(rv.loc, expected_loc)
+        self.assertAlmostEqual(
+            negloglike(_ACTIONS, rv),
+            negloglike(
+                _ACTIONS, _replay_loglik(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+            ),
+        )
+
+    def test_batch_negloglike(self):
+        rng = np.random.RandomState(0)
+        K = 10
+        batch = {
+            "w": rng.normal(size=(K, 3)),
+            "eta": rng.uniform(size=K),
+            "sigma": rng.uniform(0.5, 1.5, size=K),
+            "b0": rng.normal(size=K),
+            "b1": rng.normal(size=(K, 3)),
+        }
+        expected = []
+        for i in range(K):
+            self.agent.set_paras({k: np.copy(v[i]) for k, v in batch.items()})
+            expected.append(
+                -np.sum(self.agent.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS))
+            )
+        actual = self.agent.batch_negloglike(batch, _STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+
+        model = associative_learning.RwNormModel(n_obs=3, seed=0)
+        paras_matrix = np.column_stack(
+            [batch["w"], batch["sigma"], batch["b0"], batch["b1"], batch["eta"]]
+        )
+        actual = model.batch_negloglike(paras_matrix, _STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+
 
 class Test_KrwNormModel(unittest.TestCase):
     def setUp(self):
@@ -71,6 +162,51 @@ class Test_KrwNormModel(unittest.TestCase):
             npt.assert_almost_equal(self.agent.get_hidden_state()["C"], C)
         )
 
+    def test_update_non_float64_state(self):
+        stimulus = np.array([0, 1, 0], dtype=np.int8)
+        self.agent.update(stimulus, 1, 1, False)
+        expected = self.agent.get_hidden_state()["w"].copy()
+        for w in ([0.1, 0.1, 0.1], np.full(3, 0.1, dtype=np.float32)):
+            self.agent.set_hidden_state({"w": w, "C": (0.5 * np.identity(3)).tolist()})
+            self.agent.update(stimulus, 1, 1, False)
+            npt.assert_almost_equal(self.agent.get_hidden_state()["w"], expected)
+
+        # weights that are not float64 arrays are updated without BLAS
+        w = np.full(3, 0.1, dtype=np.float32)
+        C = 0.5 * np.identity(3)
+        C_s = np.empty(3)
+        _kalman_update(w, C, stimulus.astype(np.float64), 1, 0.5, 0.5, 0, C_s)
+        npt.assert_almost_equal(w, expected, decimal=6)
+
+    def test_update_sequence(self):
+        rng = np.random.RandomState(0)
+        n_obs = 8
+        paras = {
+            "w": rng.normal(size=n_obs),
+            "sigma": 0.5,
+            "b0": 0.5,
+            "b1": rng.normal(size=n_obs),
+            "sigmaWInit": 0.7,
+            "tauSq": 0.3,
+            "sigmaRSq": 0.4,
+        }
+        agent = associative_learning.KrwNormAgent(n_obs=n_obs, paras_dict=paras)
+        w = np.copy(paras["w"])
+        C = 0.7 * np.identity(n_obs)
+        for _ in range(50):
+            s = rng.randint(0, 2, size=n_obs).astype(np.int8)
+            r = rng.normal()
+            # reference equations
+            C_pred = C + 0.3 * np.identity(n_obs)
+            K = C_pred.dot(s) / (s.dot(C_pred.dot(s)) + 0.4 + agent.eps)
+            w = w + K * (r - s.dot(w))
+            C = C_pred - np.outer(K, s.dot(C_pred))
+            agent.update(s, r, 0.0, False)
+        npt.assert_almost_equal(agent.get_hidden_state()["w"], w)
+        npt.assert_almost_equal(agent.get_hidden_state()["C"], C)
+        w_done, C_done = agent.update(s, r, 0.0, True)
+        npt.assert_equal(w_done, agent.get_hidden_state()["w"])
+
     def test_reset(self):
         self.agent.reset()
         w = np.array([0.1, 0.1, 0.1], dtype=np.float64)
@@ -82,6 +218,70 @@ class Test_KrwNormModel(unittest.TestCase):
             npt.assert_almost_equal(self.agent.get_hidden_state()["C"], C)
         )
 
+    def test_sequence_loglik(self):
+        expected = _replay_loglik(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        hidden = {k: np.copy(v) for k, v in self.agent.get_hidden_state().items()}
+        self.agent.reset()
+        actual = self.agent.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+        for k, v in hidden.items():
+            npt.assert_almost_equal(self.agent.get_hidden_state()[k], v)
+
+    def test_sequence_loglik_grad(self):
+        errors = check_loglik_grad(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        for k, err in errors.items():
+            self.assertLess(err, 1e-6, k)
+
+    def _random_batch(self, rng, K):
+        return {
+            "tauSq": rng.uniform(size=K),
+            "sigmaRSq": rng.uniform(size=K),
+            "w": rng.normal(size=(K, 3)),
+            "sigma": rng.uniform(0.5, 1.5, size=K),
+            "b0": rng.normal(size=K),
+            "b1": rng.normal(size=(K, 3)),
+            "sigmaWInit": rng.uniform(0.5, 1.5, size=K),
+        }
+
+    def test_batch_negloglike(self):
+        K = 10
+        batch = self._random_batch(np.random.RandomState(0), K)
+        expected = []
+        for i in range(K):
+            self.agent.set_paras({k: np.copy(v[i]) for k, v in batch.items()})
+            expected.append(
+                -np.sum(self.agent.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS))
+            )
+        actual = self.agent.batch_negloglike(batch, _STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+
+        model = associative_learning.KrwNormModel(n_obs=3, seed=0)
+        paras_matrix = np.column_stack([batch[k] for k in model.get_paras().keys()])
+        actual = model.batch_negloglike(paras_matrix, _STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+
+    def test_kalman_filter_batch_subjects(self):
+        rng = np.random.RandomState(1)
+        B, T = 4, 12
+        batch = self._random_batch(rng, B)
+        lengths = [12, 5, 9, 1]
+        stimuli = rng.randint(0, 2, size=(T, B, 3))
+        rewards = rng.normal(size=(T, B))
+        actions = rng.normal(size=(T, B))
+        mask = np.arange(T)[:, None] < np.array(lengths)[None, :]
+
+        engine = associative_learning.KalmanFilterBatch(batch, n_obs=3)
+        actual = engine.sequence_loglik(stimuli, rewards, actions, mask=mask)
+        for i, n in enumerate(lengths):
+            self.agent.set_paras({k: np.copy(v[i]) for k, v in batch.items()})
+            expected = self.agent.sequence_loglik(
+                stimuli[:n, i], rewards[:n, i], actions[:n, i]
+            )
+            self.assertAlmostEqual(actual[i], np.sum(expected))
+            hidden = self.agent.get_hidden_state()
+            npt.assert_almost_equal(engine.w[i], hidden["w"])
+            npt.assert_almost_equal(engine.C[i], hidden["C"])
+
 
 class Test_LSSPDAgent(unittest.TestCase):
     def setUp(self):
@@ -124,6 +324,20 @@ class Test_LSSPDAgent(unittest.TestCase):
             npt.assert_almost_equal(self.agent.get_hidden_state()["alpha"], alpha)
         )
 
+    def test_sequence_loglik(self):
+        expected = _replay_loglik(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        hidden = {k: np.copy(v) for k, v in self.agent.get_hidden_state().items()}
+        self.agent.reset()
+        actual = self.agent.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+        for k, v in hidden.items():
+            npt.assert_almost_equal(self.agent.get_hidden_state()[k], v)
+
+    def test_sequence_loglik_grad(self):
+        errors = check_loglik_grad(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        for k, err in errors.items():
+            self.assertLess(err, 1e-6, k)
+
 
 class Test_BetaBinomialAgent(unittest.TestCase):
     def setUp(self):
@@ -153,6 +367,43 @@ class Test_BetaBinomialAgent(unittest.TestCase):
             npt.assert_almost_equal(self.agent.get_hidden_state()["b"], b)
         )
 
+    def test_sequence_loglik(self):
+        paras = {
+            "intercept": 0.5,
+            "slope": np.array([0.5, 0.2, -0.3]),
+            "mix_coef": 0.4,
+            "sigma": 0.5,
+            "a": 1,
+            "b": 1,
+        }
+        self.agent.set_paras(paras)
+        expected = _replay_loglik(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        hidden = {k: np.copy(v) for k, v in self.agent.get_hidden_state().items()}
+        self.agent.reset()
+        actual = self.agent.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+        for k, v in hidden.items():
+            npt.assert_almost_equal(self.agent.get_hidden_state()[k], v)
+
+    def test_beta_moments(self):
+        from cognibench.models.associative_learning.beta_binomial import (
+            _beta_mean,
+            _beta_entropy,
+        )
+
+        a = np.array([0.3, 1.0, 2.5, 40.0, 1000.0])
+        b = np.array([0.7, 1.0, 7.0, 3.0, 0.5])
+        npt.assert_almost_equal(_beta_mean(a, b), stats.beta.mean(a, b))
+        npt.assert_almost_equal(_beta_entropy(a, b), stats.beta.entropy(a, b))
+        self.assertAlmostEqual(_beta_entropy(2.0, 3.0), stats.beta.entropy(2, 3))
+
+    def test_cue_indices(self):
+        stimuli = np.array([[0, 0, 1], [1, 0, 0], [0, 0, 1], [0, 1, 0]])
+        npt.assert_equal(self.agent._cue_indices(stimuli), [2, 0, 2, 1])
+        npt.assert_equal(self.agent._cue_indices(stimuli[::-1]), [1, 2, 0, 2])
+        with self.assertRaises(KeyError):
+            self.agent._cue_indices([[1, 1, 0]])
+
 
 if __name__ == "__main__":
     unittest.main()
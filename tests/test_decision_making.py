@@ -1,9 +1,50 @@
+import pickle
 import unittest
 from gym import spaces
 import numpy as np
 import numpy.testing as npt
-from cognibench.models import decision_making
-from cognibench import distr
+from cognibench.models import decision_making, Record
+from cognibench import distr, settings
+from cognibench.models.utils import multi_from_single_cls
+from cognibench.utils import check_loglik_grad
+
+
+def _replay_loglik(agent, stimuli, rewards, actions):
+    agent.reset()
+    out = []
+    for s, r, a in zip(stimuli, rewards, actions):
+        out.append(agent.eval_policy(s).logpmf(a))
+        agent.update(s, r, a, False)
+    return np.array(out)
+
+
+_STIMULI = [0, 1, 2, 0, 0, 1, 2, 2, 1, 0]
+_REWARDS = [1, 0, 0, 1, 1, 0, 1, 0, 0, 1]
+_ACTIONS = [0, 2, 1, 1, 0, 0, 2, 1, 2, 2]
+
+
+class Test_CategoricalRV(unittest.TestCase):
+    def test_logpmf(self):
+        logits = np.array([1000.0, 999.0, -50.0])
+        rv = distr.CategoricalRV(logits)
+        p = np.exp(logits - logits.max())
+        p /= p.sum()
+        npt.assert_almost_equal(rv.logpmf(np.arange(3)), np.log(p + 1e-8))
+        self.assertTrue(np.all(np.isfinite(rv.logpmf(np.arange(3)))))
+
+        rv.set_probs(np.array([0.2, 0.0, 0.8]))
+        npt.assert_almost_equal(rv.logpmf(np.arange(3)), np.log([0.2, 1e-8, 0.8]))
+
+    def test_rvs(self):
+        p = np.array([0.1, 0.6, 0.3])
+        rv = distr.CategoricalRV.from_probs(p)
+        rv.random_state = np.random.RandomState(0)
+        expected_state = np.random.RandomState(0)
+        for _ in range(100):
+            self.assertEqual(rv.rvs(), expected_state.choice(3, p=p))
+        # reused object draws from the new distribution
+        rv.set_logits(np.array([0.0, -np.inf, 0.0]))
+        self.assertNotIn(1, [rv.rvs() for _ in range(100)])
 
 
 class Test_RWCKAgent(unittest.TestCase):
@@ -43,7 +84,147 @@ class Test_RWCKAgent(unittest.TestCase):
             )
 
     def test_eval_policy(self):
-        self.assertIsInstance(self.agent.eval_policy(0), distr.DiscreteRV)
+        self.assertIsInstance(self.agent.eval_policy(0), distr.CategoricalRV)
+
+    def test_sequence_loglik(self):
+        expected = _replay_loglik(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        Q = np.asarray(self.agent.get_hidden_state()["Q"])
+        CK = np.asarray(self.agent.get_hidden_state()["CK"])
+        self.agent.reset()
+        actual = self.agent.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+        npt.assert_almost_equal(np.asarray(self.agent.get_hidden_state()["Q"]), Q)
+        npt.assert_almost_equal(np.asarray(self.agent.get_hidden_state()["CK"]), CK)
+
+    def test_sequence_loglik_grad(self):
+        errors = check_loglik_grad(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        for k, err in errors.items():
+            self.assertLess(err, 1e-6, k)
+
+    def test_record_state(self):
+        paras = self.agent.get_paras()
+        self.assertIsInstance(paras, Record)
+        self.assertEqual(list(paras), ["w", "beta", "beta_c", "eta", "eta_c"])
+        self.assertEqual(
+            paras, {"w": 0.1, "eta": 0.5, "eta_c": 0.5, "beta": 0.5, "beta_c": 0.5}
+        )
+        paras["eta"] = 0.25
+        self.assertEqual(self.agent._paras.eta, 0.25)
+        with self.assertRaises(KeyError):
+            paras["gamma"] = 1
+        with self.assertRaises(KeyError):
+            paras["keys"]
+
+        hidden = self.agent.get_hidden_state()
+        self.agent.update(0, 1, 2, False)
+        self.agent.reset()
+        self.assertIsNot(self.agent.get_hidden_state(), hidden)
+        self.agent.set_hidden_state(hidden)
+        self.assertIs(self.agent.get_hidden_state(), hidden)
+
+        copy = pickle.loads(pickle.dumps(self.agent))
+        self.assertEqual(copy.get_paras(), paras)
+        self.assertEqual(type(copy.get_paras()), type(paras))
+        self.assertEqual(type(copy.get_hidden_state()), type(hidden))
+        npt.assert_equal(
+            np.asarray(copy.get_hidden_state()["Q"]), np.asarray(hidden["Q"])
+        )
+        self.assertEqual(copy.rng.random(), self.agent.rng.random())
+
+    def test_lazy_rows(self):
+        n_obs, n_action, n_trials = 10000, 5, 300
+        rng = np.random.RandomState(0)
+        stimuli = rng.randint(20, size=n_trials) * 7
+        rewards = rng.randint(2, size=n_trials)
+        actions = rng.randint(n_action, size=n_trials)
+        for eta_c in (0.3, 1.0):
+            paras = {"w": 0.2, "beta": 2.0, "beta_c": 1.5, "eta": 0.4, "eta_c": eta_c}
+            agent = decision_making.RWCKAgent(
+                n_action=n_action, n_obs=n_obs, paras_dict=paras
+            )
+            # dense reference implementation
+            CK = np.zeros((n_obs, n_action))
+            Q = np.full((n_obs, n_action), 0.2)
+            expected = []
+            for s, r, a in zip(stimuli, rewards, actions):
+                V = 2.0 * Q[s] + 1.5 * CK[s]
+                p = np.exp(V - V.max())
+                expected.append(np.log(p[a] / p.sum() + 1e-8))
+                CK[s] = (1 - eta_c) * CK[s]
+                CK[s, a] += eta_c
+                Q[s, a] += 0.4 * (r - Q[s, a])
+
+            agent.reset()
+            npt.assert_almost_equal(
+                agent.sequence_loglik(stimuli, rewards, actions), expected
+            )
+            npt.assert_almost_equal(agent.get_hidden_state()["CK"], CK)
+            npt.assert_almost_equal(agent.get_hidden_state()["Q"], Q)
+            self.assertEqual(
+                agent.get_hidden_state()["CK"].n_allocated, len(set(stimuli))
+            )
+            npt.assert_almost_equal(
+                _replay_loglik(agent, stimuli, rewards, actions), expected
+            )
+            npt.assert_almost_equal(agent.get_hidden_state()["CK"], CK)
+
+    def test_lazy_row_matrix_scale(self):
+        M = decision_making.rwck.LazyRowMatrix(4, 2, fill=1.0)
+        npt.assert_equal(M[3], [1.0, 1.0])
+        self.assertEqual(M.n_allocated, 0)
+        k = M.slot(3)
+        for _ in range(1000):
+            M.scale(k, 0.5)
+            M.add(k, 0, 0.5)
+        npt.assert_almost_equal(M[3], [1.0, 0.0])
+        self.assertTrue(np.all(np.isfinite(M.raw[k])))
+
+    def test_lazy_row_matrix_bounds(self):
+        M = decision_making.rwck.LazyRowMatrix(2, 3)
+        self.assertRaises(IndexError, M.slot, 7)
+        self.assertRaises(IndexError, M.row, -3)
+        self.assertEqual(M.slot(-1), M.slot(1))
+        M[-1] = [1.0, 2.0, 3.0]
+        npt.assert_equal(M[1], [1.0, 2.0, 3.0])
+        self.assertEqual(M.n_allocated, 1)
+        self.assertRaises(IndexError, self.agent.update, 7, 1, 0, False)
+        npt.assert_equal(np.asarray(self.agent.get_hidden_state()["Q"]).shape, (3, 3))
+
+    def test_lazy_row_matrix_setitem(self):
+        M = decision_making.rwck.LazyRowMatrix(3, 2, fill=1.0)
+        M.scale(M.slot(2), 0.5)
+        M[2, 0] = 4.0
+        npt.assert_equal(M[2], [4.0, 0.5])
+        self.assertEqual(M[2, 1], 0.5)
+        M[-1, :] = [1.0, 3.0]
+        M[0, 1] = 2.0
+        npt.assert_equal(np.asarray(M), [[1.0, 2.0], [1.0, 1.0], [1.0, 3.0]])
+        M[:, 0] = 0.0
+        npt.assert_equal(np.asarray(M), [[0.0, 2.0], [0.0, 1.0], [0.0, 3.0]])
+        # indexing returns copies
+        M[1][1] = 5.0
+        self.assertEqual(M[1, 1], 1.0)
+        self.assertRaises(IndexError, M.__setitem__, (3, 0), 1.0)
+
+        # the hidden state can be edited in place
+        Q = self.agent.get_hidden_state()["Q"]
+        Q[1, 2] = 10.0
+        self.assertEqual(self.agent.get_hidden_state()["Q"][1, 2], 10.0)
+        policy = self.agent.eval_policy(1)
+        self.assertGreater(policy.logpmf(2), policy.logpmf(0))
+
+    def test_save_restore_hidden_state(self):
+        self.agent.update(0, 1, 2, False)
+        saved = {k: v.copy() for k, v in self.agent.get_hidden_state().items()}
+        self.assertIsInstance(saved["Q"], decision_making.rwck.LazyRowMatrix)
+        expected = self.agent.update(1, 0, 1, False)
+        dense = {k: np.asarray(v) for k, v in saved.items()}
+        self.agent.set_hidden_state(saved)
+        npt.assert_equal(self.agent.update(1, 0, 1, False), expected)
+
+        # dense arrays are accepted as well
+        self.agent.set_hidden_state(dense)
+        npt.assert_equal(self.agent.update(1, 0, 1, False), expected)
 
 
 class Test_NWSLSAgent(unittest.TestCase):
@@ -72,7 +253,37 @@ class Test_NWSLSAgent(unittest.TestCase):
         self.assertIn(self.agent.get_hidden_state()["action"], [0, 1, 2])
 
     def test_eval_policy(self):
-        self.assertIsInstance(self.agent.eval_policy(0), distr.DiscreteRV)
+        self.assertIsInstance(self.agent.eval_policy(0), distr.CategoricalRV)
+
+    def test_sequence_loglik(self):
+        expected = _replay_loglik(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        hidden = dict(self.agent.get_hidden_state())
+        self.agent.reset()
+        actual = self.agent.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+        self.assertEqual(hidden, self.agent.get_hidden_state())
+
+    def test_policy_cache(self):
+        self.agent.reset()
+        rv = self.agent.eval_policy(0)
+        self.assertIs(self.agent.eval_policy(2), rv)
+        self.agent.update(0, 0, 2, False)
+        lose_rv = self.agent.eval_policy(0)
+        self.assertIsNot(lose_rv, rv)
+        expected = [(1 - 0.5 / 3) / 2, (1 - 0.5 / 3) / 2, 0.5 / 3]
+        npt.assert_almost_equal(
+            np.exp(lose_rv.logpmf(np.arange(3))), expected, decimal=6
+        )
+
+        self.agent.set_paras({"epsilon": 1.5})
+        self.assertIsNot(self.agent.eval_policy(0), rv)
+
+        self.agent.policy_cache_size = 2
+        for action in range(3):
+            for reward in (0, 1):
+                self.agent.update(0, reward, action, False)
+                self.agent.eval_policy(0)
+        self.assertEqual(len(self.agent._policy_cache), 2)
 
 
 class Test_RandomRespondAgent(unittest.TestCase):
@@ -97,7 +308,378 @@ class Test_RandomRespondAgent(unittest.TestCase):
         self.assertEqual(dict(), self.agent.get_hidden_state())
 
     def test_eval_policy(self):
-        self.assertIsInstance(self.agent.eval_policy(0), distr.DiscreteRV)
+        self.assertIsInstance(self.agent.eval_policy(0), distr.CategoricalRV)
+
+    def test_sequence_loglik(self):
+        expected = _replay_loglik(self.agent, _STIMULI, _REWARDS, _ACTIONS)
+        actual = self.agent.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+
+
+class Test_RWCKModel(unittest.TestCase):
+    def test_fit_multistart(self):
+        kwargs = dict(n_action=3, n_obs=3, seed=42)
+        single = decision_making.RWCKModel(**kwargs)
+        single.fit(_STIMULI, _REWARDS, _ACTIONS)
+
+        serial = decision_making.RWCKModel(n_starts=3, n_workers=1, **kwargs)
+        serial.fit(_STIMULI, _REWARDS, _ACTIONS)
+        parallel = decision_making.RWCKModel(n_starts=3, n_workers=2, **kwargs)
+        parallel.fit(_STIMULI, _REWARDS, _ACTIONS)
+
+        self.assertEqual(len(parallel.start_results), 3)
+        self.assertEqual(parallel.start_results[0]["seed"], 42)
+        npt.assert_equal(parallel.start_results[0]["x"], single.start_results[0]["x"])
+        for res_s, res_p in zip(serial.start_results, parallel.start_results):
+            self.assertEqual(repr(res_s["seed"]), repr(res_p["seed"]))
+            npt.assert_equal(res_s["x"], res_p["x"])
+
+        best = min(res["fun"] for res in parallel.start_results)
+        self.assertLessEqual(best, single.start_results[0]["fun"])
+        self.assertEqual(parallel.get_paras(), serial.get_paras())
+
+    def test_fit_report(self):
+        model = decision_making.RWCKModel(n_action=3, n_obs=3, seed=5)
+        report = model.fit(_STIMULI, _REWARDS, _ACTIONS)
+        self.assertIs(report, model.fit_report)
+        self.assertGreater(report.n_fev, 0)
+        self.assertEqual(report.n_jev, report.n_fev)
+        self.assertEqual(len(report.trace), report.n_iter)
+        self.assertEqual(report.fun, model.start_results[0]["fun"])
+        self.assertGreaterEqual(report.wall_time, report.eval_time)
+
+        # the trace is recorded without evaluations that are not counted in n_fev
+        n_calls = {"n": 0}
+        sequence_loglik = model.agent.sequence_loglik
+
+        def counted(*args, **kwargs):
+            n_calls["n"] += 1
+            return sequence_loglik(*args, **kwargs)
+
+        model.agent.sequence_loglik = counted
+        for method in ("Nelder-Mead", "Powell"):
+            n_calls["n"] = 0
+            model.optim_kwargs = {"method": method}
+            report = model.fit(_STIMULI, _REWARDS, _ACTIONS)
+            self.assertEqual(report.n_jev, 0)
+            self.assertEqual(n_calls["n"], report.n_fev)
+            self.assertFalse(np.any(np.isnan(report.trace)))
+            self.assertTrue(np.all(np.diff(report.trace) <= 0))
+
+    def test_fixed_params(self):
+        model = decision_making.RWModel(
+            n_action=3,
+            n_obs=3,
+            seed=5,
+            optim_kwargs={"method": "L-BFGS-B", "jac": False},
+        )
+        report = model.fit(_STIMULI, _REWARDS, _ACTIONS)
+        self.assertTrue(report.success)
+        paras = model.get_paras()
+        self.assertEqual(paras["w"], 0.5)
+        self.assertEqual(paras["beta_c"], 0)
+        self.assertEqual(paras["eta_c"], 0)
+
+    def test_transform_params(self):
+        model = decision_making.RWCKModel(n_action=3, n_obs=3, seed=5)
+        report = model.fit(_STIMULI * 3, _REWARDS * 3, _ACTIONS * 3)
+        transformed = decision_making.RWCKModel(
+            n_action=3, n_obs=3, seed=5, transform_params=True
+        )
+        transformed_report = transformed.fit(_STIMULI * 3, _REWARDS * 3, _ACTIONS * 3)
+        self.assertAlmostEqual(transformed_report.fun, report.fun, places=2)
+        for k, (lo, hi) in transformed.param_bounds.items():
+            self.assertGreaterEqual(transformed.get_paras()[k], lo)
+            if hi is not None:
+                self.assertLessEqual(transformed.get_paras()[k], hi)
+
+    def test_fit_jointly_parallel(self):
+        multi_cls = multi_from_single_cls(decision_making.RWCKModel)
+        stimuli = [_STIMULI, _STIMULI[::-1], _STIMULI]
+        rewards = [_REWARDS, _REWARDS, _REWARDS[::-1]]
+        actions = [_ACTIONS, _ACTIONS[::-1], _ACTIONS]
+
+        serial = multi_cls(n_subj=3, n_action=3, n_obs=3, seed=7)
+        serial.fit_jointly(stimuli=stimuli, rewards=rewards, actions=actions)
+        serial_paras = [m.get_paras() for m in serial.subject_models]
+
+        parallel = multi_cls(n_subj=3, n_fit_workers=2, n_action=3, n_obs=3, seed=7)
+        subject_models = list(parallel.subject_models)
+        parallel.fit_jointly(stimuli=stimuli, rewards=rewards, actions=actions)
+        parallel_paras = [m.get_paras() for m in parallel.subject_models]
+
+        self.assertEqual(parallel_paras, serial_paras)
+        for before, after, serial_model in zip(
+            subject_models, parallel.subject_models, serial.subject_models
+        ):
+            self.assertIs(after, before)
+            self.assertEqual(after.fit_report.fun, serial_model.fit_report.fun)
+
+    def test_batch_negloglike(self):
+        model = decision_making.RWCKModel(n_action=3, n_obs=3, seed=42)
+        paras_matrix = np.random.RandomState(0).uniform(size=(20, 5))
+        expected = []
+        for x in paras_matrix:
+            model.set_paras(dict(zip(("w", "beta", "beta_c", "eta", "eta_c"), x)))
+            expected.append(
+                -np.sum(model.sequence_loglik(_STIMULI, _REWARDS, _ACTIONS))
+            )
+        actual = model.batch_negloglike(paras_matrix, _STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_almost_equal(actual, expected)
+
+    def test_differential_evolution(self):
+        from cognibench.models.optimizers import DifferentialEvolution
+
+        local = decision_making.RWCKModel(n_action=3, n_obs=3, seed=42, n_starts=4)
+        local.fit(_STIMULI, _REWARDS, _ACTIONS)
+
+        optimizer = DifferentialEvolution(popsize=10, max_iter=200, tol=1e-4)
+        fits = []
+        for _ in range(2):
+            model = decision_making.RWCKModel(
+                n_action=3, n_obs=3, seed=42, optimizer=optimizer
+            )
+            # beta and beta_c only have a lower bound
+            report = model.fit(_STIMULI, _REWARDS, _ACTIONS)
+            fits.append(model.get_paras())
+            for k, (lo, hi) in model.param_bounds.items():
+                self.assertTrue(lo <= model.get_paras()[k])
+                self.assertTrue(hi is None or model.get_paras()[k] <= hi)
+            self.assertLessEqual(report.fun, local.fit_report.fun + 1e-3)
+        # seeded by the model seed
+        self.assertEqual(fits[0], fits[1])
+        self.assertEqual(report.n_jev, 0)
+        self.assertTrue(np.all(np.diff(report.trace) <= 0))
+
+        model.param_bounds.update(beta=(0, 20), beta_c=(0, 20))
+        report = model.fit(_STIMULI, _REWARDS, _ACTIONS)
+        for k, (lo, hi) in model.param_bounds.items():
+            self.assertTrue(lo <= model.get_paras()[k] <= hi)
+        self.assertLessEqual(report.fun, local.fit_report.fun + 1e-3)
+
+    def test_differential_evolution_workers(self):
+        from cognibench.models import policy_model
+        from cognibench.models.optimizers import DifferentialEvolution
+
+        optimizer = DifferentialEvolution(popsize=5, max_iter=5)
+        fits = []
+        for n_workers in (1, 2):
+            # NWSLS does not implement a batched likelihood
+            model = decision_making.NWSLSModel(
+                n_action=3, n_obs=3, seed=7, optimizer=optimizer, n_workers=n_workers
+            )
+            fits.append(
+                (model.fit(_STIMULI, _REWARDS, _ACTIONS).fun, model.get_paras())
+            )
+        self.assertEqual(fits[0], fits[1])
+
+        paras_matrix = [[0.1], [0.5], [2.0]]
+        policy_model._init_worker(model, _STIMULI, _REWARDS, _ACTIONS)
+        npt.assert_equal(
+            policy_model._worker_batch_negloglike(paras_matrix),
+            model.batch_negloglike(paras_matrix, _STIMULI, _REWARDS, _ACTIONS),
+        )
+
+    def test_differential_evolution_budget(self):
+        from cognibench.models.optimizers import DifferentialEvolution
+
+        optimizer = DifferentialEvolution(popsize=5, max_fev=200, tol=0)
+        model = decision_making.RWModel(
+            n_action=3, n_obs=3, seed=1, optimizer=optimizer
+        )
+        model.param_bounds["beta"] = (0, 20)
+        report = model.fit(_STIMULI, _REWARDS, _ACTIONS)
+        # RW has 2 free parameters and a population of 10
+        self.assertLessEqual(report.n_fev, 200)
+        self.assertEqual(report.n_fev, 10 * (report.n_iter + 1))
+        self.assertFalse(report.success)
+        self.assertEqual(model.get_paras()["beta_c"], 0)
+
+        optimizer = DifferentialEvolution(max_time=0)
+        model = decision_making.RWModel(
+            n_action=3, n_obs=3, seed=1, optimizer=optimizer
+        )
+        model.param_bounds["beta"] = (0, 20)
+        self.assertEqual(model.fit(_STIMULI, _REWARDS, _ACTIONS).n_iter, 0)
+
+        # the initial population does not fit in the budget
+        optimizer = DifferentialEvolution(popsize=5, max_fev=5)
+        model = decision_making.RWModel(
+            n_action=3, n_obs=3, seed=1, optimizer=optimizer
+        )
+        x0 = model.get_paras()
+        report = model.fit(_STIMULI, _REWARDS, _ACTIONS)
+        self.assertEqual((report.n_fev, report.n_iter), (1, 0))
+        self.assertFalse(report.success)
+        self.assertAlmostEqual(model.get_paras()["eta"], x0["eta"])
+
+
+class Test_StackedRWCKModel(unittest.TestCase):
+    stimuli = [_STIMULI, _STIMULI[::-1][:-5], _STIMULI[:12]]
+    rewards = [_REWARDS, _REWARDS[:-5], _REWARDS[::-1][:12]]
+    actions = [_ACTIONS, _ACTIONS[::-1][:-5], _ACTIONS[:12]]
+
+    def test_sequence_loglik_jointly(self):
+        stacked = decision_making.StackedRWCKModel(n_subj=3, n_action=3, n_obs=3)
+        rng = np.random.RandomState(0)
+        expected = []
+        for i in range(3):
+            paras = dict(
+                zip(("w", "beta", "beta_c", "eta", "eta_c"), rng.uniform(size=5))
+            )
+            stacked.set_paras(i, paras)
+            single = decision_making.RWCKModel(n_action=3, n_obs=3)
+            single.set_paras(paras)
+            expected.append(
+                single.sequence_loglik(
+                    self.stimuli[i], self.rewards[i], self.actions[i]
+                )
+            )
+        actual = stacked.sequence_loglik_jointly(
+            self.stimuli, self.rewards, self.actions
+        )
+        for a, e in zip(actual, expected):
+            npt.assert_almost_equal(a, e)
+        # hidden state after the joint pass equals the one after the trial-by-trial replay
+        stacked.reset(1)
+        for s, r, a in zip(self.stimuli[1], self.rewards[1], self.actions[1]):
+            stacked.update(1, s, r, a, False)
+        Q_replay = np.copy(stacked.get_hidden_state(1)["Q"])
+        stacked.reset()
+        stacked.sequence_loglik_jointly(self.stimuli, self.rewards, self.actions)
+        npt.assert_almost_equal(stacked.get_hidden_state(1)["Q"], Q_replay)
+
+    def test_fit_jointly(self):
+        for stacked_cls, single_cls in (
+            (decision_making.StackedRWCKModel, decision_making.RWCKModel),
+            (decision_making.StackedRWModel, decision_making.RWModel),
+            (decision_making.StackedCKModel, decision_making.CKModel),
+        ):
+            stacked = stacked_cls(n_subj=3, n_action=3, n_obs=3, seed=7)
+            report = stacked.fit_jointly(self.stimuli, self.rewards, self.actions)
+            self.assertIs(report, stacked.fit_report)
+            for i in range(3):
+                single = single_cls(n_action=3, n_obs=3, seed=7)
+                single.fit(self.stimuli[i], self.rewards[i], self.actions[i])
+                single.reset()
+                expected = np.sum(
+                    single.sequence_loglik(
+                        self.stimuli[i], self.rewards[i], self.actions[i]
+                    )
+                )
+                stacked.reset()
+                actual = np.sum(
+                    stacked.sequence_loglik(
+                        i, self.stimuli[i], self.rewards[i], self.actions[i]
+                    )
+                )
+                self.assertAlmostEqual(actual, expected, places=3)
+                self.assertEqual(stacked.n_params(), single.n_params())
+
+    def test_fit_jointly_more_subjects_than_actions(self):
+        n_subj = 4
+        stimuli = [[0] * 15, [0] * 12, [0] * 15, [0] * 9]
+        rewards = [_REWARDS + _REWARDS[:5], _REWARDS[2:] + _REWARDS[:4]] * 2
+        actions = [
+            [0, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 1],
+            [1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 1, 0],
+            [1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1],
+            [0, 0, 1, 0, 0, 0, 0, 1, 0],
+        ]
+        rewards = [r[: len(a)] for r, a in zip(rewards, actions)]
+        stacked = decision_making.StackedRWCKModel(
+            n_subj=n_subj, n_action=2, n_obs=1, seed=7
+        )
+        report = stacked.fit_jointly(stimuli, rewards, actions)
+        self.assertTrue(report.success)
+        fun = 0
+        for i in range(n_subj):
+            # hidden state is reset to the fitted parameters of the subject
+            hidden = stacked.get_hidden_state(i)
+            npt.assert_equal(hidden["Q"], np.full((1, 2), stacked.get_paras(i)["w"]))
+            npt.assert_equal(hidden["CK"], np.zeros((1, 2)))
+
+            single = decision_making.RWCKModel(n_action=2, n_obs=1, seed=7)
+            expected = single.fit(stimuli[i], rewards[i], actions[i]).fun
+            actual = -np.sum(
+                stacked.sequence_loglik(i, stimuli[i], rewards[i], actions[i])
+            )
+            self.assertAlmostEqual(actual, expected, places=3)
+            fun += actual
+        self.assertAlmostEqual(report.fun, fun)
+        self.assertTrue(np.all(np.diff(report.trace) <= 1e-12))
+
+    def test_fit_subjects_in_turn(self):
+        stacked = decision_making.StackedRWCKModel(
+            n_subj=2, n_action=3, n_obs=3, seed=7
+        )
+        stacked.fit(0, self.stimuli[0], self.rewards[0], self.actions[0])
+        paras_0 = stacked.get_paras(0)
+        stacked.fit(1, self.stimuli[1], self.rewards[1], self.actions[1])
+        self.assertEqual(stacked.get_paras(0), paras_0)
+
+        single = decision_making.StackedRWCKModel(n_subj=2, n_action=3, n_obs=3, seed=7)
+        single.fit(1, self.stimuli[1], self.rewards[1], self.actions[1])
+        self.assertEqual(stacked.get_paras(1), single.get_paras(1))
+
+    def test_interactive_test(self):
+        from cognibench.testing import InteractiveTest
+        from cognibench.scores import NLLScore
+        from cognibench.utils import partialclass
+
+        observation = [
+            {"stimuli": s, "rewards": r, "actions": a}
+            for s, r, a in zip(self.stimuli, self.rewards, self.actions)
+        ]
+        score_type = partialclass(NLLScore, min_score=0, max_score=1e4)
+        stacked = decision_making.StackedRWCKModel(
+            n_subj=3, n_action=3, n_obs=3, seed=7
+        )
+        multi = multi_from_single_cls(decision_making.RWCKModel)(
+            n_subj=3, n_action=3, n_obs=3, seed=7
+        )
+        scores = []
+        for model in (stacked, multi):
+            test = InteractiveTest(
+                observation=observation,
+                score_type=score_type,
+                multi_subject=True,
+                optimize_models=True,
+            )
+            scores.append(test.judge(model).score)
+        self.assertAlmostEqual(scores[0], scores[1], places=2)
+
+    def test_interactive_test_joint_failure(self):
+        from cognibench.testing import InteractiveTest
+        from cognibench.scores import NLLScore
+        from cognibench.utils import partialclass
+
+        observation = [
+            {"stimuli": s, "rewards": r, "actions": a}
+            for s, r, a in zip(self.stimuli, self.rewards, self.actions)
+        ]
+        stacked = decision_making.StackedRWCKModel(
+            n_subj=3, n_action=3, n_obs=3, seed=7
+        )
+
+        def failing(*args, **kwargs):
+            raise RuntimeError("joint evaluation failed")
+
+        stacked.sequence_loglik_jointly = failing
+        test = InteractiveTest(
+            observation=observation,
+            score_type=partialclass(NLLScore, min_score=0, max_score=1e4),
+            multi_subject=True,
+        )
+        # the failure is logged and every subject gets empty predictions, as when predict_single fails
+        self.assertEqual(test.generate_prediction(stacked), [[], [], []])
+        test.judge(stacked)
+        old = settings["CRASH_EARLY"]
+        settings["CRASH_EARLY"] = True
+        try:
+            self.assertRaises(RuntimeError, test.judge, stacked)
+        finally:
+            settings["CRASH_EARLY"] = old
 
 
 if __name__ == "__main__":
@@ -5,7 +5,8 @@ import numpy as np
 import numpy.testing as npt
 from scipy import stats
 from cognibench.models import decision_making
-from cognibench.envs import BanditEnv, ClassicalConditioningEnv
+from cognibench.envs import BanditEnv, VectorBanditEnv, ClassicalConditioningEnv
+from cognibench.utils import spawn_seeds
 from cognibench.simulation import simulate
 from cognibench.capabilities import (
     DiscreteAction,
@@ -31,6 +32,45 @@ class TestBanditEnv(unittest.TestCase):
         self.assertTrue(0 <= self.env.reset() < len(self.p_dist))
 
 
+class TestVectorBanditEnv(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.p_dist = rng.uniform(size=(6, 4))
+        self.actions = rng.randint(4, size=(300, 6))
+
+    def test_matches_bandit_envs(self):
+        env = VectorBanditEnv(p_dist=self.p_dist, seed=42)
+        envs = [
+            BanditEnv(p_dist=p, seed=s)
+            for p, s in zip(self.p_dist, spawn_seeds(42, len(self.p_dist)))
+        ]
+        npt.assert_equal(env.reset(), [e.reset() for e in envs])
+        for a in self.actions:
+            obs, rewards, dones, _ = env.step(a)
+            expected = [e.step(a_i) for e, a_i in zip(envs, a)]
+            npt.assert_equal(obs, [x[0] for x in expected])
+            npt.assert_equal(rewards, [x[1] for x in expected])
+            self.assertFalse(dones.any())
+
+    def test_seeds(self):
+        seeds = spawn_seeds(7, len(self.p_dist))
+        first = VectorBanditEnv(p_dist=self.p_dist, seed=7)
+        second = VectorBanditEnv(p_dist=self.p_dist, seed=seeds)
+        for a in self.actions[:20]:
+            npt.assert_equal(first.step(a)[1], second.step(a)[1])
+        self.assertRaises(
+            ValueError, VectorBanditEnv, p_dist=self.p_dist, seed=seeds[:2]
+        )
+
+    def test_methods(self):
+        env = VectorBanditEnv(p_dist=self.p_dist, seed=0)
+        self.assertEqual(env.n_envs, 6)
+        self.assertEqual(env.n_bandits, 4)
+        self.assertRaises(AssertionError, env.step, np.full(6, 4))
+        self.assertRaises(AssertionError, env.step, np.zeros(5, dtype=int))
+        self.assertRaises(ValueError, VectorBanditEnv, p_dist=[0.1, 0.2])
+
+
 class TestClassicalConditioningEnv(unittest.TestCase):
     def setUp(self):
         env_stimuli = [
@@ -58,6 +98,49 @@ class TestClassicalConditioningEnv(unittest.TestCase):
             reset_in = reset_in or (reset_stim == s).all()
         self.assertTrue(reset_in)
 
+    def test_schedule(self):
+        env = ClassicalConditioningEnv(
+            stimuli=self.stimuli,
+            p_stimuli=self.p_stimuli,
+            p_reward=self.p_reward,
+            seed=5,
+            schedule_size=50,
+        )
+        indices = env.stimulus_schedule.copy()
+        rewards = env.reward_schedule.copy()
+        npt.assert_equal(env.schedule_stimuli, np.asarray(self.stimuli)[indices])
+        npt.assert_equal(env.reset(), self.stimuli[indices[0]])
+        for i in range(1, 50):
+            obs, reward, done, _ = env.step(0.5)
+            npt.assert_equal(obs, self.stimuli[indices[i]])
+            self.assertEqual(reward, rewards[i])
+            self.assertFalse(done)
+        # exhausted block is replaced by a new one
+        env.step(0.5)
+        self.assertEqual(env.stimulus_schedule.shape, (50,))
+        self.assertFalse(np.array_equal(env.stimulus_schedule, indices))
+
+        env.set_seed(5)
+        npt.assert_equal(env.stimulus_schedule, indices)
+        npt.assert_equal(env.reward_schedule, rewards)
+        self.assertIsNone(self.env.stimulus_schedule)
+        self.assertRaises(
+            ValueError,
+            ClassicalConditioningEnv,
+            stimuli=self.stimuli,
+            p_stimuli=self.p_stimuli,
+            p_reward=self.p_reward,
+            schedule_size=0,
+        )
+
+    def test_schedule_distribution(self):
+        n_trials = 200000
+        indices, rewards = self.env.generate_schedule(n_trials)
+        freq = np.bincount(indices, minlength=len(self.stimuli)) / n_trials
+        npt.assert_allclose(freq, self.p_stimuli, atol=0.01)
+        for i, p in enumerate(self.p_reward):
+            self.assertAlmostEqual(rewards[indices == i].mean(), p, delta=0.02)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+import numpy as np
+import numpy.testing as npt
+from cognibench import settings
+from cognibench.models import recursions
+from cognibench.models.decision_making import RWCKAgent
+from cognibench.models.associative_learning import RwNormAgent, LSSPDAgent
+
+
+_KERNELS = [k for k in vars(recursions).values() if isinstance(k, recursions._Kernel)]
+
+
+def _run(backend, agent, method, *args):
+    """
+    Run the given agent method with the given backend. Backend "py_func" runs the kernels of the Numba backend as
+    uncompiled Python functions, so that they are tested even if Numba is not installed.
+    """
+    old = settings["BACKEND"], recursions.numba_enabled
+    compiled = [k._compiled for k in _KERNELS]
+    settings["BACKEND"] = backend
+    if backend == "py_func":
+        recursions.numba_enabled = lambda: True
+        for k in _KERNELS:
+            k._compiled = k.py_func
+    try:
+        agent.reset()
+        out = getattr(agent, method)(*args)
+        return out, agent.get_hidden_state()
+    finally:
+        settings["BACKEND"], recursions.numba_enabled = old
+        for k, c in zip(_KERNELS, compiled):
+            k._compiled = c
+
+
+class Test_backends(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        n_trials, n_action, n_obs = 200, 3, 4
+        self.dm_data = (
+            rng.randint(6, size=n_trials),
+            rng.randint(2, size=n_trials),
+            rng.randint(n_action, size=n_trials),
+        )
+        self.al_data = (
+            rng.randint(0, 2, size=(n_trials, n_obs)),
+            rng.normal(size=n_trials),
+            rng.normal(size=n_trials),
+        )
+        self.agents = {
+            "RWCK": (
+                RWCKAgent(
+                    n_action=n_action,
+                    n_obs=6,
+                    paras_dict={
+                        "w": 0.2,
+                        "beta": 1.5,
+                        "beta_c": 0.8,
+                        "eta": 0.3,
+                        "eta_c": 0.6,
+                    },
+                ),
+                self.dm_data,
+            ),
+            "RwNorm": (
+                RwNormAgent(
+                    n_obs=n_obs,
+                    paras_dict={
+                        "w": rng.normal(size=n_obs),
+                        "sigma": 0.8,
+                        "b0": 0.1,
+                        "b1": rng.normal(size=n_obs),
+                        "eta": 0.2,
+                    },
+                ),
+                self.al_data,
+            ),
+            "LSSPD": (
+                LSSPDAgent(
+                    n_obs=n_obs,
+                    paras_dict={
+                        "w": rng.normal(size=n_obs),
+                        "alpha": 0.5,
+                        "sigma": 0.8,
+                        "b0": 0.1,
+                        "b1": rng.normal(size=n_obs),
+                        "mix_coef": 0.4,
+                        "eta": 0.3,
+                        "kappa": 0.5,
+                    },
+                ),
+                self.al_data,
+            ),
+        }
+
+    def assert_states_equal(self, first, second):
+        for k in first:
+            npt.assert_allclose(np.asarray(first[k]), np.asarray(second[k]))
+
+    def check_sequence_loglik(self, backend):
+        for name, (agent, data) in self.agents.items():
+            with self.subTest(agent=name):
+                py, py_state = _run("python", agent, "sequence_loglik", *data)
+                nb, nb_state = _run(backend, agent, "sequence_loglik", *data)
+                npt.assert_allclose(py, nb, rtol=1e-10, atol=1e-12)
+                self.assert_states_equal(py_state, nb_state)
+
+    def check_sequence_loglik_grad(self, backend):
+        for name, (agent, data) in self.agents.items():
+            with self.subTest(agent=name):
+                (py, py_grad), py_state = _run(
+                    "python", agent, "sequence_loglik_grad", *data
+                )
+                (nb, nb_grad), nb_state = _run(
+                    backend, agent, "sequence_loglik_grad", *data
+                )
+                npt.assert_allclose(py, nb, rtol=1e-10, atol=1e-12)
+                self.assertEqual(py_grad.keys(), nb_grad.keys())
+                for k in py_grad:
+                    npt.assert_allclose(py_grad[k], nb_grad[k], rtol=1e-8, atol=1e-10)
+                self.assert_states_equal(py_state, nb_state)
+
+    def test_kernels_sequence_loglik(self):
+        self.check_sequence_loglik("py_func")
+
+    def test_kernels_sequence_loglik_grad(self):
+        self.check_sequence_loglik_grad("py_func")
+
+    @unittest.skipUnless(recursions.numba, "numba is not installed")
+    def test_sequence_loglik(self):
+        self.check_sequence_loglik("numba")
+
+    @unittest.skipUnless(recursions.numba, "numba is not installed")
+    def test_sequence_loglik_grad(self):
+        self.check_sequence_loglik_grad("numba")
+
+    def test_fallback(self):
+        numba = recursions.numba
+        old = settings["BACKEND"]
+        try:
+            recursions.numba = None
+            settings["BACKEND"] = "numba"
+            self.assertFalse(recursions.numba_enabled())
+            agent, data = self.agents["RWCK"]
+            agent.reset()
+            self.assertEqual(len(agent.sequence_loglik(*data)), len(data[0]))
+        finally:
+            recursions.numba = numba
+            settings["BACKEND"] = old
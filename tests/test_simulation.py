@@ -4,8 +4,9 @@ import numpy as np
 import numpy.testing as npt
 from scipy import stats
 from cognibench.models import decision_making
-from cognibench.envs import BanditEnv
-from cognibench.simulation import simulate
+from cognibench.envs import BanditEnv, ClassicalConditioningEnv
+from cognibench.models.associative_learning import RwNormModel
+from cognibench.simulation import simulate, SimulationResult
 
 
 class Test_Unit(unittest.TestCase):
@@ -20,6 +21,53 @@ class Test_Unit(unittest.TestCase):
     #     self.assertEqual(self.agent.eval_policy(0).pk[1], 0.8757028699917109)
     #     self.assertEqual(np.unique(actions, return_counts=True)[1][1], 87)
 
+    def test_columns(self):
+        result = simulate(self.env, self.agent, 100)
+        self.assertIsInstance(result, SimulationResult)
+        self.assertEqual(result.n_trials, 100)
+        self.assertEqual(result.stimuli.shape, (100,))
+        self.assertEqual(result.actions.dtype, np.int64)
+        self.assertEqual(result.rewards.dtype, np.float64)
+        self.assertTrue(np.isin(result.actions, [0, 1]).all())
+        self.assertTrue(np.isin(result.rewards, [0, 1]).all())
+        self.assertEqual(result.hidden_states, {})
+
+        stimuli, rewards, actions = result
+        self.assertIs(stimuli, result.stimuli)
+        self.assertIs(rewards, result[1])
+        self.assertIs(actions, result[2])
+
+    def test_hidden_states(self):
+        stimuli = [np.array([0, 1, 1]), np.array([1, 0, 0]), np.array([1, 1, 0])]
+        env = ClassicalConditioningEnv(
+            stimuli=stimuli, p_stimuli=[0.3, 0.3, 0.4], p_reward=[0.3, 0.7, 0.5], seed=3
+        )
+        model = RwNormModel(n_obs=3, seed=3)
+        result = simulate(env, model, 50, record_hidden_state=True)
+        # the stimulus shown in trial 0 is the one produced by resetting the environment
+        env.set_seed(3)
+        shown = [env.reset()] + list(result.stimuli[:-1])
+        self.assertGreater(len(np.unique(shown, axis=0)), 1)
+
+        model.reset()
+        for i in range(50):
+            for key, val in model.agent.get_hidden_state().items():
+                npt.assert_allclose(result.hidden_states[key][i], val)
+            model.update(shown[i], result.rewards[i], result.actions[i], False)
+
+    def test_multibinary(self):
+        stimuli = [np.array([0, 1, 1]), np.array([1, 0, 0])]
+        env = ClassicalConditioningEnv(
+            stimuli=stimuli, p_stimuli=[0.5, 0.5], p_reward=[0.3, 0.7], seed=1
+        )
+        model = RwNormModel(n_obs=3, seed=1)
+        result = simulate(env, model, 30, record_hidden_state=True)
+        self.assertEqual(result.stimuli.shape, (30, 3))
+        self.assertEqual(result.actions.dtype, np.float64)
+        self.assertEqual(result.hidden_states["w"].shape, (30, 3))
+        model.reset()
+        self.assertEqual(model.sequence_loglik(*result).shape, (30,))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,6 @@
+import os
+import json
+import tempfile
 import unittest
 from gym import spaces
 from functools import reduce
@@ -5,9 +8,12 @@ import numpy as np
 from scipy import stats
 from cognibench.models import associative_learning
 from cognibench.envs import BanditEnv, ClassicalConditioningEnv
-from cognibench.utils import partialclass
+from cognibench import settings
+from cognibench.utils import partialclass, validate_sequences
 from cognibench.tasks import model_recovery, param_recovery
-from cognibench.testing import InteractiveTest
+from cognibench.testing import InteractiveTest, FitCache
+from cognibench.models.decision_making import RWCKModel
+from cognibench.models.utils import multi_from_single_cls
 from cognibench.scores import NLLScore
 
 
@@ -50,5 +56,191 @@ class TestBatchTestWithSplit(unittest.TestCase):
         pass
 
 
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        self.validation = settings["VALIDATION"]
+        self.obs = {
+            "stimuli": [0, 1, 0, 1, 0, 1, 1, 0],
+            "rewards": [1, 0, 0, 1, 1, 0, 1, 0],
+            "actions": [0, 1, 1, 1, 0, 0, 1, 0],
+        }
+        self.bad_obs = dict(self.obs, stimuli=[0, 1, 2, 1, 0, 1, 1, 0])
+
+    def tearDown(self):
+        settings["VALIDATION"] = self.validation
+
+    def test_sequence(self):
+        settings["VALIDATION"] = "sequence"
+        model = RWCKModel(n_action=2, n_obs=2, seed=3)
+        validate_sequences(model, self.obs["stimuli"], self.obs["actions"])
+        with self.assertRaises(ValueError):
+            validate_sequences(model, self.obs["stimuli"], [0, 1, 0.5])
+        with self.assertRaises(ValueError):
+            model.fit(**self.bad_obs)
+
+        test = InteractiveTest(
+            observation=[self.obs, self.bad_obs],
+            score_type=partialclass(NLLScore, min_score=0, max_score=1e4),
+            multi_subject=True,
+        )
+        multi_model = multi_from_single_cls(RWCKModel)(
+            n_subj=2, n_action=2, n_obs=2, seed=3
+        )
+        with self.assertLogs("cognibench", level="ERROR") as logs:
+            test.judge(multi_model)
+        self.assertIn("Observations are not valid", logs.output[0])
+        crash_early = settings["CRASH_EARLY"]
+        settings["CRASH_EARLY"] = True
+        try:
+            with self.assertRaises(ValueError):
+                test.judge(multi_model)
+        finally:
+            settings["CRASH_EARLY"] = crash_early
+
+        # trials are not checked individually
+        model.agent.eval_policy(1.0)
+
+    def test_strict(self):
+        settings["VALIDATION"] = "strict"
+        model = RWCKModel(n_action=2, n_obs=2, seed=3)
+        with self.assertRaises(AssertionError):
+            model.agent.update(0, 1, 5, False)
+        with self.assertRaises(AssertionError):
+            model.agent.eval_policy(1.0)
+
+    def test_none(self):
+        settings["VALIDATION"] = "none"
+        model = RWCKModel(n_action=2, n_obs=2, seed=3)
+        validate_sequences(model, self.bad_obs["stimuli"], [0.5])
+
+
+class TestFitCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.obs = {
+            "stimuli": [0, 1, 0, 1, 0, 1, 1, 0],
+            "rewards": [1, 0, 0, 1, 1, 0, 1, 0],
+            "actions": [0, 1, 1, 1, 0, 0, 1, 0],
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _judge(self, model, obs, cache, multi_subject=False):
+        n_fits = {"n": 0}
+        for m in getattr(model, "subject_models", [model]):
+            fit = m.fit
+
+            def counted(*args, fit=fit, **kwargs):
+                n_fits["n"] += 1
+                return fit(*args, **kwargs)
+
+            m.fit = counted
+        test = InteractiveTest(
+            observation=obs,
+            score_type=partialclass(NLLScore, min_score=0, max_score=1e4),
+            multi_subject=multi_subject,
+            fit_cache=cache,
+        )
+        score = test.judge(model)
+        return n_fits["n"], score.score
+
+    def test_single_subject(self):
+        cache = FitCache(self.tmpdir.name)
+        model = RWCKModel(n_action=2, n_obs=2, seed=3)
+        n_fits, score = self._judge(model, self.obs, cache)
+        self.assertEqual(n_fits, 1)
+
+        cached_model = RWCKModel(n_action=2, n_obs=2, seed=3)
+        n_fits, cached_score = self._judge(cached_model, self.obs, cache)
+        self.assertEqual(n_fits, 0)
+        self.assertEqual(cached_score, score)
+        self.assertEqual(cached_model.get_paras(), model.get_paras())
+        self.assertEqual(len(cached_model.start_results), 1)
+
+        other_seed = RWCKModel(n_action=2, n_obs=2, seed=4)
+        n_fits, _ = self._judge(other_seed, self.obs, cache)
+        self.assertEqual(n_fits, 1)
+
+        other_obs = dict(self.obs, actions=self.obs["actions"][::-1])
+        n_fits, _ = self._judge(
+            RWCKModel(n_action=2, n_obs=2, seed=3), other_obs, cache
+        )
+        self.assertEqual(n_fits, 1)
+
+    def test_key_inputs(self):
+        cache = FitCache(self.tmpdir.name)
+        key = cache.key(RWCKModel(n_action=2, n_obs=2, seed=3), self.obs)
+        self.assertEqual(
+            cache.key(RWCKModel(n_action=2, n_obs=2, seed=3), self.obs), key
+        )
+        self.assertNotEqual(
+            cache.key(RWCKModel(n_action=5, n_obs=2, seed=3), self.obs), key
+        )
+        self.assertNotEqual(
+            cache.key(RWCKModel(n_action=2, n_obs=3, seed=3), self.obs), key
+        )
+
+        model = RWCKModel(n_action=2, n_obs=2, seed=3)
+        model.param_initializer = {
+            "w": 0.1,
+            "beta": 0.5,
+            "beta_c": 0.5,
+            "eta": 0.5,
+            "eta_c": 0.5,
+        }
+        self.assertNotEqual(cache.key(model, self.obs), key)
+
+        # fitting must not change the key under which the results are stored
+        model = RWCKModel(n_action=2, n_obs=2, seed=3)
+        model.fit(self.obs["stimuli"], self.obs["rewards"], self.obs["actions"])
+        self.assertEqual(cache.key(model, self.obs), key)
+
+    def test_multi_subject(self):
+        cache = FitCache(self.tmpdir.name)
+        multi_cls = multi_from_single_cls(RWCKModel)
+        obs = [self.obs, dict(self.obs, rewards=self.obs["rewards"][::-1])]
+        model = multi_cls(n_subj=2, n_action=2, n_obs=2, seed=3)
+        n_fits, score = self._judge(model, obs, cache, multi_subject=True)
+        self.assertEqual(n_fits, 2)
+
+        cached_model = multi_cls(n_subj=2, n_action=2, n_obs=2, seed=3)
+        n_fits, cached_score = self._judge(cached_model, obs, cache, multi_subject=True)
+        self.assertEqual(n_fits, 0)
+        self.assertEqual(cached_score, score)
+        for m, cached_m in zip(model.subject_models, cached_model.subject_models):
+            self.assertEqual(cached_m.get_paras(), m.get_paras())
+
+    def test_persist_fit_report(self):
+        model = RWCKModel(n_action=2, n_obs=2, seed=3)
+        test = InteractiveTest(
+            observation=self.obs,
+            score_type=partialclass(NLLScore, min_score=0, max_score=1e4),
+            persist_path=self.tmpdir.name,
+        )
+        test.judge(model)
+        with open(os.path.join(self.tmpdir.name, model.name, "fit_report.json")) as f:
+            report = json.load(f)
+        self.assertEqual(report, model.fit_report.to_dict())
+
+    def test_eviction(self):
+        cache = FitCache(self.tmpdir.name)
+        for seed in range(3):
+            self._judge(RWCKModel(n_action=2, n_obs=2, seed=seed), self.obs, cache)
+        filenames = os.listdir(self.tmpdir.name)
+        self.assertEqual(len(filenames), 3)
+        entry_size = os.path.getsize(os.path.join(self.tmpdir.name, filenames[0]))
+
+        # loading the entry of seed 0 makes it the most recently used one
+        for filename in filenames:
+            os.utime(os.path.join(self.tmpdir.name, filename), (0, 0))
+        model = RWCKModel(n_action=2, n_obs=2, seed=0)
+        self.assertTrue(cache.load(model, self.obs))
+        cache.max_size = int(1.5 * entry_size)
+        cache.evict()
+        self.assertEqual(len(os.listdir(self.tmpdir.name)), 1)
+        self.assertTrue(cache.load(model, self.obs))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,16 +1,26 @@
+import pickle
 import unittest
 from gym import spaces
 from functools import reduce
 import numpy as np
 from scipy import stats
+from cognibench import settings
 from cognibench.models import associative_learning
+from cognibench.models.decision_making import NWSLSAgent
 from cognibench.models.utils import (
     multi_from_single_cls,
     single_from_multi_obj,
     reverse_single_from_multi_obj,
 )
 from cognibench.envs import BanditEnv, ClassicalConditioningEnv
-from cognibench.utils import partialclass, negloglike, is_arraylike
+from cognibench.utils import (
+    partialclass,
+    negloglike,
+    is_arraylike,
+    make_rng,
+    spawn_seeds,
+    BufferedRNG,
+)
 from cognibench.tasks import model_recovery, param_recovery
 from cognibench.testing import InteractiveTest
 from cognibench.scores import NLLScore
@@ -60,6 +70,113 @@ class Test_negloglike(unittest.TestCase):
             actual = negloglike(actions, [Test_negloglike.logpmf] * len(actions))
             self.assertAlmostEqual(expected, actual)
 
+    def test_loglik_array(self):
+        loglik = np.log(np.array(Test_negloglike.distr))
+        self.assertAlmostEqual(-np.sum(loglik), negloglike(range(5), loglik))
+
+
+class Test_spawn_seeds(unittest.TestCase):
+    def test_reproducible_streams(self):
+        first = [make_rng(s).random(5) for s in spawn_seeds(42, 3)]
+        second = [make_rng(s).random(5) for s in spawn_seeds(42, 3)]
+        for a, b in zip(first, second):
+            np.testing.assert_equal(a, b)
+        self.assertFalse(np.allclose(first[0], first[1]))
+        self.assertEqual(spawn_seeds(None, 2), [None, None])
+
+    def test_nested_spawn(self):
+        child = spawn_seeds(42, 2)[1]
+        grandchildren = spawn_seeds(child, 2)
+        self.assertEqual(grandchildren[0].spawn_key, (1, 0))
+        np.testing.assert_equal(
+            make_rng(grandchildren[1]).random(3),
+            make_rng(spawn_seeds(child, 2)[1]).random(3),
+        )
+
+    def test_model_and_agent_streams(self):
+        model = associative_learning.RwNormModel(n_obs=3, seed=42)
+        self.assertEqual(model.get_seed(), 42)
+        self.assertFalse(np.allclose(model.rng.random(5), model.agent.rng.random(5)))
+        model.set_seed(7)
+        np.testing.assert_equal(
+            model.agent.rng.random(5), make_rng(spawn_seeds(7, 1)[0]).random(5)
+        )
+
+    def test_env_streams(self):
+        seeds = spawn_seeds(0, 2)
+        envs = [BanditEnv(p_dist=[0.5, 0.5], seed=s) for s in seeds]
+        rewards = [[env.step(0)[1] for _ in range(50)] for env in envs]
+        self.assertNotEqual(rewards[0], rewards[1])
+        env = BanditEnv(p_dist=[0.5, 0.5], seed=seeds[0])
+        self.assertEqual([env.step(0)[1] for _ in range(50)], rewards[0])
+
+
+class Test_BufferedRNG(unittest.TestCase):
+    def draw(self, rng):
+        out = []
+        for _ in range(20):
+            out.append(rng.random())
+            out.append(rng.normal(1.0, 2.0))
+            out.append(rng.choice(3, p=np.array([0.2, 0.5, 0.3])))
+            out.extend(rng.uniform(-1, 1, size=2))
+        return out
+
+    def test_reproducible(self):
+        first = self.draw(BufferedRNG(make_rng(0), block_size=7))
+        second = self.draw(BufferedRNG(make_rng(0), block_size=7))
+        self.assertEqual(first, second)
+
+    def test_same_stream_as_generator(self):
+        rng = BufferedRNG(make_rng(0), block_size=3)
+        draws = [rng.random() for _ in range(4)] + list(rng.random(6))
+        np.testing.assert_allclose(draws, make_rng(0).random(10))
+        rng = BufferedRNG(make_rng(0), block_size=3)
+        normals = rng.standard_normal((2, 4))
+        np.testing.assert_allclose(
+            normals, make_rng(0).standard_normal(8).reshape(2, 4)
+        )
+        # sized draws larger than the buffer continue the same stream
+        rng = BufferedRNG(make_rng(0), block_size=3)
+        draws = [rng.random()] + list(rng.random(10)) + [rng.random() for _ in range(4)]
+        np.testing.assert_allclose(draws, make_rng(0).random(15))
+
+    def test_choice_inverts_cdf(self):
+        for n in (3, 40):
+            p = make_rng(n).random(n)
+            p /= p.sum()
+            rng = BufferedRNG(make_rng(1), block_size=50)
+            uniforms = make_rng(1).random(100)
+            expected = np.cumsum(p).searchsorted(uniforms, side="right")
+            actual = [rng.choice(n, p=p) for _ in range(100)]
+            np.testing.assert_equal(actual, expected)
+            self.assertIn(rng.choice(["a", "b"]), ["a", "b"])
+        self.assertRaises(ValueError, rng.choice, 3, p=[0.5, 0.5])
+        # invalid probabilities are rejected as by numpy
+        for n in (2, 40):
+            for p in ([0.5, 0.7], [-0.2, 1.2]):
+                p = np.resize(p, n) * 2 / n
+                self.assertRaises(ValueError, make_rng(0).choice, n, p=p)
+                self.assertRaises(ValueError, rng.choice, n, p=p)
+                self.assertRaises(ValueError, rng.choice, n, p=list(p))
+
+    def test_pickle(self):
+        rng = BufferedRNG(make_rng(0), block_size=5)
+        rng.random()
+        copy = pickle.loads(pickle.dumps(rng))
+        self.assertEqual(self.draw(rng), self.draw(copy))
+
+    def test_agent_block_size(self):
+        block_size = settings["RNG_BLOCK_SIZE"]
+        try:
+            agent = NWSLSAgent(n_action=2, n_obs=1, seed=0)
+            self.assertIsInstance(agent.rng, BufferedRNG)
+            self.assertEqual(agent.rng.block_size, block_size)
+            settings["RNG_BLOCK_SIZE"] = None
+            agent.set_seed(0)
+            self.assertIsInstance(agent.rng, np.random.Generator)
+        finally:
+            settings["RNG_BLOCK_SIZE"] = block_size
+
 
 class Test_multi_from_single_cls(unittest.TestCase):
     def setUp(self):
@@ -69,9 +186,9 @@ class Test_multi_from_single_cls(unittest.TestCase):
     def test_single_multi_equality(self):
         kwargs = {"n_obs": 3, "seed": 42}
         n_subj = 5
-        single_obj = self.single_model_cls(**kwargs)
         multi_obj = self.multi_model_cls(n_subj=n_subj, **kwargs)
-        for i in range(n_subj):
+        for i, subj_seed in enumerate(spawn_seeds(42, n_subj)):
+            single_obj = self.single_model_cls(n_obs=3, seed=subj_seed)
             single_paras = single_obj.get_paras()
             multi_paras = multi_obj.get_paras(i)
             for k, v in single_paras.items():